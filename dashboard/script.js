@@ -3233,13 +3233,16 @@ class PolicyWatcherDashboard {
             throw new Error(`History entry request failed (${response.status})`);
         }
 
-        const text = await response.text();
+        // History blobs may be stored gzip-compressed (HISTORY_BLOB_COMPRESSION=gzip)
+        const text = fileName.endsWith('.gz')
+            ? await new Response(response.body.pipeThrough(new DecompressionStream('gzip'))).text()
+            : await response.text();
         slugCache.set(fileName, text);
         return text;
     }
 
     getGithubHistoryUrl(slug) {
-        return `https://github.com/lyori6/ts-policy-watcher/commits/main/snapshots/production/${slug}/snapshot.html`;
+        return `https://github.com/lyori6/ts-policy-watcher/commits/main/snapshots/production/${slug}`;
     }
 
     escapeHtml(value) {
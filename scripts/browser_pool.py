@@ -0,0 +1,225 @@
+"""
+Shared Chromium browser pool for Playwright fetches.
+
+Launching Chromium is the most expensive part of a Playwright fetch, and
+most tracked pages use the Playwright renderer. This pool keeps a single
+browser process per run and leases pages out of a bounded set of reusable
+browser contexts.
+
+- One browser process, launched lazily on first use
+- At most ``max_contexts`` contexts, each with one reusable page
+- Contexts are recycled after ``max_navigations`` leases, after any error
+  raised while a page was leased, or when the page/browser crashes
+- An optional ResourcePolicy (see resource_policy.py) aborts unneeded
+  subresources through request routing; it can be overridden per lease
+- ``SyncBrowserPool`` exposes the same pool to thread-based callers such as
+  health_check.py by running it on a private event loop thread
+"""
+
+import asyncio
+import sys
+import threading
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from playwright.async_api import async_playwright
+
+from resource_policy import ResourcePolicy
+
+DEFAULT_MAX_CONTEXTS = 4
+DEFAULT_MAX_NAVIGATIONS = 25
+
+T = TypeVar("T")
+
+
+class _PooledContext:
+    """One browser context and its reusable page."""
+
+    def __init__(self):
+        self.context = None
+        self.page = None
+        self.navigations = 0
+        self.crashed = False
+        self.policy: Optional[ResourcePolicy] = None
+        self.routed = False
+        self.requests_blocked = 0
+
+    async def handle_route(self, route) -> None:
+        request = route.request
+        if self.policy is not None and self.policy.blocks(request.resource_type, request.url):
+            self.requests_blocked += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    @property
+    def usable(self) -> bool:
+        return self.page is not None and not self.crashed and not self.page.is_closed()
+
+    async def close(self) -> None:
+        context, self.context, self.page = self.context, None, None
+        self.navigations = 0
+        self.crashed = False
+        self.routed = False
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:  # noqa: BLE001 - context may already be gone with a crashed browser
+                pass
+
+
+class BrowserPool:
+    """Async pool of reusable Playwright pages backed by one Chromium process."""
+
+    def __init__(self, max_contexts: int = DEFAULT_MAX_CONTEXTS,
+                 max_navigations: int = DEFAULT_MAX_NAVIGATIONS,
+                 user_agent: Optional[str] = None,
+                 launch_options: Optional[dict] = None,
+                 resource_policy: Optional[ResourcePolicy] = None):
+        self.max_contexts = max(1, max_contexts)
+        self.max_navigations = max(1, max_navigations)
+        self.user_agent = user_agent
+        self.launch_options = launch_options or {}
+        self.resource_policy = resource_policy
+        self.browser_launches = 0
+        self.contexts_created = 0
+
+        self._playwright_manager = None
+        self._playwright = None
+        self._browser = None
+        self._launch_lock = asyncio.Lock()
+        self._slots = [_PooledContext() for _ in range(self.max_contexts)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        self._closed = False
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._playwright is None:
+                self._playwright_manager = async_playwright()
+                self._playwright = await self._playwright_manager.start()
+
+            if self._browser is not None:
+                print("    - WARNING: Browser disconnected; relaunching Chromium.", file=sys.stderr)
+                for slot in self._slots:
+                    slot.crashed = True
+
+            self._browser = await self._playwright.chromium.launch(**self.launch_options)
+            self.browser_launches += 1
+            return self._browser
+
+    async def _prepare(self, slot: _PooledContext) -> None:
+        browser = await self._ensure_browser()
+        if slot.usable and slot.navigations < self.max_navigations:
+            return
+
+        await slot.close()
+        context_options = {"user_agent": self.user_agent} if self.user_agent else {}
+        slot.context = await browser.new_context(**context_options)
+        slot.page = await slot.context.new_page()
+        slot.page.on("crash", lambda _page: setattr(slot, "crashed", True))
+        self.contexts_created += 1
+
+    @property
+    def requests_blocked(self) -> int:
+        return sum(slot.requests_blocked for slot in self._slots)
+
+    @asynccontextmanager
+    async def page(self, resource_policy: Optional[ResourcePolicy] = None):
+        """Lease a page for one navigation; waits while all contexts are busy.
+
+        ``resource_policy`` overrides the pool's policy for this lease only.
+        """
+        slot = await self._idle.get()
+        try:
+            await self._prepare(slot)
+            slot.policy = resource_policy or self.resource_policy
+            if slot.policy is not None and not slot.routed:
+                # The handler reads slot.policy, so one route serves every lease
+                await slot.page.route("**/*", slot.handle_route)
+                slot.routed = True
+            slot.navigations += 1
+            try:
+                yield slot.page
+            except BaseException:
+                # Never hand a page in an unknown state to the next caller.
+                slot.crashed = True
+                raise
+        finally:
+            if slot.crashed:
+                await slot.close()
+            self._idle.put_nowait(slot)
+
+    async def close(self) -> None:
+        """Close every context, the browser and the Playwright driver."""
+        async with self._launch_lock:
+            self._closed = True
+            for slot in self._slots:
+                await slot.close()
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:  # noqa: BLE001
+                    pass
+                self._browser = None
+            if self._playwright_manager is not None:
+                await self._playwright_manager.__aexit__(None, None, None)
+                self._playwright_manager = None
+                self._playwright = None
+
+
+class SyncBrowserPool:
+    """Thread-safe blocking facade over ``BrowserPool``.
+
+    The async pool lives on a dedicated event loop thread; callers from any
+    thread submit a coroutine function that receives a leased page.
+    """
+
+    def __init__(self, **pool_options):
+        self._pool_options = pool_options
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self.pool: BrowserPool = self._submit(self._create_pool())
+
+    async def _create_pool(self) -> BrowserPool:
+        return BrowserPool(**self._pool_options)
+
+    def _submit(self, coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def run(self, page_fn: Callable[..., Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Lease a page, run ``await page_fn(page)`` on the pool thread, and return its result."""
+        async def leased():
+            async with self.pool.page() as page:
+                return await page_fn(page)
+
+        return self._submit(leased(), timeout)
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+        try:
+            self._submit(self.pool.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self) -> "SyncBrowserPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,112 @@
+"""
+Recorded responses ("cassettes") for offline replay in the T&S Policy Watcher.
+
+The fetch pipeline could only be exercised against the live sites, so runs
+were neither reproducible nor possible offline. A cassette is a directory
+of recorded pages that replay_server.py serves back:
+
+- ``index.json`` maps each tracked URL to its recorded status, validators
+  (ETag/Last-Modified), the renderer that produced it and its body file
+- Bodies are stored under ``bodies/`` gzip-compressed (deterministically,
+  like snapshots), and named after a hash of the URL
+- FETCH_RECORD_DIR=<cassette> makes fetch.py record every page it fetches;
+  ``python scripts/replay_server.py import-snapshots <cassette>`` builds one
+  from the stored snapshots without touching the network
+- URL_REWRITE_PREFIX=http://127.0.0.1:8700 makes fetch.py and
+  health_check.py send every request to a replay server instead, as
+  ``<prefix>/<scheme>/<host><path>``. Per-host limits and logs still use the
+  original URLs
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+INDEX_FILENAME = "index.json"
+BODIES_DIRNAME = "bodies"
+CASSETTE_VERSION = 1
+DEFAULT_CONTENT_TYPE = "text/html; charset=utf-8"
+
+
+def rewrite_url(url: str, prefix: Optional[str]) -> str:
+    """The URL to request: ``url`` routed through ``prefix`` when one is set."""
+    if not prefix:
+        return url
+    parts = urlsplit(url)
+    rewritten = f"{prefix.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+    return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+
+def original_url(path: str) -> Optional[str]:
+    """Inverse of rewrite_url() for the request path a replay server sees, or None."""
+    scheme, _, rest = path.lstrip("/").partition("/")
+    if scheme not in ("http", "https") or not rest:
+        return None
+    netloc, slash, tail = rest.partition("/")
+    return f"{scheme}://{netloc}{slash or '/'}{tail}"
+
+
+def body_filename(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:20] + ".html.gz"
+
+
+class Cassette:
+    """Recorded responses keyed by URL."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: dict[str, dict] = {}
+        self._dirty = False
+
+    def load(self) -> "Cassette":
+        index_path = self.path / INDEX_FILENAME
+        if index_path.exists():
+            try:
+                data = json.loads(index_path.read_text(encoding="utf-8"))
+                self.entries = data.get("entries", {}) if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, OSError) as exc:
+                print(f"    - WARNING: Ignoring unreadable cassette index {index_path}: {exc}", file=sys.stderr)
+                self.entries = {}
+        return self
+
+    def record(self, url: str, html: str, validators: Optional[dict] = None, renderer: Optional[str] = None,
+               status: int = 200) -> None:
+        """Store ``html`` as the response for ``url``, replacing any earlier recording."""
+        body = gzip.compress(html.encode("utf-8"), compresslevel=9, mtime=0)
+        relative = f"{BODIES_DIRNAME}/{body_filename(url)}"
+        (self.path / BODIES_DIRNAME).mkdir(parents=True, exist_ok=True)
+        (self.path / relative).write_bytes(body)
+
+        entry = {"status": status, "content_type": DEFAULT_CONTENT_TYPE, "body": relative,
+                 "bytes": len(html.encode("utf-8")), "renderer": renderer,
+                 "recorded_utc": datetime.now(UTC).isoformat().replace("+00:00", "Z")}
+        for key in ("etag", "last_modified"):
+            if validators and validators.get(key):
+                entry[key] = validators[key]
+        self.entries[url] = entry
+        self._dirty = True
+
+    def get(self, url: str) -> Optional[dict]:
+        return self.entries.get(url)
+
+    def compressed_body(self, entry: dict) -> bytes:
+        return (self.path / entry["body"]).read_bytes()
+
+    def body(self, entry: dict) -> bytes:
+        return gzip.decompress(self.compressed_body(entry))
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        index = {"version": CASSETTE_VERSION, "entries": dict(sorted(self.entries.items()))}
+        tmp_path = self.path / (INDEX_FILENAME + ".tmp")
+        tmp_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path / INDEX_FILENAME)
+        self._dirty = False
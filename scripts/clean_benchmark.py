@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Benchmark for clean_html() over the snapshot corpus.
+
+clean_html() and its helpers run on every fetched page, on snapshots of up
+to ~1.4 MB, but nothing measured them. This benchmark cleans every stored
+snapshot (``snapshots/production/*/snapshot.html[.gz]``) with each parser
+backend and reports per slug:
+
+- Best time over ``--repeat`` rounds through the corpus of clean_html()
+  and of its stages: parsing and noise stripping (extract_content),
+  lines_without_noise() and trim_leading_navigation()
+- Peak Python heap while cleaning (tracemalloc; lxml's C-side tree is not
+  counted)
+- Whether the output equals the slug's exported ``clean.txt``
+
+The results are compared with ``benchmarks/clean_html_baseline.json``.
+Timings are scaled by a fixed pure-Python calibration loop, so a baseline
+recorded on one machine can be checked on another. The run fails (exit
+code 1) when:
+
+- The total time of a parser, or a slug's time (by more than
+  ``--min-delta-ms``), regresses past its threshold
+- A slug's peak memory grows past ``--memory-threshold``
+- A slug's output differs from the baseline, or a slug that matched its
+  ``clean.txt`` no longer does (``--strict-clean`` fails on any mismatch;
+  ``clean.txt`` lags the snapshot when a page changed without a history
+  export)
+
+Slugs whose snapshot changed since the baseline are not compared; they are
+listed as "input changed, re-baseline" instead of failing the run.
+
+Usage:
+    python scripts/clean_benchmark.py [--parser html.parser --parser lxml] [--repeat 3] [slug ...]
+    python scripts/clean_benchmark.py --update-baseline
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Callable, Optional
+
+import fetch
+from extraction_rules import load_extraction_rules
+from html_cleaner import DEFAULT_PARSER, extract_content, parser_available
+from snapshot_store import read_snapshot, snapshot_exists
+
+DEFAULT_BASELINE = Path("benchmarks/clean_html_baseline.json")
+DEFAULT_PARSERS = (DEFAULT_PARSER, "lxml")
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.3          # Total time per parser
+DEFAULT_SLUG_THRESHOLD = 1.0     # Time per slug; single slugs are noisier than the total
+DEFAULT_MEMORY_THRESHOLD = 0.2   # Peak memory per slug
+DEFAULT_MIN_DELTA_MS = 10.0      # Ignore slug slowdowns smaller than this
+CALIBRATION_ROUNDS = 7
+
+
+@dataclass
+class SlugResult:
+    html_bytes: int
+    html_sha256: str
+    clean_ms: float
+    extract_ms: float
+    noise_ms: float
+    trim_ms: float
+    peak_kb: float
+    clean_sha256: str
+    matches_clean_txt: Optional[bool]  # None when there is no clean.txt
+
+
+def timed_ms(fn: Callable[[], object]) -> float:
+    """One run of ``fn`` with the garbage collector paused, like timeit."""
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _calibration_workload() -> int:
+    words = [f"word{n % 97}" for n in range(100000)]
+    counts: dict[str, int] = {}
+    for line in " ".join(words).split("word1"):
+        for word in line.split():
+            counts[word] = counts.get(word, 0) + 1
+    return len(counts)
+
+
+def calibration_ms() -> float:
+    """One timed run of a fixed pure-Python workload; the unit benchmark timings are scaled by."""
+    return timed_ms(_calibration_workload)
+
+
+def corpus(snapshots_dir: Path, slugs: Optional[list[str]] = None) -> list[str]:
+    """Slugs with a stored snapshot, sorted."""
+    if not snapshots_dir.is_dir():
+        return []
+    found = sorted(path.name for path in snapshots_dir.iterdir() if path.is_dir() and snapshot_exists(path))
+    return [slug for slug in found if slug in slugs] if slugs else found
+
+
+def time_stages(slug: str, html: str, parser: str) -> dict[str, float]:
+    """One timed run of clean_html() and of each of its stages (clean_html reads the parser from fetch.py)."""
+    rules = load_extraction_rules().for_slug(slug)
+    timings = {"clean_ms": timed_ms(lambda: fetch.clean_html(html, slug))}
+    extracted = []
+    timings["extract_ms"] = timed_ms(lambda: extracted.append(extract_content(html, rules.cleaning, parser=parser)))
+    lines = [" ".join(part.strip() for part in line.split()) for line in extracted[0][0].splitlines()]
+    filtered = []
+    timings["noise_ms"] = timed_ms(lambda: filtered.extend(fetch.lines_without_noise(lines, slug)))
+    timings["trim_ms"] = 0.0
+    if rules.trim_leading_navigation:
+        timings["trim_ms"] = timed_ms(lambda: fetch.trim_leading_navigation(filtered, slug))
+    return timings
+
+
+def benchmark_parser(snapshots: dict[str, tuple[str, Optional[str]]], parser: str, repeat: int,
+                     calibration: list[float]) -> dict[str, SlugResult]:
+    """Clean every snapshot with ``parser``, keeping each slug's fastest of ``repeat`` rounds.
+
+    Rounds go over the whole corpus, so a burst of load on a shared machine
+    slows one round of many slugs instead of every run of one slug. Each
+    round also appends a calibration timing to ``calibration``.
+    """
+    previous_parser = fetch.CLEAN_HTML_PARSER
+    fetch.CLEAN_HTML_PARSER = parser
+    try:
+        best: dict[str, dict[str, float]] = {}
+        for _ in range(max(1, repeat)):
+            calibration.append(calibration_ms())
+            for slug, (html, _) in snapshots.items():
+                timings = time_stages(slug, html, parser)
+                best[slug] = {key: min(value, best.get(slug, timings)[key]) for key, value in timings.items()}
+
+        results = {}
+        for slug, (html, reference) in snapshots.items():
+            tracemalloc.start()
+            try:
+                output = fetch.clean_html(html, slug)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            results[slug] = SlugResult(
+                html_bytes=len(html.encode("utf-8")),
+                html_sha256=hashlib.sha256(html.encode("utf-8")).hexdigest(),
+                clean_ms=round(best[slug]["clean_ms"], 2),
+                extract_ms=round(best[slug]["extract_ms"], 2),
+                noise_ms=round(best[slug]["noise_ms"], 3),
+                trim_ms=round(best[slug]["trim_ms"], 3),
+                peak_kb=round(peak / 1024, 1),
+                clean_sha256=hashlib.sha256(output.encode("utf-8")).hexdigest(),
+                matches_clean_txt=None if reference is None else output == reference,
+            )
+    finally:
+        fetch.CLEAN_HTML_PARSER = previous_parser
+    return results
+
+
+def run_benchmark(snapshots_dir: Path, parsers: list[str], repeat: int = DEFAULT_REPEAT,
+                  slugs: Optional[list[str]] = None) -> dict:
+    """Benchmark every slug with every parser; returns the report (the baseline format)."""
+    report = {
+        "recorded_utc": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "python": platform.python_version(),
+        "calibration_ms": None,  # Filled in once every round has been calibrated
+        "parsers": {},
+    }
+    calibration = [calibration_ms() for _ in range(CALIBRATION_ROUNDS)]
+    snapshots = {}
+    for slug in corpus(snapshots_dir, slugs):
+        clean_path = snapshots_dir / slug / fetch.CLEAN_SNAPSHOT_FILENAME
+        reference = clean_path.read_text(encoding="utf-8") if clean_path.exists() else None
+        snapshots[slug] = (read_snapshot(snapshots_dir / slug), reference)
+
+    for parser in parsers:
+        results = {slug: asdict(result)
+                   for slug, result in benchmark_parser(snapshots, parser, repeat, calibration).items()}
+        report["parsers"][parser] = {
+            "total_ms": round(sum(result["clean_ms"] for result in results.values()), 2),
+            "slugs": results,
+        }
+    report["calibration_ms"] = round(min(calibration), 3)
+    return report
+
+
+def changed_inputs(report: dict, baseline: dict) -> list[tuple[str, str]]:
+    """(parser, slug) pairs whose snapshot differs from the one the baseline was recorded on."""
+    changed = []
+    for parser, current in report["parsers"].items():
+        expected_slugs = baseline.get("parsers", {}).get(parser, {}).get("slugs", {})
+        for slug, result in current["slugs"].items():
+            if slug in expected_slugs and expected_slugs[slug].get("html_sha256") != result["html_sha256"]:
+                changed.append((parser, slug))
+    return changed
+
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+                        slug_threshold: float = DEFAULT_SLUG_THRESHOLD,
+                        memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+                        min_delta_ms: float = DEFAULT_MIN_DELTA_MS, strict_clean: bool = False) -> list[str]:
+    """Regressions of ``report`` against ``baseline``, one message each; empty when the run passes.
+
+    Slugs whose input changed (changed_inputs()) are left out; their
+    timings and output are not comparable with the baseline.
+    """
+    problems = []
+    changed = set(changed_inputs(report, baseline))
+    # Baseline timings in this machine's speed
+    scale = report["calibration_ms"] / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+
+    for parser, current in report["parsers"].items():
+        for slug, result in current["slugs"].items():
+            if strict_clean and result["matches_clean_txt"] is False:
+                problems.append(f"{parser} {slug}: output differs from clean.txt")
+
+        expected = baseline.get("parsers", {}).get(parser)
+        if not expected:
+            continue
+        expected_slugs = expected["slugs"]
+        compared = [slug for slug in current["slugs"] if slug in expected_slugs and (parser, slug) not in changed]
+
+        expected_total = sum(expected_slugs[slug]["clean_ms"] for slug in compared) * scale
+        current_total = sum(current["slugs"][slug]["clean_ms"] for slug in compared)
+        if expected_total and current_total > expected_total * (1 + threshold):
+            problems.append(f"{parser}: total {current_total:.1f} ms vs {expected_total:.1f} ms baseline "
+                            f"(+{current_total / expected_total - 1:.0%}, threshold {threshold:.0%})")
+
+        for slug in compared:
+            result, before = current["slugs"][slug], expected_slugs[slug]
+            if result["clean_sha256"] != before["clean_sha256"]:
+                problems.append(f"{parser} {slug}: output changed since the baseline")
+            elif before["matches_clean_txt"] and result["matches_clean_txt"] is False:
+                problems.append(f"{parser} {slug}: output no longer matches clean.txt")
+
+            expected_ms = before["clean_ms"] * scale
+            if (result["clean_ms"] > expected_ms * (1 + slug_threshold)
+                    and result["clean_ms"] - expected_ms > min_delta_ms):
+                problems.append(f"{parser} {slug}: {result['clean_ms']:.1f} ms vs {expected_ms:.1f} ms baseline")
+            if before["peak_kb"] and result["peak_kb"] > before["peak_kb"] * (1 + memory_threshold):
+                problems.append(f"{parser} {slug}: peak {result['peak_kb']:.0f} KB vs {before['peak_kb']:.0f} KB baseline")
+    return problems
+
+
+def format_report(report: dict) -> list[str]:
+    lines = [f"Calibration: {report['calibration_ms']:.2f} ms"]
+    for parser, current in report["parsers"].items():
+        slugs = current["slugs"]
+        matches = sum(1 for result in slugs.values() if result["matches_clean_txt"])
+        references = sum(1 for result in slugs.values() if result["matches_clean_txt"] is not None)
+        lines.append(f"\n{parser}: {len(slugs)} snapshot(s), {current['total_ms']:.1f} ms total, "
+                     f"{matches}/{references} match clean.txt")
+        lines.append(f"  {'slug':<40} {'KB':>7} {'clean ms':>9} {'extract':>8} {'noise':>7} {'trim':>6} "
+                     f"{'peak KB':>8}  clean.txt")
+        for slug, result in sorted(slugs.items(), key=lambda item: -item[1]["clean_ms"]):
+            match = {True: "match", False: "differs", None: "-"}[result["matches_clean_txt"]]
+            lines.append(f"  {slug:<40} {result['html_bytes'] / 1024:>7.0f} {result['clean_ms']:>9.1f} "
+                         f"{result['extract_ms']:>8.1f} {result['noise_ms']:>7.2f} {result['trim_ms']:>6.2f} "
+                         f"{result['peak_kb']:>8.0f}  {match}")
+    return lines
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as exc:
+        print(f"    - WARNING: Ignoring unreadable baseline {path}: {exc}", file=sys.stderr)
+        return None
+
+
+def save_baseline(path: Path, report: dict, previous: Optional[dict]) -> None:
+    """Write ``report`` as the baseline, keeping parsers this run didn't benchmark."""
+    parsers = dict((previous or {}).get("parsers", {}))
+    if previous and previous.get("calibration_ms"):
+        # Kept parsers were timed at the previous calibration; express them in the new one
+        scale = report["calibration_ms"] / previous["calibration_ms"]
+        for parser, stats in parsers.items():
+            if parser not in report["parsers"]:
+                for result in stats["slugs"].values():
+                    result["clean_ms"] = round(result["clean_ms"] * scale, 2)
+                stats["total_ms"] = round(sum(result["clean_ms"] for result in stats["slugs"].values()), 2)
+    parsers.update(report["parsers"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({**report, "parsers": dict(sorted(parsers.items()))}, indent=2) + "\n",
+                    encoding="utf-8")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark clean_html() over the stored snapshots")
+    parser.add_argument("slugs", nargs="*", help="Only these slugs (default: every snapshot)")
+    parser.add_argument("--parser", action="append", dest="parsers",
+                        help=f"Parser backend, repeatable (default: {', '.join(DEFAULT_PARSERS)} when installed)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed rounds through the corpus")
+    parser.add_argument("--snapshots-dir", type=Path, default=None, help="Default: the fetcher's snapshots dir")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--slug-threshold", type=float, default=DEFAULT_SLUG_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument("--strict-clean", action="store_true", help="Fail on any output that differs from clean.txt")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the full report here")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    snapshots_dir = args.snapshots_dir or fetch.SNAPSHOTS_DIR
+    parsers = []
+    for parser in args.parsers or DEFAULT_PARSERS:
+        if parser_available(parser):
+            parsers.append(parser)
+        else:
+            print(f"    - WARNING: Parser {parser!r} is not installed; skipping it.", file=sys.stderr)
+    slugs = corpus(snapshots_dir, args.slugs)
+    if not slugs or not parsers:
+        print(f"FATAL: Nothing to benchmark (snapshots in {snapshots_dir}: {len(slugs)}, parsers: {parsers})",
+              file=sys.stderr)
+        return 1
+
+    print(f"Benchmarking clean_html() on {len(slugs)} snapshot(s) from {snapshots_dir} "
+          f"with {', '.join(parsers)} ({args.repeat} round(s))...")
+    report = run_benchmark(snapshots_dir, parsers, args.repeat, args.slugs)
+    for line in format_report(report):
+        print(line)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        save_baseline(args.baseline, report, baseline)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one.")
+        baseline = {}
+
+    changed = changed_inputs(report, baseline)
+    if changed:
+        print(f"\n{len(changed)} slug(s) not compared:")
+        for parser, slug in changed:
+            print(f"  - {parser} {slug}: input changed, re-baseline")
+    problems = compare_to_baseline(report, baseline, args.threshold, args.slug_threshold, args.memory_threshold,
+                                   args.min_delta_ms, args.strict_clean)
+    if problems:
+        print(f"\nFAILED: {len(problems)} regression(s):", file=sys.stderr)
+        for problem in problems:
+            print(f"  - {problem}", file=sys.stderr)
+        return 1
+    print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
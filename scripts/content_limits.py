@@ -0,0 +1,90 @@
+"""
+Size and content-type limits for fetched pages.
+
+fetch_with_httpx() used to buffer ``response.text`` with no limit, and
+Playwright returned the full ``page.content()`` string, so a misbehaving
+page or a redirect to a large asset was read fully into memory. These
+helpers let both fetchers reject such responses early:
+
+- The Content-Type must be an HTML/text type when the server declares one
+- A declared Content-Length above the cap aborts before reading the body
+- httpx bodies are streamed and decoded incrementally, aborting as soon as
+  the decoded size passes the cap
+
+The cap defaults to FETCH_MAX_BYTES (10 MiB) and can be set per page with
+``"max_bytes"`` in platform_urls.json. Rejections raise
+ContentRejectedError, reported as ``content_rejected`` and never retried.
+Error pages are only read up to ERROR_BODY_MAX_BYTES, enough to recognise
+a bot wall (see renderer_selection.py).
+"""
+
+import codecs
+from typing import Optional
+
+import httpx
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+ERROR_BODY_MAX_BYTES = 16 * 1024
+
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+class ContentRejectedError(Exception):
+    """A response failed a size or content-type rule; retrying won't help."""
+
+
+def check_content_type(content_type: Optional[str], url: str) -> None:
+    """Reject declared non-HTML content types; a missing header is allowed."""
+    if not content_type:
+        return
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type and media_type not in ALLOWED_CONTENT_TYPES:
+        raise ContentRejectedError(f"Content rejected for {url}: unsupported content type {media_type!r}")
+
+
+def check_size(size: Optional[int], max_bytes: int, url: str) -> None:
+    if size is not None and size > max_bytes:
+        raise ContentRejectedError(f"Content rejected for {url}: {size} bytes exceeds the {max_bytes}-byte limit")
+
+
+def declared_length(response: httpx.Response) -> Optional[int]:
+    try:
+        return int(response.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def read_text_capped(response: httpx.Response, max_bytes: int, url: str) -> str:
+    """Stream and decode a response body, aborting once it exceeds ``max_bytes``.
+
+    Decodes exactly like ``response.text`` (declared charset, else the
+    client's default encoding, with replacement characters for bad bytes).
+    """
+    check_size(declared_length(response), max_bytes, url)
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    received = 0
+    parts = []
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        check_size(received, max_bytes, url)
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+async def read_error_body(response: httpx.Response, max_bytes: int = ERROR_BODY_MAX_BYTES) -> str:
+    """The first ``max_bytes`` of an error page, or "" when it is not HTML/text."""
+    try:
+        check_content_type(response.headers.get("content-type"), str(response.url))
+    except ContentRejectedError:
+        return ""
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    received = 0
+    parts = []
+    async for chunk in response.aiter_bytes():
+        parts.append(decoder.decode(chunk[:max_bytes - received]))
+        received += len(chunk)
+        if received >= max_bytes:
+            break
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
@@ -3,6 +3,7 @@
 import os
 import sys
 import json
+import difflib
 import subprocess
 from datetime import datetime, UTC, timedelta
 import google.generativeai as genai
@@ -12,6 +13,8 @@ import warnings
 import resend
 import markdown
 
+from snapshot_store import is_snapshot_file, read_snapshot, read_snapshot_at
+
 # Suppress BeautifulSoup warnings
 warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 
@@ -39,12 +42,14 @@ def get_changed_files(commit_sha):
     try:
         # Use git diff to compare the commit with its parent (HEAD^)
         # This ensures we only get files that have actually changed.
+        # Deleted paths are skipped: migrating snapshot.html to snapshot.html.gz
+        # deletes the plain file, and its content lives on in the .gz one.
         result = subprocess.run(
-            ["git", "diff", "--name-only", f"{commit_sha}^", commit_sha],
+            ["git", "diff", "--name-only", "--diff-filter=d", f"{commit_sha}^", commit_sha],
             capture_output=True, text=True, check=True
         )
         files = result.stdout.strip().split("\n")
-        changed_html_files = [f for f in files if f and f.startswith("snapshots/") and f.endswith(".html")]
+        changed_html_files = [f for f in files if f and f.startswith("snapshots/") and is_snapshot_file(f)]
         print(f"DEBUG: Found {len(changed_html_files)} changed HTML files: {changed_html_files}")
         return changed_html_files
     except subprocess.CalledProcessError as e:
@@ -56,18 +61,22 @@ def get_changed_files(commit_sha):
         return []
 
 def get_git_diff(file_path, commit_sha):
-    """Gets the diff for a specific file from a specific commit."""
+    """Gets the diff for a specific snapshot from a specific commit.
+
+    Snapshots may be stored gzip-compressed, so both versions are read
+    through snapshot_store and diffed as text.
+    """
+    slug_dir = os.path.dirname(file_path)
     try:
-        # Diff against the parent commit
-        result = subprocess.run(
-            ["git", "diff", f"{commit_sha}^!", "--", file_path],
-            capture_output=True, text=True, check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"ERROR: 'git diff' failed for {file_path} with exit code {e.returncode}", file=sys.stderr)
-        print(f"Stderr: {e.stderr}", file=sys.stderr)
+        old_html = read_snapshot_at(f"{commit_sha}^", slug_dir) or ""
+        new_html = read_snapshot_at(commit_sha, slug_dir) or ""
+    except Exception as e:
+        print(f"ERROR: Could not read snapshot versions for {file_path}: {e}", file=sys.stderr)
         return ""
+    return "".join(difflib.unified_diff(
+        old_html.splitlines(keepends=True), new_html.splitlines(keepends=True),
+        fromfile=f"a/{file_path}", tofile=f"b/{file_path}",
+    ))
 
 def clean_html(html_content):
     """Strips all HTML tags to get clean text."""
@@ -169,8 +178,7 @@ def process_changed_file(file_path, is_new_policy, commit_sha):
     
     try:
         if is_new_policy:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = read_snapshot(os.path.dirname(file_path))
             text_to_summarize = clean_html(content)
         else:
             diff_content = get_git_diff(file_path, commit_sha)
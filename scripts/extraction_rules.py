@@ -0,0 +1,275 @@
+"""
+Declarative per-platform extraction rules for the T&S Policy Watcher.
+
+Platform-specific cleaning used to be hard-coded across clean_html(),
+lines_without_noise() and trim_leading_navigation(). The rules now live in
+``extraction_rules.json`` at the repository root and are validated and
+compiled once per process:
+
+- ``default`` applies to every slug
+- ``platforms`` maps a slug prefix (e.g. ``"meta-"``) to extra rules; the
+  first matching prefix wins, in file order
+- ``content_roots`` (tried before the defaults) and ``strip`` (appended to
+  the defaults) are element rules: ``{"tags": [...], "attr": ..., "value"
+  or "pattern": ..., "first_only": bool}``
+- ``noise_patterns`` are literal substrings that drop a whole text line
+- ``trim_leading_navigation`` drops leading nav lines; ``start_anchors``
+  are lines the article is known to start at
+- ``expect_content_root`` and ``min_text_chars`` tell the adaptive renderer
+  (renderer_selection.py) when a plain HTTP fetch came back unusable;
+  ``min_text_chars`` is also the rendered text a Playwright load must reach
+  before it can count as ready
+- ``browser`` configures Playwright loads: ``block_resource_types`` and
+  ``block_trackers`` (see resource_policy.py), and ``ready`` (see
+  readiness.py) with ``selector``, ``network_idle``, ``stable_ms``,
+  ``poll_ms``, ``deadline_ms`` and ``min_text_chars`` (overrides the
+  platform value for the readiness wait only)
+
+Each compiled platform carries a digest of its merged cleaning rules so
+stored fingerprints are invalidated when those rules change.
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from html_cleaner import CleaningRules, ElementRule
+from readiness import ReadinessStrategy
+from resource_policy import DEFAULT_BLOCKED_RESOURCE_TYPES, RESOURCE_TYPES, ResourcePolicy
+
+DEFAULT_RULES_FILE = Path(__file__).resolve().parent.parent / "extraction_rules.json"
+
+_CLEANING_KEYS = {"content_roots", "strip", "noise_patterns", "trim_leading_navigation", "start_anchors"}
+_SECTION_KEYS = _CLEANING_KEYS | {"browser", "expect_content_root", "min_text_chars"}
+DEFAULT_MIN_TEXT_CHARS = 500
+_BROWSER_KEYS = {"block_resource_types", "block_trackers", "ready"}
+_READY_KEYS = {"selector", "network_idle", "stable_ms", "poll_ms", "deadline_ms", "min_text_chars"}
+_ELEMENT_RULE_KEYS = {"tags", "attr", "value", "pattern", "first_only"}
+
+
+class ExtractionRulesError(ValueError):
+    """Raised when extraction_rules.json is malformed."""
+
+
+@dataclass(frozen=True)
+class PlatformRules:
+    """Compiled rules for one slug prefix (or the default)."""
+    prefix: Optional[str]
+    cleaning: CleaningRules
+    noise: re.Pattern
+    trim_leading_navigation: bool
+    start_anchors: tuple[str, ...]
+    expect_content_root: bool
+    min_text_chars: int
+    digest: str
+    resource_policy: ResourcePolicy
+    readiness: ReadinessStrategy
+
+
+def _string_list(value, where: str) -> list[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+        raise ExtractionRulesError(f"{where} must be a list of non-empty strings")
+    return value
+
+
+def _compile_element_rule(spec, where: str) -> ElementRule:
+    if not isinstance(spec, dict):
+        raise ExtractionRulesError(f"{where} must be an object")
+    unknown = set(spec) - _ELEMENT_RULE_KEYS
+    if unknown:
+        raise ExtractionRulesError(f"{where} has unknown keys: {', '.join(sorted(unknown))}")
+    if not isinstance(spec.get("attr"), str) or not spec["attr"]:
+        raise ExtractionRulesError(f"{where}.attr must be a non-empty string")
+    if ("value" in spec) == ("pattern" in spec):
+        raise ExtractionRulesError(f"{where} needs exactly one of 'value' or 'pattern'")
+    for key in ("value", "pattern"):
+        if key in spec and not isinstance(spec[key], str):
+            raise ExtractionRulesError(f"{where}.{key} must be a string")
+    if "first_only" in spec and not isinstance(spec["first_only"], bool):
+        raise ExtractionRulesError(f"{where}.first_only must be true or false")
+    tags = _string_list(spec["tags"], f"{where}.tags") if "tags" in spec else None
+    try:
+        return ElementRule(spec["attr"], tags=tags, value=spec.get("value"),
+                           pattern=spec.get("pattern"), first_only=spec.get("first_only", False))
+    except re.error as exc:
+        raise ExtractionRulesError(f"{where}.pattern is not a valid regex: {exc}") from exc
+
+
+def _validate_section(section, where: str) -> dict:
+    if not isinstance(section, dict):
+        raise ExtractionRulesError(f"{where} must be an object")
+    unknown = set(section) - _SECTION_KEYS
+    if unknown:
+        raise ExtractionRulesError(f"{where} has unknown keys: {', '.join(sorted(unknown))}")
+    for key in ("content_roots", "strip"):
+        if key in section:
+            if not isinstance(section[key], list):
+                raise ExtractionRulesError(f"{where}.{key} must be a list")
+            for index, spec in enumerate(section[key]):
+                _compile_element_rule(spec, f"{where}.{key}[{index}]")
+    for key in ("noise_patterns", "start_anchors"):
+        if key in section:
+            _string_list(section[key], f"{where}.{key}")
+    if "trim_leading_navigation" in section and not isinstance(section["trim_leading_navigation"], bool):
+        raise ExtractionRulesError(f"{where}.trim_leading_navigation must be true or false")
+    if "expect_content_root" in section and not isinstance(section["expect_content_root"], bool):
+        raise ExtractionRulesError(f"{where}.expect_content_root must be true or false")
+    if "min_text_chars" in section and (isinstance(section["min_text_chars"], bool)
+                                        or not isinstance(section["min_text_chars"], int)
+                                        or section["min_text_chars"] < 0):
+        raise ExtractionRulesError(f"{where}.min_text_chars must be an integer >= 0")
+    if "browser" in section:
+        _validate_browser(section["browser"], f"{where}.browser")
+    return section
+
+
+def _validate_browser(browser, where: str) -> None:
+    if not isinstance(browser, dict):
+        raise ExtractionRulesError(f"{where} must be an object")
+    unknown = set(browser) - _BROWSER_KEYS
+    if unknown:
+        raise ExtractionRulesError(f"{where} has unknown keys: {', '.join(sorted(unknown))}")
+    if "block_resource_types" in browser:
+        types = browser["block_resource_types"]
+        if not isinstance(types, list) or not all(isinstance(item, str) for item in types):
+            raise ExtractionRulesError(f"{where}.block_resource_types must be a list of strings")
+        invalid = set(types) - RESOURCE_TYPES
+        if invalid:
+            raise ExtractionRulesError(f"{where}.block_resource_types has unknown types: {', '.join(sorted(invalid))}")
+    if "block_trackers" in browser and not isinstance(browser["block_trackers"], bool):
+        raise ExtractionRulesError(f"{where}.block_trackers must be true or false")
+    if "ready" in browser:
+        _validate_ready(browser["ready"], f"{where}.ready")
+
+
+def _validate_ready(ready, where: str) -> None:
+    if not isinstance(ready, dict):
+        raise ExtractionRulesError(f"{where} must be an object")
+    unknown = set(ready) - _READY_KEYS
+    if unknown:
+        raise ExtractionRulesError(f"{where} has unknown keys: {', '.join(sorted(unknown))}")
+    if "selector" in ready and (not isinstance(ready["selector"], str) or not ready["selector"]):
+        raise ExtractionRulesError(f"{where}.selector must be a non-empty string")
+    if "network_idle" in ready and not isinstance(ready["network_idle"], bool):
+        raise ExtractionRulesError(f"{where}.network_idle must be true or false")
+    for key, minimum in (("stable_ms", 0), ("poll_ms", 1), ("deadline_ms", 1), ("min_text_chars", 0)):
+        value = ready.get(key, minimum)
+        if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+            raise ExtractionRulesError(f"{where}.{key} must be an integer >= {minimum}")
+
+
+def _merge(default: dict, platform: dict) -> dict:
+    return {
+        "content_roots": platform.get("content_roots", []) + default.get("content_roots", []),
+        "strip": default.get("strip", []) + platform.get("strip", []),
+        "noise_patterns": default.get("noise_patterns", []) + platform.get("noise_patterns", []),
+        "trim_leading_navigation": platform.get("trim_leading_navigation",
+                                                default.get("trim_leading_navigation", False)),
+        "start_anchors": platform.get("start_anchors", default.get("start_anchors", [])),
+        "expect_content_root": platform.get("expect_content_root", default.get("expect_content_root", False)),
+        "min_text_chars": platform.get("min_text_chars", default.get("min_text_chars", DEFAULT_MIN_TEXT_CHARS)),
+        "browser": _merge_browser(default.get("browser", {}), platform.get("browser", {})),
+    }
+
+
+def _merge_browser(default: dict, platform: dict) -> dict:
+    merged = {**default, **platform}
+    if "ready" in default or "ready" in platform:
+        merged["ready"] = {**default.get("ready", {}), **platform.get("ready", {})}
+    return merged
+
+
+def _compile_noise(patterns: list[str]) -> re.Pattern:
+    # One escaped alternation scans each line once, however many patterns
+    # there are. An empty set compiles to a pattern that never matches.
+    if not patterns:
+        return re.compile(r"(?!)")
+    ordered = sorted(set(patterns), key=len, reverse=True)
+    return re.compile("|".join(re.escape(pattern) for pattern in ordered))
+
+
+def _compile_platform(prefix: Optional[str], merged: dict) -> PlatformRules:
+    where = f"platforms[{prefix!r}]" if prefix else "default"
+    # Only settings that change clean_html() output feed the fingerprint digest
+    cleaning_spec = {key: value for key, value in merged.items() if key in _CLEANING_KEYS}
+    browser = merged["browser"]
+    return PlatformRules(
+        prefix=prefix,
+        cleaning=CleaningRules(
+            content_roots=[_compile_element_rule(spec, f"{where}.content_roots[{index}]")
+                           for index, spec in enumerate(merged["content_roots"])],
+            strip_rules=[_compile_element_rule(spec, f"{where}.strip[{index}]")
+                         for index, spec in enumerate(merged["strip"])],
+        ),
+        noise=_compile_noise(merged["noise_patterns"]),
+        trim_leading_navigation=merged["trim_leading_navigation"],
+        start_anchors=tuple(merged["start_anchors"]),
+        expect_content_root=merged["expect_content_root"],
+        min_text_chars=merged["min_text_chars"],
+        digest=hashlib.sha256(json.dumps(cleaning_spec, sort_keys=True).encode("utf-8")).hexdigest(),
+        resource_policy=ResourcePolicy.build(
+            browser.get("block_resource_types", DEFAULT_BLOCKED_RESOURCE_TYPES),
+            browser.get("block_trackers", True),
+        ),
+        # Rendered text shorter than the platform's floor is a loading shell, not a page
+        readiness=ReadinessStrategy(**{"min_text_chars": merged["min_text_chars"], **browser.get("ready", {})}),
+    )
+
+
+class ExtractionRuleRegistry:
+    """All compiled platform rules, looked up by slug prefix."""
+
+    def __init__(self, data):
+        if not isinstance(data, dict):
+            raise ExtractionRulesError("extraction rules must be a JSON object")
+        unknown = set(data) - {"default", "platforms"}
+        if unknown:
+            raise ExtractionRulesError(f"extraction rules have unknown keys: {', '.join(sorted(unknown))}")
+        default = _validate_section(data.get("default", {}), "default")
+        platforms = data.get("platforms", {})
+        if not isinstance(platforms, dict):
+            raise ExtractionRulesError("platforms must be an object keyed by slug prefix")
+
+        self.default = _compile_platform(None, _merge(default, {}))
+        self.platforms = tuple(
+            _compile_platform(prefix, _merge(default, _validate_section(section, f"platforms[{prefix!r}]")))
+            for prefix, section in platforms.items()
+        )
+        self._by_slug: dict[Optional[str], PlatformRules] = {}
+
+    def for_slug(self, slug: Optional[str]) -> PlatformRules:
+        """Rules for a slug: the first platform whose prefix matches, else the default."""
+        rules = self._by_slug.get(slug)
+        if rules is None:
+            rules = next((platform for platform in self.platforms
+                          if slug and slug.startswith(platform.prefix)), self.default)
+            self._by_slug[slug] = rules
+        return rules
+
+
+def rules_file_path() -> Path:
+    return Path(os.getenv("EXTRACTION_RULES_FILE") or DEFAULT_RULES_FILE)
+
+
+@lru_cache(maxsize=None)
+def _load(path: Path) -> ExtractionRuleRegistry:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except OSError as exc:
+        raise ExtractionRulesError(f"Cannot read extraction rules at {path}: {exc}") from exc
+    except json.JSONDecodeError as exc:
+        raise ExtractionRulesError(f"Invalid JSON in {path}: {exc}") from exc
+    try:
+        return ExtractionRuleRegistry(data)
+    except ExtractionRulesError as exc:
+        raise ExtractionRulesError(f"{path}: {exc}") from exc
+
+
+def load_extraction_rules(path: Optional[Path] = None) -> ExtractionRuleRegistry:
+    """Load, validate and compile the rules file once per process."""
+    return _load(Path(path) if path else rules_file_path())
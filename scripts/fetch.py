@@ -1,14 +1,46 @@
 #import json
 import json
+import asyncio
+import hashlib
 import httpx
 import time
 import os
 import sys
 import subprocess
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack
 from pathlib import Path
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from browser_pool import BrowserPool, DEFAULT_MAX_CONTEXTS, DEFAULT_MAX_NAVIGATIONS
+from cassette import Cassette, rewrite_url
+from fetch_engine import FetchEngine, DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST_CONCURRENCY
+from fetch_metrics import (DEFAULT_METRICS_FILE, PageMetrics, elapsed_ms, format_summary, summarize,
+                           write_metrics_file)
+from git_batch import GitBatchError, restore_tree
+from history_delta import (CHAIN_FILENAME, DEFAULT_KEYFRAME_INTERVAL, DEFAULT_MAX_VERSIONS, DeltaChain,
+                           HistoryChainError)
+from history_store import COMPRESSIONS, HistoryBlobStore, blob_id
+from http_client import create_async_client, http2_available
+from html_canonicalizer import referenced_attributes, verified_canonical_html
+from html_cleaner import DEFAULT_PARSER, extract_content, parser_available
+from extraction_rules import ExtractionRulesError, load_extraction_rules
+from poll_scheduler import (DEFAULT_MAX_INTERVAL_HOURS, DEFAULT_MIN_INTERVAL_HOURS, SCHEDULE_FILENAME, PollSchedule,
+                            history_change_times, run_log_start)
+from sharding import ShardError, committed_health_db, parse_shard, partial_run_log_name, select_shard
+from rate_limiter import (DEFAULT_BACKOFF_CAP_SECONDS, DEFAULT_BURST, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_RETRY_BUDGET,
+                          MAX_RETRY_AFTER_SECONDS, HostRateLimiter, RetryBudget, backoff_delay, parse_retry_after)
+from readiness import ReadinessResult, ReadinessStrategy, wait_until_ready
+from renderer_selection import (AUTO, HTTPX, PLAYWRIGHT, RENDERER_CACHE_FILENAME, DEFAULT_TTL_HOURS,
+                                RendererCache, blocked_response_reason, unusable_content_reason)
+from snapshot_store import (configured_compression, decode_snapshot, read_snapshot, snapshot_exists, snapshot_file,
+                            write_snapshot)
+from resource_policy import ResourcePolicy, blocking_enabled
+from content_limits import (DEFAULT_MAX_BYTES, ContentRejectedError, check_content_type, check_size,
+                            read_error_body, read_text_capped)
 
 PUNCTUATION_MARKERS = ('.', '!', '?')
 HISTORY_SUBDIR_NAME = "history"
@@ -19,20 +51,80 @@ MAX_HISTORY_ENTRIES = 5
 USER_AGENT = "TrustAndSafety-Policy-Watcher/1.0 (https://github.com/your-repo/ts-policy-watcher; mailto:your-email@example.com)"
 URL_CONFIG_FILE = Path("platform_urls.json")
 FAILURE_LOG_FILE = Path("failures.log")
-RETRY_ATTEMPTS = 2
-RETRY_DELAY_SECONDS = 5
+RUN_LOG_FILE = Path("run_log.json")
+RUN_LOG_MAX_ENTRIES = 25
+URL_HEALTH_FILE = Path("url_health.json")
+RETRY_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 5  # Backoff base: retries wait up to 5s, 10s, ... (with jitter)
 
 # --- Error Classification ---
 class URLErrorTypes:
     """Classification of URL fetch errors for smart retry logic."""
     BROKEN_LINK = "404_not_found"          # Don't retry - URL is permanently broken
     ACCESS_DENIED = "403_forbidden"        # Don't retry - Access blocked
+    RATE_LIMITED = "429_rate_limited"      # Retry - After Retry-After or a backoff
     SERVER_ERROR = "5xx_server_error"      # Retry - Temporary server issue
     NETWORK_TIMEOUT = "timeout"            # Retry - Network connectivity issue
+    CONTENT_REJECTED = "content_rejected"  # Don't retry - Too large or not HTML
     UNKNOWN = "unknown_error"              # Retry once - Uncertain cause
 
+class HTTPStatusFetchError(Exception):
+    """An HTTP error status seen by the browser renderer, with its Retry-After header."""
+
+    def __init__(self, status: int, message: str, retry_after: str | None = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class HTTPErrorResponse(httpx.HTTPStatusError):
+    """An httpx error status with the start of its body, for telling bot walls from other errors."""
+
+    def __init__(self, error: httpx.HTTPStatusError, body: str):
+        super().__init__(str(error), request=error.request, response=error.response)
+        self.body = body
+
+
+def response_status(exception: Exception) -> int | None:
+    if isinstance(exception, httpx.HTTPStatusError):
+        return exception.response.status_code
+    if isinstance(exception, HTTPStatusFetchError):
+        return exception.status
+    return None
+
+
+def error_body(exception: Exception) -> str:
+    """Start of the HTTP error response behind ``exception``, when it was read."""
+    return exception.body if isinstance(exception, HTTPErrorResponse) else ""
+
+
+def retry_after_seconds(exception: Exception) -> float | None:
+    """Seconds the server asked us to wait (Retry-After), or None."""
+    if isinstance(exception, httpx.HTTPStatusError):
+        return parse_retry_after(exception.response.headers.get("retry-after"))
+    if isinstance(exception, HTTPStatusFetchError):
+        return parse_retry_after(exception.retry_after)
+    return None
+
+
 def classify_error(exception: Exception) -> str:
     """Classify error type for smart retry logic."""
+    if isinstance(exception, ContentRejectedError):
+        return URLErrorTypes.CONTENT_REJECTED
+    if isinstance(exception, (httpx.TimeoutException, PlaywrightTimeoutError)):
+        return URLErrorTypes.NETWORK_TIMEOUT
+
+    status = response_status(exception)
+    if status in (404, 410):
+        return URLErrorTypes.BROKEN_LINK
+    if status == 403:
+        return URLErrorTypes.ACCESS_DENIED
+    if status == 429:
+        return URLErrorTypes.RATE_LIMITED
+    if status is not None and status >= 500:
+        return URLErrorTypes.SERVER_ERROR
+
+    # Other exceptions only carry a message
     error_str = str(exception).lower()
     
     if "404" in error_str or "not found" in error_str:
@@ -48,7 +140,8 @@ def classify_error(exception: Exception) -> str:
 
 def should_retry(error_type: str) -> bool:
     """Determine if error type should be retried."""
-    return error_type in [URLErrorTypes.SERVER_ERROR, URLErrorTypes.NETWORK_TIMEOUT, URLErrorTypes.UNKNOWN]
+    return error_type in [URLErrorTypes.RATE_LIMITED, URLErrorTypes.SERVER_ERROR, URLErrorTypes.NETWORK_TIMEOUT,
+                          URLErrorTypes.UNKNOWN]
 
 def get_snapshot_base_directory():
     """
@@ -81,8 +174,94 @@ def is_env_flag_enabled(name: str) -> bool:
 
 HISTORY_EXPORT_ENABLED = is_env_flag_enabled("ENABLE_HISTORY_EXPORT")
 CLEAN_SNAPSHOT_FILENAME = "clean.txt"
+# Strip scripts, styles and volatile attributes from stored snapshots
+# ("canonicalize": true per page in platform_urls.json, or every page with this set)
+CANONICALIZE_SNAPSHOTS = is_env_flag_enabled("CANONICALIZE_SNAPSHOTS")
+# Stored snapshots are gzip-compressed (snapshot.html.gz) unless SNAPSHOT_COMPRESSION=none
+SNAPSHOT_COMPRESSION = configured_compression()
+VALIDATORS_FILENAME = "validators.json"
+FINGERPRINT_FILENAME = "fingerprint.json"
 HISTORY_EXPORT_ONLY_MODE = is_env_flag_enabled("HISTORY_EXPORT_ONLY")
 
+
+def get_env_int(name: str, default: int) -> int:
+    """Return an integer environment setting, falling back to the default when unset or invalid."""
+    raw_value = os.getenv(name)
+    if raw_value is None or not raw_value.strip():
+        return default
+    try:
+        return int(raw_value)
+    except ValueError:
+        print(f"    - WARNING: Ignoring non-integer {name}={raw_value!r}; using {default}.", file=sys.stderr)
+        return default
+
+
+# Concurrency limits for the fetch engine. Per-host limits keep us polite on
+# hosts that serve many tracked pages (help.whatnot.com, legal.twitch.com).
+MAX_CONCURRENT_FETCHES = get_env_int("FETCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+PER_HOST_CONCURRENT_FETCHES = get_env_int("FETCH_PER_HOST_CONCURRENCY", DEFAULT_PER_HOST_CONCURRENCY)
+
+# Request pacing per host (0 requests per minute disables it) and the number
+# of retries a whole run may spend (see rate_limiter.py)
+FETCH_HOST_REQUESTS_PER_MINUTE = get_env_int("FETCH_HOST_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)
+FETCH_HOST_BURST = get_env_int("FETCH_HOST_BURST", DEFAULT_BURST)
+FETCH_RETRY_BUDGET = get_env_int("FETCH_RETRY_BUDGET", DEFAULT_RETRY_BUDGET)
+
+# Per-page stage timings and byte counts, appended as JSON lines (or a
+# Prometheus textfile for a .prom name); set to an empty string to disable
+FETCH_METRICS_FILE = os.getenv("FETCH_METRICS_FILE", DEFAULT_METRICS_FILE).strip()
+
+# Offline record/replay (see cassette.py): FETCH_RECORD_DIR records every
+# fetched page into a cassette; URL_REWRITE_PREFIX sends every request to a
+# replay server (scripts/replay_server.py) instead of the live site
+FETCH_RECORD_DIR = os.getenv("FETCH_RECORD_DIR", "").strip()
+URL_REWRITE_PREFIX = os.getenv("URL_REWRITE_PREFIX", "").strip()
+
+# Shared Chromium pool: one browser per run, a bounded set of reusable
+# contexts, each recycled after this many navigations.
+BROWSER_POOL_SIZE = get_env_int("BROWSER_POOL_SIZE", DEFAULT_MAX_CONTEXTS)
+BROWSER_CONTEXT_MAX_NAVIGATIONS = get_env_int("BROWSER_CONTEXT_MAX_NAVIGATIONS", DEFAULT_MAX_NAVIGATIONS)
+
+# Abort images, fonts, media, stylesheets and trackers in Playwright loads
+# (per-platform overrides in extraction_rules.json). On unless set to 0.
+BLOCK_BROWSER_RESOURCES = blocking_enabled()
+
+# Largest page body we will read (per-page "max_bytes" in platform_urls.json overrides)
+FETCH_MAX_BYTES = get_env_int("FETCH_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+# Adaptive renderer: "renderer": "auto" pages (every page with
+# ADAPTIVE_RENDERER=1) try httpx first and escalate to Playwright when needed.
+ADAPTIVE_RENDERER = is_env_flag_enabled("ADAPTIVE_RENDERER")
+RENDERER_CACHE_TTL_HOURS = get_env_int("RENDERER_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)
+
+# Adaptive polling: fetch only pages whose change history says they are due,
+# and every page at least once per POLL_MAX_INTERVAL_HOURS (see poll_scheduler.py)
+ADAPTIVE_POLLING = is_env_flag_enabled("ADAPTIVE_POLLING")
+POLL_MIN_INTERVAL_HOURS = get_env_int("POLL_MIN_INTERVAL_HOURS", DEFAULT_MIN_INTERVAL_HOURS)
+POLL_MAX_INTERVAL_HOURS = get_env_int("POLL_MAX_INTERVAL_HOURS", DEFAULT_MAX_INTERVAL_HOURS)
+
+# Parser backend for clean_html(). "lxml" parses several times faster than the
+# pure-Python default but can build different trees for malformed markup, so
+# switching backends re-cleans every stored snapshot once (see fingerprints).
+CLEAN_HTML_PARSER = os.getenv("CLEAN_HTML_PARSER", DEFAULT_PARSER).strip() or DEFAULT_PARSER
+if not parser_available(CLEAN_HTML_PARSER):
+    print(f"    - WARNING: HTML parser {CLEAN_HTML_PARSER!r} is unavailable; using {DEFAULT_PARSER}.", file=sys.stderr)
+    CLEAN_HTML_PARSER = DEFAULT_PARSER
+
+# Optional gzip compression for new history blobs (the dashboard inflates them)
+HISTORY_BLOB_COMPRESSION = os.getenv("HISTORY_BLOB_COMPRESSION", "").strip().lower() or None
+if HISTORY_BLOB_COMPRESSION not in COMPRESSIONS:
+    print(f"    - WARNING: Unsupported HISTORY_BLOB_COMPRESSION={HISTORY_BLOB_COMPRESSION!r}; storing plain text.",
+          file=sys.stderr)
+    HISTORY_BLOB_COMPRESSION = None
+
+# Long-term history: versions kept in each slug's chain.jsonl and how often a full keyframe is stored
+HISTORY_CHAIN_MAX_VERSIONS = get_env_int("HISTORY_CHAIN_MAX_VERSIONS", DEFAULT_MAX_VERSIONS)
+HISTORY_KEYFRAME_INTERVAL = get_env_int("HISTORY_KEYFRAME_INTERVAL", DEFAULT_KEYFRAME_INTERVAL)
+
+# Processes used to clean snapshots in history export-only mode (--workers overrides)
+HISTORY_EXPORT_WORKERS = get_env_int("HISTORY_EXPORT_WORKERS", os.cpu_count() or 1)
+
 _HISTORY_BOOTSTRAP_ATTEMPTED = False
 
 
@@ -162,70 +341,22 @@ def ensure_history_bootstrap_from_data_branch(snapshots_dir: Path) -> None:
         )
         return
 
-    ls_proc = subprocess.run(
-        [
-            "git",
-            "ls-tree",
-            "-r",
-            "--full-tree",
-            ref,
-            "--",
-            history_rel,
-        ],
-        check=False,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    try:
+        stats = restore_tree(ref, history_rel, repo_root)
+    except GitBatchError as exc:
+        print(f"    - WARNING: Unable to restore history files from {ref}: {exc}", file=sys.stderr)
+        return
 
-    if ls_proc.returncode != 0:
-        message = ls_proc.stderr.strip() or "unknown error"
+    for relative_path in stats.missing:
         print(
-            f"    - WARNING: Unable to list history files from {ref}: {message}",
+            f"    - WARNING: Unable to restore {relative_path} from {ref}: object missing",
             file=sys.stderr,
         )
-        return
-
-    file_paths = []
-    for line in ls_proc.stdout.splitlines():
-        try:
-            _, path = line.split("\t", 1)
-        except ValueError:
-            continue
-        normalized = path.strip()
-        if not normalized:
-            continue
-        file_paths.append(normalized)
 
-    if not file_paths:
-        return
-
-    restored_files = 0
-    for relative_path in file_paths:
-        show_proc = subprocess.run(
-            ["git", "show", f"{ref}:{relative_path}"],
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-
-        if show_proc.returncode != 0:
-            message = show_proc.stderr.strip() or "unknown error"
-            print(
-                f"    - WARNING: Unable to restore {relative_path} from {ref}: {message}",
-                file=sys.stderr,
-            )
-            continue
-
-        destination = repo_root / relative_path
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        destination.write_text(show_proc.stdout, encoding="utf-8")
-        restored_files += 1
-
-    if restored_files:
+    if stats.files:
         print(
-            f"  - HISTORY EXPORT: Bootstrapped {restored_files} files from {ref}")
+            f"  - HISTORY EXPORT: Bootstrapped {stats.files} files ({stats.bytes} bytes) "
+            f"from {ref} in {stats.elapsed_seconds:.2f}s")
 
 
 def load_history_manifest(manifest_path: Path) -> list[dict]:
@@ -276,6 +407,49 @@ def save_history_manifest(manifest_path: Path, manifest: list[dict]) -> None:
     manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
 
 
+def history_blob_store(snapshots_dir: Path) -> HistoryBlobStore:
+    return HistoryBlobStore(snapshots_dir / HISTORY_SUBDIR_NAME, HISTORY_BLOB_COMPRESSION)
+
+
+def migrate_legacy_history_entries(history_root: Path, manifest: list[dict], store: HistoryBlobStore) -> bool:
+    """Move per-slug history files into the blob store; returns True if the manifest changed."""
+    migrated = False
+    for entry in manifest:
+        file_name = entry.get("file")
+        if entry.get("blob") or not file_name:
+            continue
+        legacy_path = history_root / file_name
+        if not legacy_path.is_file():
+            continue
+        object_id, blob_path = store.put(legacy_path.read_text(encoding="utf-8"))
+        entry["file"] = store.entry_file(blob_path)
+        entry["blob"] = object_id
+        legacy_path.unlink()
+        migrated = True
+    return migrated
+
+
+def append_history_chain(history_root: Path, manifest: list[dict], store: HistoryBlobStore) -> None:
+    """Record the newest manifest entry in the slug's long-term delta chain.
+
+    Chains are seeded from the entries still in the manifest the first time.
+    Failures only cost long-term history, so they are reported, not raised.
+    """
+    chain = DeltaChain(history_root / CHAIN_FILENAME, HISTORY_KEYFRAME_INTERVAL, HISTORY_CHAIN_MAX_VERSIONS)
+    try:
+        if chain.exists():
+            entries = manifest[:1]
+            chain.load()
+        else:
+            entries = list(reversed(manifest))
+        for entry in entries:
+            entry_path = history_root / entry.get("file", "")
+            if entry.get("file") and entry_path.is_file():
+                chain.append(store.read(entry_path), entry)
+    except (HistoryChainError, OSError, ValueError) as exc:
+        print(f"    - WARNING: Failed to update history chain in {history_root}: {exc}", file=sys.stderr)
+
+
 def update_history_artifacts(slug: str, cleaned_content: str, snapshots_dir: Path) -> None:
     if not HISTORY_EXPORT_ENABLED:
         return
@@ -284,40 +458,30 @@ def update_history_artifacts(slug: str, cleaned_content: str, snapshots_dir: Pat
 
     history_root = snapshots_dir / HISTORY_SUBDIR_NAME / slug
     manifest_path = history_root / HISTORY_MANIFEST_FILENAME
+    store = history_blob_store(snapshots_dir)
 
     try:
         history_root.mkdir(parents=True, exist_ok=True)
         manifest = load_history_manifest(manifest_path)
 
+        migrated = migrate_legacy_history_entries(history_root, manifest, store)
+
         # Skip new entry if latest stored content matches the cleaned content
-        if manifest:
-            latest_file = manifest[0].get("file")
-            if latest_file:
-                latest_path = history_root / latest_file
-                if latest_path.exists():
-                    existing_text = latest_path.read_text(encoding="utf-8")
-                    if existing_text == cleaned_content:
-                        return
+        if manifest and manifest[0].get("blob") == blob_id(cleaned_content):
+            if migrated:
+                save_history_manifest(manifest_path, manifest)
+            return
 
+        object_id, blob_path = store.put(cleaned_content)
         timestamp = datetime.now(UTC)
         iso_timestamp = timestamp.isoformat().replace('+00:00', 'Z')
         label = timestamp.strftime("%b %d, %Y · %H:%M UTC")
 
-        base_filename = timestamp.strftime("%Y%m%dT%H%M%SZ")
-        file_name = f"{base_filename}.txt"
-        file_path = history_root / file_name
-        suffix = 1
-        while file_path.exists():
-            suffix += 1
-            file_name = f"{base_filename}-{suffix}.txt"
-            file_path = history_root / file_name
-
-        file_path.write_text(cleaned_content, encoding="utf-8")
-
         entry: dict[str, str] = {
             "timestamp": iso_timestamp,
             "label": label,
-            "file": file_name,
+            "file": store.entry_file(blob_path),
+            "blob": object_id,
         }
 
         commit_sha = os.getenv("GITHUB_SHA")
@@ -326,24 +490,49 @@ def update_history_artifacts(slug: str, cleaned_content: str, snapshots_dir: Pat
             entry["commit_full"] = commit_sha
 
         manifest.insert(0, entry)
+        append_history_chain(history_root, manifest, store)
 
-        # Enforce retention cap
+        # Enforce retention cap; blobs are released by collect_garbage()
         while len(manifest) > MAX_HISTORY_ENTRIES:
             removed = manifest.pop()
             removed_file = removed.get("file")
-            if removed_file:
+            if removed_file and not removed.get("blob"):
                 removed_path = history_root / removed_file
                 if removed_path.exists():
                     removed_path.unlink()
 
         save_history_manifest(manifest_path, manifest)
-        print(f"  - HISTORY EXPORT: Added entry for {slug} ({file_name})")
+        print(f"  - HISTORY EXPORT: Added entry for {slug} (blob {object_id[:12]})")
     except Exception as exc:  # noqa: BLE001
         print(f"    - WARNING: Failed to update history for {slug}: {exc}", file=sys.stderr)
 
 
-def run_history_export_only_mode() -> None:
-    """Generate clean artifacts from existing snapshots without refetching."""
+def _clean_snapshot_file(snapshot_path: Path) -> tuple[str, str | None, str | None]:
+    """Read and clean one snapshot; returns (slug, cleaned, error). Runs in pool workers."""
+    slug = snapshot_path.parent.name
+    try:
+        html_content = decode_snapshot(snapshot_path.read_bytes(), snapshot_path.name)
+    except Exception as exc:  # noqa: BLE001
+        return slug, None, f"Failed to read {snapshot_path}: {exc}"
+    return slug, clean_html(html_content, slug), None
+
+
+def iter_cleaned_snapshots(snapshot_files: list[Path], workers: int):
+    """Yield _clean_snapshot_file() results in input order, cleaning on ``workers`` processes."""
+    if workers <= 1 or len(snapshot_files) <= 1:
+        yield from map(_clean_snapshot_file, snapshot_files)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(snapshot_files))) as pool:
+        yield from pool.map(_clean_snapshot_file, snapshot_files)
+
+
+def run_history_export_only_mode(workers: int | None = None) -> None:
+    """Generate clean artifacts from existing snapshots without refetching.
+
+    Parsing and cleaning are spread over ``workers`` processes (default
+    HISTORY_EXPORT_WORKERS); all file and manifest writes stay in this
+    process, in sorted slug order, so the output matches a serial run.
+    """
     if not HISTORY_EXPORT_ENABLED:
         print("History export flag not set; skipping clean artifact generation.")
         return
@@ -353,96 +542,166 @@ def run_history_export_only_mode() -> None:
         print(f"No snapshots directory found at {base_dir}. Nothing to export.")
         return
 
-    snapshot_files = sorted(base_dir.glob("*/snapshot.html"))
+    snapshot_files = sorted(path for path in map(snapshot_file, base_dir.iterdir()) if path is not None)
     if not snapshot_files:
-        print(f"No snapshot.html files found under {base_dir}.")
+        print(f"No snapshot files found under {base_dir}.")
         return
 
-    print(f"History export-only mode: processing {len(snapshot_files)} snapshots in {base_dir}.")
+    workers = max(1, workers or HISTORY_EXPORT_WORKERS)
+    print(f"History export-only mode: processing {len(snapshot_files)} snapshots in {base_dir} "
+          f"with {min(workers, len(snapshot_files))} worker(s).")
 
-    for snapshot_path in snapshot_files:
-        slug = snapshot_path.parent.name
-        try:
-            html_content = snapshot_path.read_text(encoding="utf-8")
-        except Exception as exc:  # noqa: BLE001
-            print(f"    - WARNING: Failed to read {snapshot_path}: {exc}", file=sys.stderr)
+    for snapshot_path, (slug, cleaned, error) in zip(snapshot_files, iter_cleaned_snapshots(snapshot_files, workers)):
+        if error:
+            print(f"    - WARNING: {error}", file=sys.stderr)
             continue
 
-        cleaned = clean_html(html_content, slug)
         export_clean_snapshot_if_enabled(slug, cleaned, snapshot_path.parent)
 
         update_history_artifacts(slug, cleaned, SNAPSHOTS_DIR)
 
-def fetch_with_httpx(url: str) -> str:
-    """Fetches page content using the lightweight httpx library."""
-    headers = {"User-Agent": USER_AGENT}
-    with httpx.Client(headers=headers, follow_redirects=True) as client:
-        response = client.get(url, timeout=30.0)
-        response.raise_for_status()
-        return response.text
+    removed_blobs = history_blob_store(SNAPSHOTS_DIR).collect_garbage()
+    if removed_blobs:
+        print(f"  - HISTORY EXPORT: Removed {removed_blobs} unreferenced history blobs")
+
+@dataclass
+class FetchedPage:
+    """Outcome of a single successful fetch.
+
+    ``not_modified`` is set when the server answered a conditional request
+    with 304, in which case ``content`` is None and the stored snapshot is
+    still current.
+    """
+    content: str | None
+    not_modified: bool = False
+    readiness: ReadinessResult | None = None
+    cleaned: str | None = None  # clean_html() output, when already computed
+    validators: dict = field(default_factory=dict)
+    bytes_downloaded: int = 0
+
+
+def load_http_validators(slug_dir: Path) -> dict:
+    """Load the ETag/Last-Modified validators stored for a slug, if any."""
+    validators_path = slug_dir / VALIDATORS_FILENAME
+    if not validators_path.exists():
+        return {}
+    try:
+        data = json.loads(validators_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as exc:
+        print(f"    - WARNING: Ignoring unreadable validators at {validators_path}: {exc}", file=sys.stderr)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_http_validators(slug_dir: Path, url: str, validators: dict) -> None:
+    """Persist validators for the next run, removing stale ones when the server sent none."""
+    validators_path = slug_dir / VALIDATORS_FILENAME
+    if not validators:
+        if validators_path.exists():
+            validators_path.unlink()
+        return
+
+    record = {"url": url, **validators}
+    if load_http_validators(slug_dir) == record:
+        return
+    validators_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
 
-def fetch_with_playwright(url: str) -> str:
-    """Fetches page content using a full headless browser (Playwright)."""
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page(user_agent=USER_AGENT)
+
+def extract_http_validators(response: httpx.Response) -> dict:
+    validators = {}
+    if response.headers.get("etag"):
+        validators["etag"] = response.headers["etag"]
+    if response.headers.get("last-modified"):
+        validators["last_modified"] = response.headers["last-modified"]
+    return validators
+
+
+async def fetch_with_httpx(url: str, client: httpx.AsyncClient, validators: dict | None = None,
+                           max_bytes: int = DEFAULT_MAX_BYTES, trace=None) -> FetchedPage:
+    """Fetches page content using the run's shared httpx client.
+
+    When validators from a previous fetch are supplied, the request is made
+    conditional and a 304 response short-circuits without a body. The body
+    is streamed and the fetch aborted (ContentRejectedError) when it is not
+    HTML or grows past ``max_bytes``. ``trace`` is passed on as the httpx
+    trace extension (PageMetrics.trace times connection setup).
+    """
+    headers = {}
+    if validators and validators.get("url") == url:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    extensions = {"trace": trace} if trace else None
+    request_url = rewrite_url(url, URL_REWRITE_PREFIX)
+    async with client.stream("GET", request_url, headers=headers, extensions=extensions) as response:
+        if response.status_code == 304:
+            return FetchedPage(content=None, not_modified=True,
+                               validators=extract_http_validators(response) or dict(validators or {}))
+        if response.is_error:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as error:
+                # Bot walls are told apart from other errors by their body
+                raise HTTPErrorResponse(error, await read_error_body(response)) from None
+        response.raise_for_status()
+        check_content_type(response.headers.get("content-type"), url)
+        content = await read_text_capped(response, max_bytes, url)
+        return FetchedPage(content=content, validators=extract_http_validators(response),
+                           bytes_downloaded=response.num_bytes_downloaded)
+
+# UTF-8 size of the rendered DOM, measured inside the browser
+DOM_UTF8_SIZE_JS = "() => new TextEncoder().encode(document.documentElement.outerHTML).length"
+
+
+async def fetch_with_playwright(url: str, browser_pool: BrowserPool,
+                                resource_policy: ResourcePolicy | None = None,
+                                readiness: ReadinessStrategy | None = None,
+                                max_bytes: int = DEFAULT_MAX_BYTES) -> FetchedPage:
+    """Fetches page content using a pooled headless browser page (Playwright).
+
+    ``resource_policy`` aborts subresources (images, fonts, trackers...) the
+    HTML snapshot does not need; None loads everything. ``readiness`` decides
+    when the rendered page is complete (see readiness.py). Non-HTML
+    documents and DOMs larger than ``max_bytes`` are rejected before the
+    page content is copied out of the browser.
+    """
+    async with browser_pool.page(resource_policy) as page:
         try:
-            response = page.goto(url, timeout=60000, wait_until='domcontentloaded')
-            
+            response = await page.goto(rewrite_url(url, URL_REWRITE_PREFIX), timeout=60000,
+                                       wait_until='domcontentloaded')
+
             # CRITICAL FIX: Check HTTP status code to prevent silent failures
             if response and response.status >= 400:
-                raise Exception(f"HTTP {response.status}: {response.status_text}")
-            
-            page.wait_for_timeout(3000)
-            content = page.content()
+                raise HTTPStatusFetchError(response.status, f"HTTP {response.status}: {response.status_text}",
+                                           response.headers.get("retry-after"))
+            if response:
+                check_content_type(response.headers.get("content-type"), url)
+
+            readiness = readiness or ReadinessStrategy()
+            ready = await wait_until_ready(page, readiness)
+            print(f"  - Ready after {ready.waited_ms} ms ({ready.reason}): {url}")
+            if ready.reason == "too_short":
+                # Still a loading shell: retry rather than save it as a change
+                raise PlaywrightTimeoutError(f"Rendered text stayed under {readiness.min_text_chars} chars "
+                                             f"for {ready.waited_ms} ms")
+            dom_size = await page.evaluate(DOM_UTF8_SIZE_JS)
+            check_size(dom_size, max_bytes, url)
+            return FetchedPage(content=await page.content(), readiness=ready, bytes_downloaded=dom_size or 0)
         except PlaywrightTimeoutError as e:
             print(f"    ERROR: Playwright timeout for {url}: {e}", file=sys.stderr)
             raise
-        finally:
-            browser.close()
-        return content
 
 def lines_without_noise(lines, slug: str | None) -> list[str]:
     """Filter out nav-heavy lines and platform-specific noise."""
-
-    dynamic_nav_patterns = [
-        'SearchClear searchClose searchMain menu',
-        'Google Help',
-        'Help Center',
-        'Google apps',
-        'Community Standards | Transparency Center',
-        'Preferred Language',
-        'Was it helpful?',
-        'Submit Feedback',
-        'Next article',
-        'TikTokCompany',
-        'Product feedbackHow do you think we can improve?',
-        'Sorry to interrupt',
-    ]
-
-    slug_specific_patterns = {
-        'youtube-': ['Do not share any personal info'],
-        'twitch-': [
-            'English',
-            'twitch.tv ↗',
-            'Search',
-            'Enter a search term and use arrow keys to navigate results. Press enter to select.',
-            'Loading×Sorry to interrupt',
-        ],
-        'tiktok-': ['Yes', 'No', 'Read next'],
-    }
-
-    if slug:
-        for prefix, patterns in slug_specific_patterns.items():
-            if slug.startswith(prefix):
-                dynamic_nav_patterns.extend(patterns)
-                break
+    is_noise = load_extraction_rules().for_slug(slug).noise.search
 
     cleaned = []
     for line in lines:
         if not line:
             continue
-        if any(pattern in line for pattern in dynamic_nav_patterns):
+        if is_noise(line):
             continue
         # Drop language grids or nav blobs (very long lines with almost no spaces)
         if len(line) > 180 and line.count(' ') < 4:
@@ -454,9 +713,10 @@ def lines_without_noise(lines, slug: str | None) -> list[str]:
 
 def trim_leading_navigation(lines: list[str], slug: str | None) -> list[str]:
     """Remove leading navigational headings until real sentences appear."""
-    if slug and slug.startswith('meta-'):
+    start_anchors = load_extraction_rules().for_slug(slug).start_anchors
+    if start_anchors:
         for idx, line in enumerate(lines):
-            if 'The Community Standards outline' in line:
+            if any(anchor in line for anchor in start_anchors):
                 return lines[idx:]
 
     for idx, line in enumerate(lines):
@@ -466,98 +726,668 @@ def trim_leading_navigation(lines: list[str], slug: str | None) -> list[str]:
     return lines
 
 
+# Bump whenever clean_html() (or the noise/trim helpers it uses) would produce
+# different output for the same HTML. Stored fingerprints from an older
+# version are ignored and the old snapshot is re-cleaned once. Edits to
+# extraction_rules.json are tracked per platform by the rules digest instead.
+CLEANER_VERSION = 1
+
+
 def clean_html(html_content: str, slug: str | None = None) -> str:
     """
     Cleans HTML content by removing noisy tags and normalizing whitespace.
-    For Google/YouTube help pages, it specifically targets the main article body
-    and removes dynamic elements like feedback forms and follow buttons.
+    The platform's rules from extraction_rules.json pick the main content
+    root (e.g. the Google/YouTube article body), strip dynamic elements like
+    feedback forms and follow buttons, and drop navigation noise lines.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    return clean_html_with_root(html_content, slug)[0]
 
-    # For Google/YouTube pages, find the main content area
-    # First try class-based selector, then itemprop-based selector
-    article_body = soup.find('div', class_='article-body')
-    if not article_body:
-        article_body = soup.find('div', attrs={'itemprop': 'articleBody'})
-    
-    # If a specific container is found, use it. Otherwise, use the whole soup.
-    target_soup = article_body if article_body else soup
-
-    # Remove dynamic elements that change on each request
-    # 1. Remove the feedback form, which contains dynamic IDs
-    feedback_form = target_soup.find('div', class_='article-survey-container')
-    if feedback_form:
-        feedback_form.decompose()
-    
-    # 2. Remove follow/subscribe buttons with dynamic IDs
-    for subscribe_btn in target_soup.find_all('div', class_='subscribe-btn'):
-        subscribe_btn.decompose()
-    
-    # 3. Remove any element with dynamic ID patterns (contains random numbers)
-    import re
-    for element in target_soup.find_all(attrs={'id': re.compile(r'.*-\d+\.\d+.*')}):
-        element.decompose()
-    
-    # 4. Remove Google-specific dynamic elements
-    # Remove zwieback_id div that contains dynamic session IDs
-    for zwieback_div in target_soup.find_all('div', attrs={'data-page-data-key': 'zwieback_id'}):
-        zwieback_div.decompose()
-    
-    # 5. Remove hidden elements that don't contain meaningful content
-    for hidden_element in target_soup.find_all(attrs={'style': re.compile(r'display:\s*none')}):
-        hidden_element.decompose()
-    
-    # 6. Remove search elements that can appear in different positions
-    for search_element in target_soup.find_all(['input', 'button'], attrs={'type': 'search'}):
-        search_element.decompose()
-    for search_element in target_soup.find_all(attrs={'class': re.compile(r'search|menu')}):
-        search_element.decompose()
-    
-    # 7. Remove Google-specific navigation elements that load dynamically
-    for nav_element in target_soup.find_all(['form', 'div'], attrs={'role': 'search'}):
-        nav_element.decompose()
-    
-    # 8. Remove text patterns that appear in different orders dynamically
-    # This is aggressive filtering for navigation elements
-    dynamic_nav_patterns = [
-        'SearchClear searchClose searchMain menu',
-        'Google Help', 
-        'Help Center',
-        'Google apps'
-    ]
-    
-    # Split text into lines and filter out navigation patterns
-    text = target_soup.get_text(separator="\n")
+
+def clean_html_with_root(html_content: str, slug: str | None = None) -> tuple[str, bool]:
+    """clean_html() that also reports whether a content root was found."""
+    rules = load_extraction_rules().for_slug(slug)
+
+    # All noise-element rules run in one precompiled pass (see html_cleaner.py)
+    text, root_found = extract_content(html_content, rules.cleaning, parser=CLEAN_HTML_PARSER)
     lines = [" ".join(part.strip() for part in line.split()) for line in text.splitlines()]
 
     filtered_lines = lines_without_noise(lines, slug)
 
-    if slug and (slug.startswith('meta-') or slug.startswith('twitch-')):
+    if rules.trim_leading_navigation:
         filtered_lines = trim_leading_navigation(filtered_lines, slug)
 
     if not filtered_lines:
         # Fallback to raw text when filters are overly aggressive
-        return text.strip()
+        return text.strip(), root_found
+
+    return "\n".join(filtered_lines), root_found
+
+async def fetch_with_retries(url: str, slug: str, renderer: str, engine: FetchEngine,
+                             browser_pool: BrowserPool, http_client: httpx.AsyncClient,
+                             platform_rules, result: dict,
+                             max_bytes: int = DEFAULT_MAX_BYTES, escalate_blocked: bool = False) -> FetchedPage | None:
+    """Fetch one page with one renderer and smart retries, recording failures and metrics in ``result``.
+
+    With ``escalate_blocked``, an error response that looks like a bot wall
+    is not retried or recorded as a failure; its reason is left in
+    ``result["blocked"]`` for the caller to switch renderers.
+    """
+    metrics = result.setdefault("metrics", PageMetrics(slug, url))
+    resource_policy = platform_rules.resource_policy if BLOCK_BROWSER_RESOURCES else None
+
+    validators = None
+    if renderer != "playwright" and snapshot_exists(SNAPSHOTS_DIR / slug):
+        # Only revalidate when we still hold the snapshot a 304 would refer to
+        validators = load_http_validators(SNAPSHOTS_DIR / slug)
+
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            queued_at = time.perf_counter()
+            async with engine.slot(url):
+                metrics.add("queue_wait", elapsed_ms(queued_at))
+                with metrics.timed("download"):
+                    if renderer == "playwright":
+                        fetched = await fetch_with_playwright(url, browser_pool, resource_policy,
+                                                              platform_rules.readiness, max_bytes)
+                        if fetched.readiness:
+                            metrics.add("render_wait", fetched.readiness.waited_ms)
+                    else:
+                        fetched = await fetch_with_httpx(url, http_client, validators, max_bytes, metrics.trace)
+                        result["conditional_get"] = "hit" if fetched.not_modified else "miss"
+                metrics.bytes_downloaded += fetched.bytes_downloaded
+                return fetched
+        except Exception as e:
+            error_type = classify_error(e)
+            error_msg = f"Attempt {attempt + 1}/{RETRY_ATTEMPTS} FAILED for {slug}. Error Type: {error_type}. Reason: {e}"
+            print(f"    - {error_msg}", file=sys.stderr)
+
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None:
+                # The whole host backs off, not just this page
+                engine.pause_host(url, min(retry_after, MAX_RETRY_AFTER_SECONDS))
+
+            blocked = blocked_response_reason(response_status(e), error_body(e)) if escalate_blocked else None
+            if blocked:
+                print(f"    - {slug} looks blocked for {renderer} ({blocked}); not retrying", file=sys.stderr)
+                result["blocked"] = blocked
+                return None
+
+            # Smart retry logic - don't retry permanent failures
+            give_up_reason = None
+            if not should_retry(error_type):
+                give_up_reason = f"Not retrying {error_type} - permanent failure"
+            elif attempt == RETRY_ATTEMPTS - 1:
+                give_up_reason = ""
+            elif retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+                give_up_reason = f"Not retrying - Retry-After {retry_after:.0f}s exceeds {MAX_RETRY_AFTER_SECONDS}s"
+            elif not engine.allow_retry():
+                give_up_reason = "Not retrying - retry budget for this run is used up"
+
+            if give_up_reason is not None:
+                if give_up_reason:
+                    print(f"    - {give_up_reason}", file=sys.stderr)
+                result["failures"].append({
+                    "url": url,
+                    "platform": slug,
+                    "reason": str(e),
+                    "error_type": error_type,
+                    "attempts": attempt + 1
+                })
+                result["errors"].append(error_msg)
+                return None
+
+            delay = retry_after if retry_after is not None else backoff_delay(
+                attempt, RETRY_DELAY_SECONDS, DEFAULT_BACKOFF_CAP_SECONDS)
+            print(f"    - Retrying {slug} in {delay:.1f}s", file=sys.stderr)
+            metrics.retries += 1
+            with metrics.timed("retry_wait"):
+                await asyncio.sleep(delay)
+    return None
+
+
+async def fetch_page_content(page_data: dict, engine: FetchEngine, browser_pool: BrowserPool,
+                             http_client: httpx.AsyncClient,
+                             renderer_cache: RendererCache | None = None) -> dict:
+    """Fetch one page with smart retries, holding an engine slot only while a request is in flight.
+
+    Pages with ``"renderer": "auto"`` (or all pages with ADAPTIVE_RENDERER=1)
+    try httpx first and escalate to Playwright when the response is a bot
+    wall (also one served as a 403/429/503 error) or empty; the working
+    renderer is remembered in ``renderer_cache``.
+    """
+    url = page_data["url"]
+    slug = page_data["slug"]
+    renderer = page_data.get("renderer", HTTPX)
+    platform_rules = load_extraction_rules().for_slug(slug)
+    max_bytes = page_data.get("max_bytes") or FETCH_MAX_BYTES
+
+    result = {"fetched": None, "failures": [], "errors": [], "conditional_get": None, "renderer": renderer,
+              "metrics": PageMetrics(slug, url, page_data.get("platform", "unknown"))}
+
+    adaptive = renderer_cache is not None and (renderer == AUTO or ADAPTIVE_RENDERER)
+    if adaptive:
+        renderer = renderer_cache.get(slug) or HTTPX
+        print(f"  - Adaptive renderer: trying {renderer} for {slug}")
+    elif renderer == AUTO:
+        renderer = HTTPX
+
+    fetched = await fetch_with_retries(url, slug, renderer, engine, browser_pool, http_client,
+                                       platform_rules, result, max_bytes,
+                                       escalate_blocked=adaptive and renderer == HTTPX)
+
+    if adaptive and renderer == HTTPX and (fetched or result.get("blocked")):
+        reason = result.pop("blocked", None)
+        if fetched and fetched.content is not None:
+            # Cleaning is CPU-bound; the cleaned text is reused when the page is processed
+            with result["metrics"].timed("clean"):
+                fetched.cleaned, root_found = await asyncio.to_thread(clean_html_with_root, fetched.content, slug)
+            reason = unusable_content_reason(fetched.content, fetched.cleaned, root_found,
+                                             platform_rules.min_text_chars, platform_rules.expect_content_root)
+        if reason:
+            print(f"  - Escalating {slug} to playwright: {reason}")
+            renderer_cache.remember(slug, PLAYWRIGHT, reason)
+            renderer = PLAYWRIGHT
+            result["conditional_get"] = None
+            fetched = await fetch_with_retries(url, slug, renderer, engine, browser_pool, http_client,
+                                               platform_rules, result, max_bytes)
+        else:
+            renderer_cache.remember(slug, HTTPX)
+
+    result["fetched"] = fetched
+    result["renderer"] = result["metrics"].renderer = renderer
+    return result
+
+
+def content_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_clean_fingerprint(slug_dir: Path) -> dict:
+    """Load the cleaned-content fingerprint stored next to a snapshot, if any."""
+    fingerprint_path = slug_dir / FINGERPRINT_FILENAME
+    if not fingerprint_path.exists():
+        return {}
+    try:
+        data = json.loads(fingerprint_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as exc:
+        print(f"    - WARNING: Ignoring unreadable fingerprint at {fingerprint_path}: {exc}", file=sys.stderr)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_clean_fingerprint(slug_dir: Path, raw_sha256: str, clean_sha256: str) -> None:
+    """Record which cleaned text the stored snapshot produces under the current cleaner."""
+    fingerprint = {
+        "cleaner_version": CLEANER_VERSION,
+        "parser": CLEAN_HTML_PARSER,
+        # Snapshot directories are named after their slug
+        "rules": load_extraction_rules().for_slug(slug_dir.name).digest,
+        "raw_sha256": raw_sha256,
+        "clean_sha256": clean_sha256,
+    }
+    if load_clean_fingerprint(slug_dir) == fingerprint:
+        return
+    (slug_dir / FINGERPRINT_FILENAME).write_text(json.dumps(fingerprint, indent=2), encoding="utf-8")
+
+
+def stored_clean_sha256(slug: str, slug_dir: Path, old_content: str) -> str:
+    """Hash of the stored snapshot's cleaned text, re-cleaning only when the index is stale.
+
+    The fingerprint is trusted only if it was produced by the current
+    CLEANER_VERSION, parser backend and platform rules for exactly the HTML
+    on disk.
+    """
+    old_raw_sha256 = content_sha256(old_content)
+    fingerprint = load_clean_fingerprint(slug_dir)
+    if (fingerprint.get("cleaner_version") == CLEANER_VERSION
+            and fingerprint.get("parser", DEFAULT_PARSER) == CLEAN_HTML_PARSER
+            and fingerprint.get("rules") == load_extraction_rules().for_slug(slug).digest
+            and fingerprint.get("raw_sha256") == old_raw_sha256
+            and fingerprint.get("clean_sha256")):
+        return fingerprint["clean_sha256"]
+
+    clean_sha256 = content_sha256(clean_html(old_content, slug))
+    save_clean_fingerprint(slug_dir, old_raw_sha256, clean_sha256)
+    return clean_sha256
+
+
+def canonical_snapshot_html(slug: str, html: str, cleaned: str) -> tuple[str, str | None]:
+    """Canonicalized ``html`` to store, or the raw HTML plus the difference when clean_html() output would change."""
+    return verified_canonical_html(
+        html, cleaned, lambda canonical: clean_html(canonical, slug),
+        keep_attributes=referenced_attributes(load_extraction_rules()), parser=CLEAN_HTML_PARSER,
+    )
+
+
+def snapshot_html_to_store(slug: str, content: str, cleaned: str, canonicalize: bool) -> str:
+    if not canonicalize:
+        return content
+    stored, difference = canonical_snapshot_html(slug, content, cleaned)
+    if difference:
+        print(f"    - WARNING: Canonicalization would change cleaned text for {slug} ({difference}); "
+              f"storing raw HTML.", file=sys.stderr)
+    return stored
+
+
+def process_fetched_page(slug: str, url: str, content: str, validators: dict | None = None,
+                         cleaned_new: str | None = None, canonicalize: bool = False,
+                         metrics: PageMetrics | None = None) -> dict:
+    """Compare freshly fetched content with the stored snapshot and persist changes.
+
+    ``validators`` are the HTTP cache validators of the response (httpx
+    renderer only); they are stored once the snapshot is up to date.
+    ``cleaned_new`` is clean_html(content) when the caller already has it.
+    ``canonicalize`` stores canonicalized HTML (see html_canonicalizer.py).
+    Clean, compare and write times and the snapshot bytes written are added
+    to ``metrics``.
+    """
+    outcome = {"changed": False, "failure": None}
+    metrics = metrics or PageMetrics(slug, url)
+    try:
+        slug_dir = SNAPSHOTS_DIR / slug
+        slug_dir.mkdir(parents=True, exist_ok=True)
+
+        is_new_policy = not snapshot_exists(slug_dir)
+        if cleaned_new is None:
+            with metrics.timed("clean"):
+                cleaned_new = clean_html(content, slug)
+        cleaned_new_sha256 = content_sha256(cleaned_new)
+
+        if is_new_policy:
+            with metrics.timed("write"):
+                stored = snapshot_html_to_store(slug, content, cleaned_new, canonicalize)
+                output_path = write_snapshot(slug_dir, stored, SNAPSHOT_COMPRESSION)
+                save_clean_fingerprint(slug_dir, content_sha256(stored), cleaned_new_sha256)
+            metrics.bytes_written += output_path.stat().st_size
+            metrics.status = "new"
+            print(f"  - NEW: Saved initial snapshot for {slug} at {output_path}")
+        else:
+            with metrics.timed("compare"):
+                old_content = read_snapshot(slug_dir)
+
+            # Debug mode: Save raw HTML files for comparison if DEBUG_FETCH is set
+            if os.environ.get("DEBUG_FETCH"):
+                cleaned_old = clean_html(old_content, slug)
+                debug_dir = Path("/tmp")
+                debug_dir.mkdir(exist_ok=True)
+                (debug_dir / f"{slug}_fetch1.html").write_text(old_content, encoding="utf-8")
+                (debug_dir / f"{slug}_fetch2.html").write_text(content, encoding="utf-8")
+                (debug_dir / f"{slug}_cleaned1.txt").write_text(cleaned_old, encoding="utf-8")
+                (debug_dir / f"{slug}_cleaned2.txt").write_text(cleaned_new, encoding="utf-8")
+                print(f"  - DEBUG: Saved files to /tmp/{slug}_fetch*.html and /tmp/{slug}_cleaned*.txt")
+                print(f"  - DEBUG: cleaned_old length: {len(cleaned_old)}, cleaned_new length: {len(cleaned_new)}")
+                print(f"  - DEBUG: cleaned_old == cleaned_new: {cleaned_old == cleaned_new}")
+
+            # Compare cleaned content via the fingerprint index; the old
+            # snapshot is only re-parsed when its fingerprint is stale.
+            with metrics.timed("compare"):
+                unchanged = stored_clean_sha256(slug, slug_dir, old_content) == cleaned_new_sha256
+            if unchanged:
+                print(f"  - NO CHANGE: Content for '{slug}' is unchanged.")
+            else:
+                # Overwrite the file only if the cleaned content is different
+                with metrics.timed("write"):
+                    stored = snapshot_html_to_store(slug, content, cleaned_new, canonicalize)
+                    output_path = write_snapshot(slug_dir, stored, SNAPSHOT_COMPRESSION)
+                    save_clean_fingerprint(slug_dir, content_sha256(stored), cleaned_new_sha256)
+                metrics.bytes_written += output_path.stat().st_size
+                outcome["changed"] = True
+                print(f"  - SUCCESS: Snapshot updated for {slug} at {output_path}")
+
+        with metrics.timed("write"):
+            export_clean_snapshot_if_enabled(slug, cleaned_new, slug_dir)
+            if validators is not None:
+                save_http_validators(slug_dir, url, validators)
+    except Exception as e:
+        print(f"    - CRITICAL: Failed to write file for {url}. Reason: {e}", file=sys.stderr)
+        outcome["failure"] = {"url": url, "platform": slug, "reason": f"File write error: {e}"}
+
+    return outcome
+
+
+async def run_fetch_cycle(pages_to_track: list[dict], http_client: httpx.AsyncClient | None = None,
+                          browser_pool: BrowserPool | None = None) -> list[dict]:
+    """Fetch and process every configured page concurrently.
+
+    Returns one result dict per page, in configuration order, with the
+    page's fetch failures, error messages and whether its snapshot changed.
+    An unexpected error while handling one page becomes that page's failure;
+    the other pages still run. Pools that aren't passed in are opened for
+    this cycle only.
+    """
+    engine = FetchEngine(MAX_CONCURRENT_FETCHES, PER_HOST_CONCURRENT_FETCHES,
+                         HostRateLimiter(FETCH_HOST_REQUESTS_PER_MINUTE, FETCH_HOST_BURST),
+                         RetryBudget(FETCH_RETRY_BUDGET))
+    print(f"Fetch engine: up to {engine.max_concurrency} concurrent fetches, "
+          f"{engine.per_host_concurrency} per host, {FETCH_HOST_REQUESTS_PER_MINUTE} requests/min per host "
+          f"(bursts of {FETCH_HOST_BURST}), {FETCH_RETRY_BUDGET} retries per run.")
+
+    async def handle_page(page_data: dict) -> dict:
+        url = page_data["url"]
+        slug = page_data["slug"]
+        print(f"\n[INFO] Processing '{slug}'...")
+        print(f"  - URL: {url}")
+        print(f"  - Renderer: {page_data.get('renderer', 'httpx')}")
+
+        result = await fetch_page_content(page_data, engine, browser_pool, http_client, renderer_cache)
+        result["changed"] = False
+        fetched = result.pop("fetched")
+        metrics = result["metrics"]
+        result["readiness"] = fetched.readiness if fetched else None
+        if fetched and fetched.not_modified:
+            # 304: the stored snapshot is still current, nothing to parse
+            print(f"  - NO CHANGE: Content for '{slug}' is unchanged (304 Not Modified).")
+            metrics.status = "not_modified"
+            with metrics.timed("write"):
+                save_http_validators(SNAPSHOTS_DIR / slug, url, fetched.validators)
+            if cassette is not None:
+                # Revalidated pages are recorded too, or a cassette would only hold changed pages
+                cassette.record(url, read_snapshot(SNAPSHOTS_DIR / slug), fetched.validators, result["renderer"])
+        elif fetched and fetched.content:
+            # Cleaning is CPU-bound; keep it off the event loop so other
+            # fetches keep making progress.
+            validators = fetched.validators if result["conditional_get"] else None
+            canonicalize = bool(page_data.get("canonicalize", CANONICALIZE_SNAPSHOTS))
+            outcome = await asyncio.to_thread(process_fetched_page, slug, url, fetched.content, validators,
+                                              fetched.cleaned, canonicalize, metrics)
+            result["changed"] = outcome["changed"]
+            if outcome["failure"]:
+                result["failures"].append(outcome["failure"])
+            elif outcome["changed"]:
+                metrics.status = "changed"
+            if cassette is not None:
+                cassette.record(url, fetched.content, fetched.validators, result["renderer"])
+        if result["failures"]:
+            metrics.status = "failed"
+        return result
+
+    async def handle_page_isolated(page_data: dict) -> dict:
+        """handle_page(), recording an unexpected error as the page's failure instead of ending the run."""
+        try:
+            return await handle_page(page_data)
+        except Exception as e:
+            url, slug = page_data["url"], page_data["slug"]
+            error_msg = f"Unexpected error while processing {slug}: {type(e).__name__}: {e}"
+            print(f"    - {error_msg}", file=sys.stderr)
+            metrics = PageMetrics(slug, url, page_data.get("platform", "unknown"))
+            metrics.status = "failed"
+            return {"changed": False, "conditional_get": None, "readiness": None,
+                    "renderer": page_data.get("renderer", HTTPX), "metrics": metrics, "errors": [error_msg],
+                    "failures": [{"url": url, "platform": slug, "reason": str(e),
+                                  "error_type": classify_error(e), "attempts": 1}]}
+
+    print(f"HTTP client: shared keep-alive pool, HTTP/2 {'enabled' if http2_available() else 'unavailable (install httpx[http2])'}.")
+
+    renderer_cache = RendererCache(SNAPSHOTS_DIR / RENDERER_CACHE_FILENAME, RENDERER_CACHE_TTL_HOURS).load()
+    cassette = Cassette(Path(FETCH_RECORD_DIR)).load() if FETCH_RECORD_DIR else None
+    if cassette is not None:
+        print(f"Recording fetched pages into {FETCH_RECORD_DIR}.")
+    if URL_REWRITE_PREFIX:
+        print(f"Replaying: requests go to {URL_REWRITE_PREFIX} instead of the live sites.")
+
+    # The pool launches Chromium lazily, so httpx-only runs never start a browser.
+    async with AsyncExitStack() as stack:
+        if http_client is None:
+            http_client = await stack.enter_async_context(create_async_client(USER_AGENT))
+        if browser_pool is None:
+            browser_pool = await stack.enter_async_context(
+                BrowserPool(BROWSER_POOL_SIZE, BROWSER_CONTEXT_MAX_NAVIGATIONS, user_agent=USER_AGENT))
+        results = await engine.map(pages_to_track, handle_page_isolated)
+        renderer_cache.save()
+        if cassette is not None:
+            cassette.save()
+        if engine.rate_limiter.waited_seconds or engine.retry_budget.used:
+            print(f"\nPacing: {engine.rate_limiter.waited_seconds:.1f}s spent waiting for host rate limits, "
+                  f"{engine.retry_budget.used}/{engine.retry_budget.total} retries used.")
+        if browser_pool.browser_launches:
+            print(f"\nBrowser pool: {browser_pool.browser_launches} browser launch(es), "
+                  f"{browser_pool.contexts_created} context(s) created, "
+                  f"{browser_pool.requests_blocked} subresource request(s) blocked.")
+        return results
+
+
+def record_readiness_wait(summary: dict, platform: str, ready: ReadinessResult) -> None:
+    """Fold one page's Playwright readiness wait into the per-platform run log summary."""
+    stats = summary.setdefault(platform, {"pages": 0, "total_wait_ms": 0, "max_wait_ms": 0, "deadline_hits": 0})
+    stats["pages"] += 1
+    stats["total_wait_ms"] += ready.waited_ms
+    stats["max_wait_ms"] = max(stats["max_wait_ms"], ready.waited_ms)
+    stats["deadline_hits"] += int(ready.hit_deadline)
+    stats["avg_wait_ms"] = stats["total_wait_ms"] // stats["pages"]
+
+
+def load_run_log(run_log_file: Path | None = None) -> list[dict]:
+    run_log_file = run_log_file or RUN_LOG_FILE
+    if not run_log_file.exists():
+        return []
+    try:
+        with open(run_log_file, "r") as f:
+            run_log = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return []
+    return run_log if isinstance(run_log, list) else []
+
 
-    return "\n".join(filtered_lines)
+def load_poll_schedule(pages: list[dict]) -> PollSchedule:
+    """The polling schedule, with stats for new slugs seeded from history manifests and the run log."""
+    schedule = PollSchedule(SNAPSHOTS_DIR / SCHEDULE_FILENAME, POLL_MIN_INTERVAL_HOURS,
+                            POLL_MAX_INTERVAL_HOURS).load()
+    watched_since = run_log_start(load_run_log())
+    history_dir = SNAPSHOTS_DIR / HISTORY_SUBDIR_NAME
+    for page in pages:
+        slug = page["slug"]
+        if slug not in schedule.entries:
+            change_times = history_change_times(history_dir / slug / CHAIN_FILENAME,
+                                                history_dir / slug / HISTORY_MANIFEST_FILENAME)
+            schedule.seed(slug, change_times, watched_since)
+    return schedule
+
+
+def append_run_log(run_log_entry: dict) -> None:
+    # Add new entry at the beginning and keep only the last 25 entries
+    run_log = load_run_log()
+    run_log.insert(0, run_log_entry)
+    run_log = run_log[:RUN_LOG_MAX_ENTRIES]
+
+    with open(RUN_LOG_FILE, "w") as f:
+        json.dump(run_log, f, indent=2)
+
+
+def write_failure_log(failures: list[dict]) -> None:
+    if failures:
+        print(f"\n--- Fetch completed with {len(failures)} failures. ---", file=sys.stderr)
+        with open(FAILURE_LOG_FILE, "w") as f:
+            for failure in failures:
+                f.write(json.dumps(failure) + "\n")
+        print(f"Failure details written to {FAILURE_LOG_FILE}")
+    else:
+        print("\n--- Fetch completed successfully with 0 failures. ---")
+        if FAILURE_LOG_FILE.exists():
+            os.remove(FAILURE_LOG_FILE)
+
+
+def load_url_health() -> dict:
+    try:
+        with open(URL_HEALTH_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, IOError):
+        return {}
+
+
+def load_shard_health() -> dict:
+    """The health data shards are balanced on: url_health.json as committed, so every runner agrees."""
+    committed = committed_health_db(URL_HEALTH_FILE)
+    if committed is not None:
+        return committed
+    print(f"    - WARNING: No committed {URL_HEALTH_FILE}; balancing shards on the working copy, "
+          f"which other shards may not share.", file=sys.stderr)
+    return load_url_health()
+
+
+def write_partial_run_log(shard: tuple[int, int], slugs: list[str], run_log_entry: dict,
+                          failures: list[dict], page_metrics: list[dict] | None = None,
+                          pages: list[str] | None = None) -> Path:
+    """Shard output for ``sharding.py merge``, in place of run_log.json and failures.log.
+
+    The per-page metrics records are kept so the merge can compute run-wide
+    percentiles, and the configured ``pages`` so it can check the shards
+    split them without overlaps or gaps.
+    """
+    index, count = shard
+    path = RUN_LOG_FILE.with_name(partial_run_log_name(index, count))
+    partial = {"shard": f"{index}/{count}", "pages": pages or [], "slugs": slugs, "run": run_log_entry,
+               "failures": failures, "page_metrics": page_metrics or []}
+    with open(path, "w") as f:
+        json.dump(partial, f, indent=2)
+    return path
+
+
+def shard_spec(value: str) -> tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ShardError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fetch tracked policy pages and record changes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes for cleaning snapshots in history export-only mode "
+                             "(default: HISTORY_EXPORT_WORKERS or the CPU count)")
+    parser.add_argument("--all", action="store_true",
+                        help="Fetch every page this run, even those ADAPTIVE_POLLING would defer")
+    parser.add_argument("--shard", type=shard_spec, default=None, metavar="i/N",
+                        help="Fetch only shard i of N (balanced by the committed url_health.json response "
+                             "times) and write a partial run log for sharding.py merge")
+    return parser.parse_args(argv)
+
+
+async def fetch_and_record(pages_to_track: list[dict], fetch_all: bool = False, shard: tuple[int, int] | None = None,
+                           http_client: httpx.AsyncClient | None = None,
+                           browser_pool: BrowserPool | None = None) -> dict:
+    """Fetch the due pages of ``pages_to_track`` and record the run; returns the run log entry.
+
+    ``http_client`` and ``browser_pool`` are reused when given (the watcher
+    daemon keeps them warm between runs) instead of being opened for this run.
+    """
+    # Track run statistics
+    run_start_time = datetime.now(UTC)
+    pages_checked = 0
+    changes_found = 0
+    errors = []
+    failures = []
 
-def main():
+    configured_slugs = [page_data["slug"] for page_data in pages_to_track]
+    if shard:
+        index, count = shard
+        pages_to_track = select_shard(pages_to_track, index, count, load_shard_health())
+        print(f"Shard {index}/{count}: {len(pages_to_track)} page(s).")
+    shard_slugs = [page_data["slug"] for page_data in pages_to_track]
+
+    schedule = None
+    deferred_pages = []
+    if ADAPTIVE_POLLING:
+        schedule = load_poll_schedule(pages_to_track)
+        if not fetch_all:
+            pages_to_track, deferred_pages = schedule.split(pages_to_track)
+        print(f"Adaptive polling: {len(pages_to_track)} page(s) due, {len(deferred_pages)} deferred.")
+        for page_data in deferred_pages:
+            next_due = schedule.next_due(page_data["slug"])
+            print(f"  - Deferred '{page_data['slug']}' until {next_due.strftime('%Y-%m-%d %H:%M UTC')}")
+
+    cycle_start = time.perf_counter()
+    page_results = await run_fetch_cycle(pages_to_track, http_client, browser_pool) if pages_to_track else []
+    cycle_ms = elapsed_ms(cycle_start)
+
+    conditional_get = {"hits": 0, "misses": 0}
+    readiness_waits = {}
+    renderers_used = {}
+    for page_data, page_result in zip(pages_to_track, page_results):
+        pages_checked += 1
+        failures.extend(page_result["failures"])
+        errors.extend(page_result["errors"])
+        if page_result["changed"]:
+            changes_found += 1
+        if page_result["conditional_get"] == "hit":
+            conditional_get["hits"] += 1
+        elif page_result["conditional_get"] == "miss":
+            conditional_get["misses"] += 1
+        renderers_used[page_result["renderer"]] = renderers_used.get(page_result["renderer"], 0) + 1
+        if page_result["readiness"]:
+            record_readiness_wait(readiness_waits, page_data.get("platform", "unknown"), page_result["readiness"])
+        # Failed pages keep their past due time, so the next run retries them
+        if schedule is not None and not page_result["failures"]:
+            schedule.record(page_data["slug"], page_result["changed"])
+
+    if schedule is not None:
+        schedule.save()
+
+    page_metrics = [page_result["metrics"].to_dict() for page_result in page_results if page_result.get("metrics")]
+    metrics_summary = summarize(page_metrics, cycle_ms)
+    if page_metrics:
+        print()
+        for line in format_summary(metrics_summary):
+            print(line)
+
+    # Create run log entry
+    run_log_entry = {
+        "timestamp_utc": run_start_time.isoformat().replace('+00:00', 'Z'),
+        "status": "success" if not failures else "partial_failure",
+        "pages_checked": pages_checked,
+        "changes_found": changes_found,
+        "errors": errors,
+        "conditional_get": conditional_get,
+        "readiness_waits": readiness_waits,
+        "renderers": renderers_used,
+        "metrics": metrics_summary
+    }
+    if schedule is not None:
+        run_log_entry["schedule"] = {"due": len(pages_to_track), "deferred": len(deferred_pages)}
+
+    if FETCH_METRICS_FILE and page_metrics:
+        try:
+            write_metrics_file(Path(FETCH_METRICS_FILE), page_metrics, metrics_summary,
+                               run_log_entry["timestamp_utc"], run_start_time.timestamp())
+            print(f"Per-page metrics written to {FETCH_METRICS_FILE}")
+        except OSError as e:
+            print(f"    - WARNING: Failed to write metrics to {FETCH_METRICS_FILE}: {e}", file=sys.stderr)
+
+    if shard:
+        path = write_partial_run_log(shard, shard_slugs, run_log_entry, failures, page_metrics, configured_slugs)
+        print(f"\n--- Shard output written to {path}: {pages_checked} pages checked, "
+              f"{changes_found} changes found, {len(failures)} failures ---")
+        return run_log_entry
+
+    try:
+        append_run_log(run_log_entry)
+        print(f"\n--- Run Log Updated: {pages_checked} pages checked, {changes_found} changes found ---")
+    except Exception as e:
+        print(f"WARNING: Failed to update run log: {e}", file=sys.stderr)
+
+    write_failure_log(failures)
+    return run_log_entry
+
+
+def main(argv: list[str] | None = None):
     """Main function to orchestrate the fetching process."""
+    args = parse_args(argv)
     print("--- Starting Fetcher Script ---")
+
+    # Validate and compile the per-platform extraction rules once, up front
+    try:
+        load_extraction_rules()
+    except ExtractionRulesError as e:
+        print(f"FATAL: {e}", file=sys.stderr)
+        sys.exit(1)
+
     if HISTORY_EXPORT_ENABLED:
         print("History export enabled: clean artifacts will be written alongside snapshots.")
 
     if HISTORY_EXPORT_ONLY_MODE:
         print("History export-only flag detected; skipping network fetch and exporting existing snapshots.")
-        run_history_export_only_mode()
+        run_history_export_only_mode(args.workers)
         return
     
-    # Track run statistics
-    run_start_time = datetime.now(UTC)
-    pages_checked = 0
-    changes_found = 0
-    errors = []
-    
     # CRITICAL: Check if config file exists
     if not URL_CONFIG_FILE.is_file():
         print(f"FATAL: Configuration file not found at '{URL_CONFIG_FILE}'. Make sure it's in the root directory.", file=sys.stderr)
@@ -575,144 +1405,7 @@ def main():
         sys.exit(0)
 
     print(f"Successfully loaded {len(pages_to_track)} pages from config.")
-    failures = []
-
-    for page_data in pages_to_track:
-        url = page_data["url"]
-        slug = page_data["slug"]
-        renderer = page_data.get("renderer", "httpx")
-        
-        print(f"\n[INFO] Processing '{slug}'...")
-        print(f"  - URL: {url}")
-        print(f"  - Renderer: {renderer}")
-        
-        pages_checked += 1
-
-        content = None
-        error_type = None
-        for attempt in range(RETRY_ATTEMPTS):
-            try:
-                if renderer == "playwright":
-                    content = fetch_with_playwright(url)
-                else:
-                    content = fetch_with_httpx(url)
-                break 
-            except Exception as e:
-                error_type = classify_error(e)
-                error_msg = f"Attempt {attempt + 1}/{RETRY_ATTEMPTS} FAILED for {slug}. Error Type: {error_type}. Reason: {e}"
-                print(f"    - {error_msg}", file=sys.stderr)
-                
-                # Smart retry logic - don't retry permanent failures
-                if not should_retry(error_type):
-                    print(f"    - Not retrying {error_type} - permanent failure", file=sys.stderr)
-                    failures.append({
-                        "url": url, 
-                        "platform": slug, 
-                        "reason": str(e),
-                        "error_type": error_type,
-                        "attempts": attempt + 1
-                    })
-                    errors.append(error_msg)
-                    break
-                elif attempt < RETRY_ATTEMPTS - 1:
-                    time.sleep(RETRY_DELAY_SECONDS)
-                else:
-                    failures.append({
-                        "url": url, 
-                        "platform": slug, 
-                        "reason": str(e),
-                        "error_type": error_type,
-                        "attempts": RETRY_ATTEMPTS
-                    })
-                    errors.append(error_msg)
-
-        if content:
-            try:
-                output_path = SNAPSHOTS_DIR / slug / "snapshot.html"
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-
-                is_new_policy = not output_path.exists()
-                cleaned_new = clean_html(content, slug)
-
-                if is_new_policy:
-                    output_path.write_text(content, encoding="utf-8")
-                    print(f"  - NEW: Saved initial snapshot for {slug} at {output_path}")
-                else:
-                    old_content = output_path.read_text(encoding="utf-8")
-                    cleaned_old = clean_html(old_content, slug)
-
-                    # Debug mode: Save raw HTML files for comparison if DEBUG_FETCH is set
-                    if os.environ.get("DEBUG_FETCH"):
-                        debug_dir = Path("/tmp")
-                        debug_dir.mkdir(exist_ok=True)
-                        (debug_dir / f"{slug}_fetch1.html").write_text(old_content, encoding="utf-8")
-                        (debug_dir / f"{slug}_fetch2.html").write_text(content, encoding="utf-8")
-                        (debug_dir / f"{slug}_cleaned1.txt").write_text(cleaned_old, encoding="utf-8")
-                        (debug_dir / f"{slug}_cleaned2.txt").write_text(cleaned_new, encoding="utf-8")
-                        print(f"  - DEBUG: Saved files to /tmp/{slug}_fetch*.html and /tmp/{slug}_cleaned*.txt")
-
-                    # Compare cleaned content
-                    if os.environ.get("DEBUG_FETCH"):
-                        print(f"  - DEBUG: cleaned_old length: {len(cleaned_old)}, cleaned_new length: {len(cleaned_new)}")
-                        print(f"  - DEBUG: cleaned_old == cleaned_new: {cleaned_old == cleaned_new}")
-                    
-                    if cleaned_old == cleaned_new:
-                        print(f"  - NO CHANGE: Content for '{slug}' is unchanged.")
-                    else:
-                        # Overwrite the file only if the cleaned content is different
-                        output_path.write_text(content, encoding="utf-8")
-                        changes_found += 1
-                        print(f"  - SUCCESS: Snapshot updated for {slug} at {output_path}")
-
-                export_clean_snapshot_if_enabled(slug, cleaned_new, output_path.parent)
-            except Exception as e:
-                print(f"    - CRITICAL: Failed to write file for {url}. Reason: {e}", file=sys.stderr)
-                failures.append({"url": url, "platform": slug, "reason": f"File write error: {e}"})
-
-    # Create run log entry
-    try:
-        run_log_entry = {
-            "timestamp_utc": run_start_time.isoformat().replace('+00:00', 'Z'),
-            "status": "success" if not failures else "partial_failure",
-            "pages_checked": pages_checked,
-            "changes_found": changes_found,
-            "errors": errors
-        }
-        
-        # Load existing run log or create new one
-        run_log_file = Path("run_log.json")
-        if run_log_file.exists():
-            try:
-                with open(run_log_file, "r") as f:
-                    run_log = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                run_log = []
-        else:
-            run_log = []
-        
-        # Add new entry at the beginning and keep only the last 25 entries
-        run_log.insert(0, run_log_entry)
-        run_log = run_log[:25]
-        
-        # Write updated run log
-        with open(run_log_file, "w") as f:
-            json.dump(run_log, f, indent=2)
-        
-        print(f"\n--- Run Log Updated: {pages_checked} pages checked, {changes_found} changes found ---")
-    
-    except Exception as e:
-        print(f"WARNING: Failed to update run log: {e}", file=sys.stderr)
-        
-    if failures:
-        print(f"\n--- Fetch completed with {len(failures)} failures. ---", file=sys.stderr)
-        with open(FAILURE_LOG_FILE, "w") as f:
-            for failure in failures:
-                f.write(json.dumps(failure) + "\n")
-        print(f"Failure details written to {FAILURE_LOG_FILE}")
-    else:
-        print("\n--- Fetch completed successfully with 0 failures. ---")
-        if FAILURE_LOG_FILE.exists():
-            os.remove(FAILURE_LOG_FILE)
+    asyncio.run(fetch_and_record(pages_to_track, fetch_all=args.all, shard=args.shard))
 
 if __name__ == "__main__":
     main()
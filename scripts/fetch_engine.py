@@ -0,0 +1,86 @@
+"""
+Concurrent fetch engine for the T&S Policy Watcher.
+
+Runs page fetches on a single asyncio event loop instead of walking
+platform_urls.json one page at a time.
+
+- Global concurrency cap so a run never opens more than N fetches at once
+- Per-host cap so hosts with many tracked pages (help.whatnot.com,
+  legal.twitch.com) are not hit in bursts
+- Per-host request pacing (token buckets, Retry-After pauses) and a
+  per-run retry budget, see rate_limiter.py
+- Results are returned in configuration order, so run logs and failure
+  logs stay deterministic regardless of completion order
+
+The engine knows nothing about renderers or snapshots; fetch.py supplies a
+worker coroutine per page and acquires host slots around each network
+attempt.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar
+from urllib.parse import urlparse
+
+from rate_limiter import HostRateLimiter, RetryBudget
+
+DEFAULT_MAX_CONCURRENCY = 6
+DEFAULT_PER_HOST_CONCURRENCY = 2
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def host_key(url: str) -> str:
+    """Return the hostname used to bucket a URL for per-host limits."""
+    return (urlparse(url).hostname or "").lower()
+
+
+class FetchEngine:
+    """Bounded asyncio runner with global and per-host concurrency limits."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 retry_budget: Optional[RetryBudget] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.rate_limiter = rate_limiter
+        self.retry_budget = retry_budget
+        self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        key = host_key(url)
+        semaphore = self._host_slots.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_slots[key] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one global slot and one slot for the URL's host.
+
+        The host slot is taken first so a busy host queues its own pages
+        without starving the global pool for other hosts; the host's rate
+        limit is waited out before taking a global slot for the same reason.
+        """
+        async with self._host_semaphore(url):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(host_key(url))
+            async with self._global_slots:
+                yield
+
+    def pause_host(self, url: str, seconds: float) -> None:
+        """Hold back every request to the URL's host (Retry-After)."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.pause(host_key(url), seconds)
+
+    def allow_retry(self) -> bool:
+        """Spend one retry from the run's budget; False once it is used up."""
+        return self.retry_budget is None or self.retry_budget.try_spend()
+
+    async def map(self, items: Iterable[T], worker: Callable[[T], Awaitable[R]]) -> List[R]:
+        """Run ``worker`` for every item concurrently; results keep input order."""
+        return await asyncio.gather(*(worker(item) for item in items))
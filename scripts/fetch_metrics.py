@@ -0,0 +1,210 @@
+"""
+Per-page fetch instrumentation for the T&S Policy Watcher.
+
+The run log only recorded how many pages were checked and changed, so a
+slow run gave no hint which URLs or stages were to blame. Every fetched
+page now records:
+
+- Stage timings in ms: ``queue_wait`` (engine slot: host cap, rate limit,
+  global cap), ``connect`` (DNS, TCP and TLS; only when a new connection is
+  opened), ``download`` (request to last body byte, or the Playwright
+  navigation), ``render_wait`` (Playwright readiness wait), ``retry_wait``,
+  ``clean``, ``compare`` and ``write``
+- Bytes downloaded (bytes on the wire for httpx, the rendered DOM for
+  Playwright) and bytes written to the snapshot directory
+- The renderer that produced the page and its retry count
+
+The run log entry gets a ``metrics`` summary: p50/p90/p99/max per stage,
+byte totals and the slowest pages. The per-page records go to
+FETCH_METRICS_FILE (default ``fetch_metrics.jsonl``), appended as JSON
+lines, or rewritten as a Prometheus textfile when the name ends in
+``.prom``.
+"""
+
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_METRICS_FILE = "fetch_metrics.jsonl"
+STAGES = ("queue_wait", "connect", "download", "render_wait", "retry_wait", "clean", "compare", "write")
+PERCENTILES = (50, 90, 99)
+SLOWEST_PAGES = 5
+PROMETHEUS_PREFIX = "policy_watcher_fetch"
+
+
+def elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+@dataclass
+class PageMetrics:
+    """Stage timings and byte counts for one page in one run."""
+    slug: str
+    url: str
+    platform: str = "unknown"
+    renderer: Optional[str] = None
+    status: str = "unchanged"  # new, changed, unchanged, not_modified or failed
+    retries: int = 0
+    bytes_downloaded: int = 0
+    bytes_written: int = 0
+    stages_ms: dict = field(default_factory=dict)
+    _connecting: dict = field(default_factory=dict, repr=False)
+
+    def add(self, stage: str, ms: float) -> None:
+        self.stages_ms[stage] = self.stages_ms.get(stage, 0.0) + ms
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time a block as ``stage``, excluding stages recorded inside it (connect, render_wait)."""
+        start = time.perf_counter()
+        inner_before = sum(self.stages_ms.values())
+        try:
+            yield
+        finally:
+            inner = sum(self.stages_ms.values()) - inner_before
+            self.add(stage, max(elapsed_ms(start) - inner, 0.0))
+
+    async def trace(self, event: str, info: dict) -> None:
+        """httpx ``trace`` extension: times connection setup (connect_tcp, start_tls)."""
+        if not event.startswith("connection."):
+            return
+        step, _, phase = event.rpartition(".")
+        if phase == "started":
+            self._connecting[step] = time.perf_counter()
+        elif step in self._connecting:
+            self.add("connect", elapsed_ms(self._connecting.pop(step)))
+
+    def to_dict(self) -> dict:
+        return {
+            "slug": self.slug,
+            "url": self.url,
+            "platform": self.platform,
+            "renderer": self.renderer,
+            "status": self.status,
+            "retries": self.retries,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_written": self.bytes_written,
+            "stages_ms": {stage: round(self.stages_ms[stage], 1) for stage in STAGES if stage in self.stages_ms},
+            "total_ms": round(sum(self.stages_ms.values()), 1),
+        }
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated percentile (0-100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution(values: list[float]) -> dict:
+    stats = {"count": len(values)}
+    for q in PERCENTILES:
+        stats[f"p{q}"] = round(percentile(values, q), 1)
+    stats["max"] = round(max(values), 1)
+    stats["total"] = round(sum(values), 1)
+    return stats
+
+
+def summarize(records: list[dict], wall_ms: Optional[float] = None) -> dict:
+    """Run-level summary of per-page records (PageMetrics.to_dict()).
+
+    A stage's percentiles cover only the pages that went through it, e.g.
+    ``connect`` counts pages that opened a new connection.
+    """
+    summary = {
+        "pages": len(records),
+        "bytes_downloaded": sum(record["bytes_downloaded"] for record in records),
+        "bytes_written": sum(record["bytes_written"] for record in records),
+        "retries": sum(record["retries"] for record in records),
+        "stages_ms": {},
+    }
+    if wall_ms is not None:
+        summary["wall_ms"] = round(wall_ms, 1)
+    if not records:
+        return summary
+
+    for stage in STAGES:
+        values = [record["stages_ms"][stage] for record in records if stage in record["stages_ms"]]
+        if values:
+            summary["stages_ms"][stage] = distribution(values)
+    summary["page_ms"] = distribution([record["total_ms"] for record in records])
+
+    slowest = sorted(records, key=lambda record: (-record["total_ms"], record["slug"]))[:SLOWEST_PAGES]
+    summary["slowest"] = [{
+        "slug": record["slug"],
+        "total_ms": record["total_ms"],
+        "slowest_stage": max(record["stages_ms"], key=record["stages_ms"].get, default=None),
+    } for record in slowest]
+    return summary
+
+
+def format_summary(summary: dict) -> list[str]:
+    """Console lines for the end of a run."""
+    lines = [f"Fetch metrics: {summary['pages']} page(s), {summary['bytes_downloaded']} bytes downloaded, "
+             f"{summary['bytes_written']} bytes written, {summary['retries']} retries."]
+    for stage, stats in summary["stages_ms"].items():
+        lines.append(f"  - {stage:<11} p50 {stats['p50']:>8.1f} ms  p90 {stats['p90']:>8.1f} ms  "
+                     f"max {stats['max']:>8.1f} ms  ({stats['count']} page(s))")
+    for page in summary.get("slowest", []):
+        lines.append(f"  - Slow page: {page['slug']} {page['total_ms']:.0f} ms (mostly {page['slowest_stage']})")
+    return lines
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus_text(records: list[dict], summary: dict, timestamp: float) -> str:
+    """Prometheus text exposition of one run, for node_exporter's textfile collector."""
+    lines = [
+        f"# HELP {PROMETHEUS_PREFIX}_stage_seconds Per-page stage time in the last fetch run.",
+        f"# TYPE {PROMETHEUS_PREFIX}_stage_seconds summary",
+    ]
+    for stage, stats in summary["stages_ms"].items():
+        for q in PERCENTILES:
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds{{stage="{stage}",quantile="{q / 100}"}} '
+                         f'{stats[f"p{q}"] / 1000}')
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {stats["total"] / 1000}')
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+    per_page = (
+        ("page_stage_seconds", "gauge", "Stage time of a page in the last fetch run."),
+        ("page_bytes_downloaded", "gauge", "Bytes downloaded for a page in the last fetch run."),
+        ("page_bytes_written", "gauge", "Snapshot bytes written for a page in the last fetch run."),
+        ("page_retries", "gauge", "Retries for a page in the last fetch run."),
+    )
+    for name, kind, help_text in per_page:
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+        for record in records:
+            labels = f'slug="{_label(record["slug"])}",renderer="{_label(record["renderer"])}"'
+            if name == "page_stage_seconds":
+                for stage, ms in record["stages_ms"].items():
+                    lines.append(f'{PROMETHEUS_PREFIX}_{name}{{{labels},stage="{stage}"}} {ms / 1000}')
+            else:
+                lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{labels}}} {record[name.removeprefix('page_')]}")
+
+    lines.append(f"# HELP {PROMETHEUS_PREFIX}_last_run_timestamp_seconds When the last fetch run started.")
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge")
+    lines.append(f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds {timestamp}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: Path, records: Iterable[dict], summary: dict, timestamp_utc: str,
+                       timestamp: float) -> None:
+    """Append JSON lines, or atomically replace a ``.prom`` textfile."""
+    records = list(records)
+    if path.suffix == ".prom":
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(prometheus_text(records, summary, timestamp), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({"timestamp_utc": timestamp_utc, **record}) + "\n")
@@ -0,0 +1,108 @@
+"""
+Bulk restore of files from a git ref for the T&S Policy Watcher.
+
+The history bootstrap used to run one ``git show ref:path`` per history file,
+which means hundreds of process launches before any fetching starts. This
+module restores a whole subtree with two git processes:
+
+- ``git ls-tree -r -z`` lists every blob (object id and path) under the subtree
+- One long-lived ``git cat-file --batch`` process streams the blob contents
+- Files are written byte-for-byte, and the counts and elapsed time are returned
+"""
+
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+class GitBatchError(Exception):
+    """A git command needed for the restore failed."""
+
+
+@dataclass
+class RestoreStats:
+    files: int = 0
+    bytes: int = 0
+    elapsed_seconds: float = 0.0
+    missing: list[str] = field(default_factory=list)
+
+
+def list_tree_blobs(ref: str, path: str, cwd: Optional[Path] = None) -> list[tuple[str, str]]:
+    """(object id, repo-relative path) for every blob under ``path`` at ``ref``."""
+    proc = subprocess.run(
+        ["git", "ls-tree", "-r", "-z", "--full-tree", ref, "--", path],
+        cwd=cwd, check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        message = proc.stderr.decode("utf-8", "replace").strip() or "unknown error"
+        raise GitBatchError(f"Unable to list {path} at {ref}: {message}")
+
+    blobs = []
+    for record in proc.stdout.split(b"\0"):
+        if not record:
+            continue
+        meta, _, blob_path = record.partition(b"\t")
+        parts = meta.split()
+        if len(parts) != 3 or parts[1] != b"blob" or not blob_path:
+            continue  # submodules and malformed lines
+        blobs.append((parts[2].decode("ascii"), blob_path.decode("utf-8", "surrogateescape")))
+    return blobs
+
+
+def iter_blob_contents(object_ids: list[str], cwd: Optional[Path] = None) -> Iterator[tuple[str, Optional[bytes]]]:
+    """Yield (object id, content) through one ``git cat-file --batch`` process.
+
+    Requests are written one at a time and each reply is read before the
+    next, so neither pipe can fill up. Missing objects yield None.
+    """
+    proc = subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        cwd=cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    try:
+        for object_id in object_ids:
+            proc.stdin.write(object_id.encode("ascii") + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline()
+            if not header:
+                raise GitBatchError(f"git cat-file exited early: {proc.stderr.read().decode('utf-8', 'replace').strip()}")
+            fields = header.split()
+            if len(fields) != 3:  # "<oid> missing" / "<oid> ambiguous"
+                yield object_id, None
+                continue
+            size = int(fields[2])
+            content = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline after each object
+            yield object_id, content
+    finally:
+        proc.stdin.close()
+        proc.stdout.close()
+        proc.stderr.close()
+        proc.wait()
+
+
+def restore_tree(ref: str, path: str, repo_root: Path) -> RestoreStats:
+    """Write every file under ``path`` at ``ref`` into the working tree at ``repo_root``."""
+    started = time.monotonic()
+    stats = RestoreStats()
+    blobs = list_tree_blobs(ref, path, cwd=repo_root)
+    paths_by_id: dict[str, list[str]] = {}
+    for object_id, blob_path in blobs:
+        paths_by_id.setdefault(object_id, []).append(blob_path)
+
+    # Identical files (e.g. unchanged history entries) share one object; read it once
+    for object_id, content in iter_blob_contents(list(paths_by_id), cwd=repo_root):
+        if content is None:
+            stats.missing.extend(paths_by_id[object_id])
+            continue
+        for blob_path in paths_by_id[object_id]:
+            destination = repo_root / blob_path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.write_bytes(content)
+            stats.files += 1
+            stats.bytes += len(content)
+
+    stats.elapsed_seconds = time.monotonic() - started
+    return stats
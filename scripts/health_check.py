@@ -24,6 +24,7 @@ Recent Enhancements:
 """
 
 import json
+import os
 import httpx
 import time
 import ssl
@@ -34,7 +35,12 @@ from typing import Dict, List, Optional, NamedTuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from browser_pool import SyncBrowserPool
+from resource_policy import DOCUMENT_ONLY, blocking_enabled
+from http_client import create_client
+from cassette import rewrite_url
 
 # Health Status Classifications
 class HealthStatus(Enum):
@@ -90,6 +96,14 @@ class URLHealthChecker:
         self.playwright_timeout_ms = 15000  # 15s timeout for Playwright health checks
         self.enable_playwright_health = True  # Enable Playwright-based health checks
         self.playwright_user_agent = "TrustAndSafety-Policy-Watcher/1.0 Health Check"
+        self.max_workers = 5
+        # Playwright probes skip every subresource unless BROWSER_BLOCK_RESOURCES=0
+        self.resource_policy = DOCUMENT_ONLY if blocking_enabled() else None
+        # Send every check to a replay server (see cassette.py); SSL checks are skipped then
+        self.url_rewrite_prefix = os.getenv("URL_REWRITE_PREFIX", "").strip() or None
+        # Shared for the duration of a run; pools set by the caller (the watcher daemon) are reused across runs
+        self.browser_pool: Optional[SyncBrowserPool] = None
+        self.http_client: Optional[httpx.Client] = None      # Shared keep-alive/HTTP2 client
         
     def run_health_checks(self) -> Dict:
         """Run health checks for all URLs in configuration"""
@@ -113,28 +127,47 @@ class URLHealthChecker:
         check_results = []
         start_time = time.time()
         
-        # Use ThreadPoolExecutor for concurrent health checks
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            # Create tasks for concurrent health checks
-            future_to_config = {}
-            for url_config in platform_urls:
-                future = executor.submit(
-                    self.check_url_health,
-                    url_config["url"], 
-                    url_config["slug"],
-                    url_config["platform"],
-                    url_config.get("renderer", "httpx")
-                )
-                future_to_config[future] = url_config
-            
-            # Execute all health checks concurrently
-            print("🔍 Running concurrent health checks...")
-            for future in concurrent.futures.as_completed(future_to_config):
-                try:
-                    result = future.result()
-                    check_results.append(result)
-                except Exception as e:
-                    print(f"   ❌ Health check exception: {e}")
+        # One shared browser for every Playwright health check in this run
+        needs_browser = self.enable_playwright_health and any(
+            url_config.get("renderer", "httpx") == "playwright" for url_config in platform_urls
+        )
+        owns_browser_pool = needs_browser and self.browser_pool is None
+        if owns_browser_pool:
+            self.browser_pool = self.create_browser_pool()
+        owns_http_client = self.http_client is None
+        if owns_http_client:
+            self.http_client = create_client(timeout=self.timeout_seconds)
+
+        try:
+            # Use ThreadPoolExecutor for concurrent health checks
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Create tasks for concurrent health checks
+                future_to_config = {}
+                for url_config in platform_urls:
+                    future = executor.submit(
+                        self.check_url_health,
+                        url_config["url"],
+                        url_config["slug"],
+                        url_config["platform"],
+                        url_config.get("renderer", "httpx")
+                    )
+                    future_to_config[future] = url_config
+
+                # Execute all health checks concurrently
+                print("🔍 Running concurrent health checks...")
+                for future in concurrent.futures.as_completed(future_to_config):
+                    try:
+                        result = future.result()
+                        check_results.append(result)
+                    except Exception as e:
+                        print(f"   ❌ Health check exception: {e}")
+        finally:
+            if owns_browser_pool:
+                self.browser_pool.close()
+                self.browser_pool = None
+            if owns_http_client:
+                self.http_client.close()
+                self.http_client = None
         
         # Process results and update health database  
         for result in check_results:
@@ -166,6 +199,10 @@ class URLHealthChecker:
             "elapsed_time": elapsed_time
         }
     
+    def create_browser_pool(self) -> SyncBrowserPool:
+        return SyncBrowserPool(max_contexts=self.max_workers, user_agent=self.playwright_user_agent,
+                               resource_policy=self.resource_policy)
+
     def check_url_health(self, url: str, slug: str, platform: str, renderer: str = "httpx") -> HealthCheckResult:
         """
         Perform health check on a single URL with smart renderer selection.
@@ -236,16 +273,18 @@ class URLHealthChecker:
                     ssl_valid=ssl_valid
                 )
             
-            # Perform HEAD request for quick health check using httpx
-            with httpx.Client(timeout=self.timeout_seconds, follow_redirects=True) as client:
-                response = client.head(url)
+            # Perform HEAD request for quick health check using the shared httpx client
+            owns_client = self.http_client is None
+            client = create_client(timeout=self.timeout_seconds) if owns_client else self.http_client
+            try:
+                response = client.head(rewrite_url(url, self.url_rewrite_prefix))
                 response_time_ms = int((time.time() - start_time) * 1000)
                 status_code = response.status_code
 
                 if status_code >= 400 and self.should_retry_with_get(url, status_code):
                     initial_status = status_code
                     get_start = time.time()
-                    response = client.get(url)
+                    response = client.get(rewrite_url(url, self.url_rewrite_prefix))
                     response_time_ms = int((time.time() - get_start) * 1000)
                     status_code = response.status_code
                     print(f"      ↻ HEAD returned {initial_status}; GET fallback returned {status_code}")
@@ -281,7 +320,10 @@ class URLHealthChecker:
                     error_message=None,
                     ssl_valid=ssl_valid
                 )
-                
+            finally:
+                if owns_client:
+                    client.close()
+
         except httpx.TimeoutException:
             print(f"      ❌ timeout")
             return HealthCheckResult(
@@ -310,8 +352,10 @@ class URLHealthChecker:
                 ssl_valid=None
             )
     
-    def check_ssl_health(self, url: str) -> bool:
-        """Quick SSL certificate validation"""
+    def check_ssl_health(self, url: str) -> Optional[bool]:
+        """Quick SSL certificate validation (None when replaying, there is no live certificate)"""
+        if self.url_rewrite_prefix:
+            return None
         try:
             # Simple SSL check - just verify the certificate is valid
             parsed = urlparse(url)
@@ -331,42 +375,42 @@ class URLHealthChecker:
     def check_url_health_with_playwright(self, url: str) -> tuple[int, int, Optional[str]]:
         """
         Perform lightweight health check using Playwright for bot-protected sites.
+        Uses the run's shared browser pool when available.
         Returns: (http_status, response_time_ms, error_message)
         """
         start_time = time.time()
-        
+
+        async def probe(page) -> tuple[Optional[int], int]:
+            # Time the navigation itself, not the wait for a free pool page
+            navigation_start = time.time()
+            # For health checks, we just need to verify the page loads
+            # No need to wait for full rendering or extract content
+            response = await page.goto(rewrite_url(url, self.url_rewrite_prefix),
+                                       timeout=self.playwright_timeout_ms, wait_until='domcontentloaded')
+            return (response.status if response else None), int((time.time() - navigation_start) * 1000)
+
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch()
-                page = browser.new_page(user_agent=self.playwright_user_agent)
-                
-                try:
-                    # Navigate to the page with a reasonable timeout
-                    response = page.goto(url, timeout=self.playwright_timeout_ms, wait_until='domcontentloaded')
-                    response_time_ms = int((time.time() - start_time) * 1000)
-                    
-                    if response:
-                        http_status = response.status
-                        
-                        # For health checks, we just need to verify the page loads
-                        # No need to wait for full rendering or extract content
-                        if http_status >= 200 and http_status < 300:
-                            return http_status, response_time_ms, None
-                        elif http_status >= 300 and http_status < 400:
-                            # Redirects are generally OK for health checks
-                            return http_status, response_time_ms, None
-                        else:
-                            return http_status, response_time_ms, f"HTTP {http_status}"
-                    else:
-                        return 0, int((time.time() - start_time) * 1000), "No response received"
-                        
-                except PlaywrightTimeoutError:
-                    response_time_ms = int((time.time() - start_time) * 1000)
-                    return 0, response_time_ms, "Playwright timeout"
-                    
-                finally:
-                    browser.close()
-                    
+            if self.browser_pool is not None:
+                http_status, response_time_ms = self.browser_pool.run(probe)
+            else:
+                with SyncBrowserPool(max_contexts=1, user_agent=self.playwright_user_agent,
+                                     resource_policy=self.resource_policy) as pool:
+                    http_status, response_time_ms = pool.run(probe)
+
+            if http_status is None:
+                return 0, response_time_ms, "No response received"
+            if http_status >= 200 and http_status < 300:
+                return http_status, response_time_ms, None
+            elif http_status >= 300 and http_status < 400:
+                # Redirects are generally OK for health checks
+                return http_status, response_time_ms, None
+            else:
+                return http_status, response_time_ms, f"HTTP {http_status}"
+
+        except PlaywrightTimeoutError:
+            response_time_ms = int((time.time() - start_time) * 1000)
+            return 0, response_time_ms, "Playwright timeout"
+
         except Exception as e:
             response_time_ms = int((time.time() - start_time) * 1000)
             return 0, response_time_ms, f"Playwright error: {str(e)[:100]}"
@@ -581,45 +625,51 @@ class URLHealthChecker:
         else:
             print(f"💾 Cleared health alerts file (no active alerts)")
 
+
+def run_health_check_cycle(health_checker: URLHealthChecker) -> Dict:
+    """Check every URL, then save alerts for status changes; returns the run results."""
+    # Load previous health data for alert detection
+    previous_health_db = None
+    if health_checker.health_db_file.exists():
+        try:
+            with open(health_checker.health_db_file, 'r') as f:
+                previous_health_db = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            previous_health_db = None
+    
+    # Run current health checks
+    results = health_checker.run_health_checks()
+    
+    # Detect health alerts by comparing with previous state
+    alerts = health_checker.detect_health_alerts(results, previous_health_db)
+    
+    # Save alerts for notification system (always call to clear resolved alerts)
+    health_checker.save_health_alerts(alerts)
+    if alerts:
+        print(f"🚨 Generated {len(alerts)} health alerts")
+        for alert in alerts:
+            print(f"   ⚠️  {alert['platform']} - {alert['slug']}: {alert['previous_status']} → {alert['current_status']}")
+    else:
+        print(f"✅ No active health alerts")
+    
+    # Report summary
+    failed_count = results["system_health"]["failed_urls"]
+    if failed_count > 0:
+        print(f"\n⚠️  {failed_count} URLs failed health checks")
+        # Don't exit with error code - we want the workflow to continue
+        # Health issues will be reported via alerts and notifications
+    else:
+        print(f"\n✅ All URLs passed health checks")
+    return results
+
+
 def main():
     """Main entry point for health checking"""
     
     health_checker = URLHealthChecker()
     
     try:
-        # Load previous health data for alert detection
-        previous_health_db = None
-        if health_checker.health_db_file.exists():
-            try:
-                with open(health_checker.health_db_file, 'r') as f:
-                    previous_health_db = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                previous_health_db = None
-        
-        # Run current health checks
-        results = health_checker.run_health_checks()
-        
-        # Detect health alerts by comparing with previous state
-        alerts = health_checker.detect_health_alerts(results, previous_health_db)
-        
-        # Save alerts for notification system (always call to clear resolved alerts)
-        health_checker.save_health_alerts(alerts)
-        if alerts:
-            print(f"🚨 Generated {len(alerts)} health alerts")
-            for alert in alerts:
-                print(f"   ⚠️  {alert['platform']} - {alert['slug']}: {alert['previous_status']} → {alert['current_status']}")
-        else:
-            print(f"✅ No active health alerts")
-        
-        # Report summary
-        failed_count = results["system_health"]["failed_urls"]
-        if failed_count > 0:
-            print(f"\n⚠️  {failed_count} URLs failed health checks")
-            # Don't exit with error code - we want the workflow to continue
-            # Health issues will be reported via alerts and notifications
-        else:
-            print(f"\n✅ All URLs passed health checks")
-            
+        run_health_check_cycle(health_checker)
     except Exception as e:
         print(f"\n❌ Health check system error: {e}")
         import traceback
@@ -0,0 +1,229 @@
+"""
+Delta-encoded long-term policy history.
+
+The dashboard manifest keeps full texts for the latest MAX_HISTORY_ENTRIES
+versions only, because every entry is a complete copy. Alongside it, each
+slug keeps ``history/<slug>/chain.jsonl``, an append-only version chain:
+
+- One compact JSON record per version, with its timestamp, commit and a
+  blob id prefix
+- A full ``key`` text every HISTORY_KEYFRAME_INTERVAL versions (default 100),
+  or sooner when a delta would be larger than half the text
+- ``delta`` ops against the previous version in between: changed runs of
+  lines, or word-level edits inside a paragraph when only a few words changed
+- Rebuilding any version reads one keyframe and at most interval - 1 deltas,
+  and the result is checked against its blob id
+- The chain is trimmed to HISTORY_CHAIN_MAX_VERSIONS (default 500) by
+  re-keying the oldest retained version
+
+Policy edits usually touch a few lines, so hundreds of versions cost about
+as much disk as a handful of full copies.
+
+Usage: python scripts/history_delta.py <chain.jsonl> [seq]
+"""
+
+import difflib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Optional
+
+from history_store import blob_id
+
+CHAIN_FILENAME = "chain.jsonl"
+DEFAULT_KEYFRAME_INTERVAL = 100
+DEFAULT_MAX_VERSIONS = 500
+
+HASH_CHARS = 16  # blob id prefix kept per version for the rebuild check
+_METADATA_KEYS = ("timestamp", "commit")
+_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]+")
+
+
+class HistoryChainError(Exception):
+    """A chain file is malformed or a rebuilt version failed its hash check."""
+
+
+def _word_delta(old_line: str, new_line: str) -> list:
+    """``[start, end, replacement]`` character ops on one line, split at word boundaries."""
+    old_tokens = _TOKEN_RE.findall(old_line)
+    new_tokens = _TOKEN_RE.findall(new_line)
+    offsets = [0]
+    for token in old_tokens:
+        offsets.append(offsets[-1] + len(token))
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    return [[offsets[i1], offsets[i2], "".join(new_tokens[j1:j2])]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def line_delta(old_lines: list[str], new_lines: list[str]) -> list:
+    """Ops that turn ``old_lines`` into ``new_lines``.
+
+    ``[start, end, replacement_lines]`` replaces a run of lines;
+    ``[index, word_ops]`` edits a single line in place (see _word_delta).
+    """
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            for offset in range(i2 - i1):
+                old_line, new_line = old_lines[i1 + offset], new_lines[j1 + offset]
+                word_ops = _word_delta(old_line, new_line)
+                if _payload_size(word_ops) * 2 <= len(new_line):
+                    ops.append([i1 + offset, word_ops])
+                else:
+                    ops.append([i1 + offset, i1 + offset + 1, [new_line]])
+            continue
+        ops.append([i1, i2, new_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(old_lines: list[str], ops: list) -> list[str]:
+    lines = list(old_lines)
+    for op in reversed(ops):
+        if len(op) == 2:
+            index, word_ops = op
+            line = lines[index]
+            for start, end, replacement in reversed(word_ops):
+                line = line[:start] + replacement + line[end:]
+            lines[index] = line
+        else:
+            start, end, replacement = op
+            lines[start:end] = replacement
+    return lines
+
+
+def _payload_size(ops: list) -> int:
+    """Characters of new text carried by line or word ops."""
+    size = 0
+    for op in ops:
+        payload = op[-1]
+        size += len(payload) if isinstance(payload, str) else sum(
+            len(item) if isinstance(item, str) else len(item[-1]) for item in payload)
+    return size
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+class DeltaChain:
+    """Keyframes plus deltas for every retained version of one policy."""
+
+    def __init__(self, path: Path, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 max_versions: int = DEFAULT_MAX_VERSIONS):
+        self.path = Path(path)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_versions = max(1, max_versions)
+        self.records: list[dict] = []
+        self._latest_lines: Optional[list[str]] = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> "DeltaChain":
+        self.records = []
+        self._latest_lines = None
+        if self.path.exists():
+            for line_number, line in enumerate(self.path.read_text(encoding="utf-8").splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    self.records.append(json.loads(line))
+                except json.JSONDecodeError as exc:
+                    raise HistoryChainError(f"{self.path}:{line_number}: {exc}") from exc
+            if self.records and "key" not in self.records[0]:
+                raise HistoryChainError(f"{self.path}: chain does not start with a keyframe")
+        return self
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def versions(self) -> list[dict]:
+        """Version metadata, oldest first, without the stored texts."""
+        return [{k: v for k, v in record.items() if k not in ("key", "delta")} for record in self.records]
+
+    def _lines(self, index: int) -> list[str]:
+        key_index = index
+        while "key" not in self.records[key_index]:
+            key_index -= 1
+        lines = self.records[key_index]["key"].splitlines(keepends=True)
+        for record in self.records[key_index + 1:index + 1]:
+            lines = apply_delta(lines, record["delta"])
+        return lines
+
+    def text(self, seq: int) -> str:
+        """Rebuild the text of version ``seq``."""
+        index = seq - self.records[0]["seq"] if self.records else -1
+        if not 0 <= index < len(self.records):
+            raise KeyError(seq)
+        text = "".join(self._lines(index))
+        if blob_id(text)[:HASH_CHARS] != self.records[index]["hash"]:
+            raise HistoryChainError(f"{self.path}: version {seq} failed its hash check")
+        return text
+
+    def latest_text(self) -> Optional[str]:
+        return self.text(self.records[-1]["seq"]) if self.records else None
+
+    def append(self, text: str, metadata: Optional[dict] = None) -> Optional[dict]:
+        """Add a version unless it equals the latest one; returns the new record."""
+        text_hash = blob_id(text)[:HASH_CHARS]
+        if self.records and self.records[-1]["hash"] == text_hash:
+            return None
+
+        record = {"seq": self.records[-1]["seq"] + 1 if self.records else 0, "hash": text_hash}
+        record.update({k: metadata[k] for k in _METADATA_KEYS if metadata and metadata.get(k)})
+
+        new_lines = text.splitlines(keepends=True)
+        since_key = 0
+        for previous in reversed(self.records):
+            if "key" in previous:
+                break
+            since_key += 1
+        if self.records and since_key + 1 < self.keyframe_interval:
+            if self._latest_lines is None:
+                self._latest_lines = self._lines(len(self.records) - 1)
+            ops = line_delta(self._latest_lines, new_lines)
+            if _payload_size(ops) * 2 <= len(text):
+                record["delta"] = ops
+        if "delta" not in record:
+            record["key"] = text
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(_dumps(record) + "\n")
+        self.records.append(record)
+        self._latest_lines = new_lines
+
+        if len(self.records) > self.max_versions:
+            self._trim()
+        return record
+
+    def _trim(self) -> None:
+        drop = len(self.records) - self.max_versions
+        first = dict(self.records[drop])
+        if "key" not in first:
+            first.pop("delta")
+            first["key"] = "".join(self._lines(drop))
+        self.records = [first] + self.records[drop + 1:]
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text("".join(_dumps(r) + "\n" for r in self.records), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def main() -> None:
+    if len(sys.argv) not in (2, 3):
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+    chain = DeltaChain(Path(sys.argv[1])).load()
+    if len(sys.argv) == 3:
+        sys.stdout.write(chain.text(int(sys.argv[2])))
+        return
+    for version in chain.versions():
+        print(f"{version['seq']:>5}  {version.get('timestamp', '')}  {version['hash']}")
+
+
+if __name__ == "__main__":
+    main()
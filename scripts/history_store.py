@@ -0,0 +1,103 @@
+"""
+Content-addressed blob store for policy history.
+
+Each history entry used to be a full timestamped copy under
+``history/<slug>/``, so identical texts were stored again across slugs
+(the instagram-* and meta-* pages share help.instagram.com content) and
+across reverts. Texts are now stored once by hash:
+
+- Blobs live at ``history/_blobs/<id[:2]>/<id>.txt`` (``.txt.gz`` with
+  HISTORY_BLOB_COMPRESSION=gzip), where the id is the SHA-256 of the text
+- Manifest entries record the ``blob`` id; their ``file`` points at the blob
+  relative to the slug directory, so ``history/<slug>/index.json`` keeps
+  the format the dashboard reads
+- Blobs no longer referenced by any manifest are garbage-collected
+"""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+BLOBS_DIRNAME = "_blobs"
+COMPRESSIONS = (None, "gzip")
+_SUFFIXES = {None: ".txt", "gzip": ".txt.gz"}
+
+
+def blob_id(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class HistoryBlobStore:
+    """Hash-named history texts shared by every slug under one history root."""
+
+    def __init__(self, history_root: Path, compression: Optional[str] = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported history blob compression {compression!r}")
+        self.history_root = Path(history_root)
+        self.blobs_dir = self.history_root / BLOBS_DIRNAME
+        self.compression = compression
+
+    def _existing_path(self, object_id: str) -> Optional[Path]:
+        for suffix in _SUFFIXES.values():
+            path = self.blobs_dir / object_id[:2] / f"{object_id}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def put(self, text: str) -> tuple[str, Path]:
+        """Store ``text`` if it is new; returns (blob id, blob path)."""
+        object_id = blob_id(text)
+        existing = self._existing_path(object_id)
+        if existing is not None:
+            return object_id, existing
+
+        path = self.blobs_dir / object_id[:2] / f"{object_id}{_SUFFIXES[self.compression]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode("utf-8")
+        if self.compression == "gzip":
+            data = gzip.compress(data, mtime=0)  # mtime=0 keeps blobs byte-identical across runs
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        return object_id, path
+
+    def read(self, path: Path) -> str:
+        data = Path(path).read_bytes()
+        if path.name.endswith(".gz"):
+            data = gzip.decompress(data)
+        return data.decode("utf-8")
+
+    def entry_file(self, path: Path) -> str:
+        """Manifest ``file`` value for a blob, relative to ``history/<slug>/``."""
+        return Path("..", path.relative_to(self.history_root)).as_posix()
+
+    def referenced_blob_ids(self, manifest_filename: str = "index.json") -> Optional[set[str]]:
+        referenced = set()
+        for manifest_path in self.history_root.glob(f"*/{manifest_filename}"):
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                return None  # can't tell what is still in use; skip collection
+            if isinstance(manifest, list):
+                referenced.update(entry["blob"] for entry in manifest
+                                  if isinstance(entry, dict) and entry.get("blob"))
+        return referenced
+
+    def collect_garbage(self, referenced: Optional[Iterable[str]] = None) -> int:
+        """Delete blobs no manifest references; returns the number removed."""
+        if referenced is None:
+            referenced = self.referenced_blob_ids()
+        if referenced is None or not self.blobs_dir.exists():
+            return 0
+        referenced = set(referenced)
+        removed = 0
+        for path in self.blobs_dir.glob("*/*"):
+            if path.name.split(".", 1)[0] not in referenced:
+                path.unlink()
+                removed += 1
+        for shard in self.blobs_dir.iterdir():
+            if shard.is_dir() and not any(shard.iterdir()):
+                shard.rmdir()
+        return removed
@@ -0,0 +1,182 @@
+"""
+Raw-HTML canonicalization for stored snapshots.
+
+Snapshots used to be saved exactly as fetched, with inline scripts, styles,
+tracking attributes and session IDs, which made them large and their diffs
+noisy. Pages that opt in (``"canonicalize": true`` in platform_urls.json,
+or every page with CANONICALIZE_SNAPSHOTS=1) are canonicalized before being
+written:
+
+- script, style, link and meta elements and comments are removed
+- Volatile attributes (event handlers, nonces, integrity hashes, ``data-*``,
+  ``js*``, ``srcset``) are dropped, except those the extraction rules match on
+- Session and tracking query parameters are removed from links
+- Whitespace runs are collapsed, and block elements start on their own line
+
+Removed elements leave a line break behind, so text on either side stays
+separate, as clean_html() saw it in the original. Every canonical snapshot is
+checked before it is written: if clean_html() output would change, the raw
+HTML is stored instead. ``python scripts/html_canonicalizer.py [--apply]
+[slug ...]`` runs the same check over stored snapshots.
+"""
+
+import argparse
+import re
+import sys
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+from html_cleaner import DEFAULT_PARSER
+
+REMOVED_TAGS = ("script", "style", "link", "meta")
+
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "details", "dialog", "div", "dl",
+    "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "head", "header", "hr", "html", "li", "main", "nav", "ol", "p", "pre", "section", "summary",
+    "table", "tbody", "td", "tfoot", "th", "thead", "title", "tr", "ul",
+})
+
+# Whitespace inside these is significant
+PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+
+VOLATILE_ATTRIBUTE_RE = re.compile(
+    r"^(on\w+|nonce|integrity|crossorigin|referrerpolicy|fetchpriority|ping|srcset|sizes|js\w*|data-.*)$",
+    re.IGNORECASE,
+)
+URL_ATTRIBUTES = ("href", "src", "action", "poster")
+VOLATILE_QUERY_PARAM_RE = re.compile(
+    r"^(utm_\w+|fbclid|gclid|msclkid|mc_eid|_ga|_gl|_hs\w*|sid|sessionid|session_id|jsessionid|phpsessid|"
+    r"csrf\w*|token)$",
+    re.IGNORECASE,
+)
+_PATH_SESSION_RE = re.compile(r";jsessionid=[^?#]*", re.IGNORECASE)
+
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+# Characters str.splitlines() breaks on; clean_html() splits lines on these
+_LINE_BREAKS = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+
+
+def referenced_attributes(registry) -> frozenset[str]:
+    """Attribute names any content-root or strip rule matches on, across all platforms."""
+    names = set()
+    for rules in [registry.default, *registry.platforms]:
+        cleaning = rules.cleaning
+        names.update(rule.attr for rule in (*cleaning.content_roots, *cleaning.strip_rules))
+    return frozenset(names)
+
+
+def _strip_volatile_params(url: str) -> str:
+    cleaned = _PATH_SESSION_RE.sub("", url)
+    parts = urlsplit(cleaned)
+    if not parts.query:
+        return cleaned
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(key, value) for key, value in params if not VOLATILE_QUERY_PARAM_RE.match(key)]
+    if len(kept) == len(params):
+        return cleaned
+    return urlunsplit(parts._replace(query=urlencode(kept)))
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    return "\n" if _LINE_BREAKS.intersection(match.group()) else " "
+
+
+def canonicalize_html(html: str, keep_attributes: Iterable[str] = (), parser: str = DEFAULT_PARSER) -> str:
+    """Deterministic, noise-free serialization of ``html``."""
+    keep = frozenset(keep_attributes)
+    soup = BeautifulSoup(html, parser)
+
+    for element in soup.find_all(REMOVED_TAGS):
+        element.replace_with(NavigableString("\n"))
+    for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.replace_with(NavigableString("\n"))
+
+    for tag in soup.find_all(True):
+        for name in list(tag.attrs):
+            if name not in keep and VOLATILE_ATTRIBUTE_RE.match(name):
+                del tag.attrs[name]
+        for name in URL_ATTRIBUTES:
+            value = tag.attrs.get(name)
+            if isinstance(value, str):
+                tag.attrs[name] = _strip_volatile_params(value)
+        if tag.name in BLOCK_TAGS and tag.parent is not None:
+            tag.insert_before(NavigableString("\n"))
+            tag.insert_after(NavigableString("\n"))
+
+    soup.smooth()
+    for string in soup.find_all(string=True):
+        if type(string) is not NavigableString:
+            continue  # doctype, CDATA and other special strings are kept as-is
+        if any(parent.name in PRESERVE_WHITESPACE_TAGS for parent in string.parents):
+            continue
+        normalized = _WHITESPACE_RUN_RE.sub(_collapse_whitespace, string)
+        if normalized != string:
+            string.replace_with(NavigableString(normalized))
+
+    return soup.decode(formatter="minimal").strip() + "\n"
+
+
+def first_difference(expected: str, actual: str) -> Optional[str]:
+    """Short description of where two cleaned texts diverge, or None when equal."""
+    if expected == actual:
+        return None
+    expected_lines, actual_lines = expected.splitlines(), actual.splitlines()
+    for number, (left, right) in enumerate(zip(expected_lines, actual_lines), 1):
+        if left != right:
+            return f"line {number}: {left[:80]!r} != {right[:80]!r}"
+    return f"line count {len(expected_lines)} != {len(actual_lines)}"
+
+
+def verified_canonical_html(html: str, cleaned: str, clean: Callable[[str], str],
+                            keep_attributes: Iterable[str] = (),
+                            parser: str = DEFAULT_PARSER) -> tuple[str, Optional[str]]:
+    """(canonical HTML, None) when ``clean`` output is unchanged, else (``html``, difference)."""
+    canonical = canonicalize_html(html, keep_attributes, parser)
+    difference = first_difference(cleaned, clean(canonical))
+    return (html, difference) if difference else (canonical, None)
+
+
+def main() -> None:
+    import fetch  # CLI only; fetch.py imports this module
+    from snapshot_store import read_snapshot, snapshot_file, write_snapshot
+
+    parser = argparse.ArgumentParser(description="Verify (and optionally apply) snapshot canonicalization")
+    parser.add_argument("slugs", nargs="*", help="Slugs to check (default: every stored snapshot)")
+    parser.add_argument("--apply", action="store_true",
+                        help="Rewrite snapshots whose cleaned text is unchanged by canonicalization")
+    args = parser.parse_args()
+
+    slug_dirs = sorted(p for p in fetch.SNAPSHOTS_DIR.iterdir() if snapshot_file(p) is not None)
+    if args.slugs:
+        slug_dirs = [fetch.SNAPSHOTS_DIR / slug for slug in args.slugs]
+
+    failed = 0
+    total_before = total_after = 0
+    for slug_dir in slug_dirs:
+        slug = slug_dir.name
+        html = read_snapshot(slug_dir)
+        cleaned = fetch.clean_html(html, slug)
+        stored, difference = fetch.canonical_snapshot_html(slug, html, cleaned)
+        before, after = len(html.encode("utf-8")), len(stored.encode("utf-8"))
+        total_before += before
+        total_after += after
+        if difference:
+            failed += 1
+            print(f"DIFF  {slug}: {difference}")
+            continue
+        print(f"OK    {slug}: {before} -> {after} bytes")
+        if args.apply and stored != html:
+            write_snapshot(slug_dir, stored, fetch.SNAPSHOT_COMPRESSION)
+            fetch.save_clean_fingerprint(slug_dir, fetch.content_sha256(stored), fetch.content_sha256(cleaned))
+
+    print(f"\n{len(slug_dirs) - failed}/{len(slug_dirs)} snapshots keep identical clean_html() output; "
+          f"{total_before} -> {total_after} bytes")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Run-scoped HTTP client layer for the T&S Policy Watcher.
+
+fetch.py and health_check.py used to build a fresh httpx client per URL,
+paying a TCP/TLS handshake for every request even when several tracked
+pages share a host (support.google.com). These factories build one
+long-lived client per run instead:
+
+- Keep-alive connection pooling with tunable limits
+- HTTP/2 multiplexing when the ``h2`` package is installed
+- Compressed transfer: httpx advertises gzip/deflate, plus br and zstd
+  when ``brotli``/``zstandard`` are installed (see requirements.txt)
+
+Pool limits can be tuned with HTTP_MAX_CONNECTIONS,
+HTTP_MAX_KEEPALIVE_CONNECTIONS and HTTP_KEEPALIVE_EXPIRY_SECONDS.
+"""
+
+import importlib.util
+import os
+import sys
+from typing import Optional
+
+import httpx
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+def _env_number(name: str, default, cast):
+    raw_value = os.getenv(name)
+    if raw_value is None or not raw_value.strip():
+        return default
+    try:
+        return cast(raw_value)
+    except ValueError:
+        print(f"    - WARNING: Ignoring invalid {name}={raw_value!r}; using {default}.", file=sys.stderr)
+        return default
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` dependency (``httpx[http2]``)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_limits() -> httpx.Limits:
+    """Connection pool limits shared by every client built here."""
+    return httpx.Limits(
+        max_connections=_env_number("HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS, int),
+        max_keepalive_connections=_env_number(
+            "HTTP_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS, int),
+        keepalive_expiry=_env_number(
+            "HTTP_KEEPALIVE_EXPIRY_SECONDS", DEFAULT_KEEPALIVE_EXPIRY_SECONDS, float),
+    )
+
+
+def _client_options(user_agent: Optional[str], timeout: float, options: dict) -> dict:
+    headers = dict(options.pop("headers", {}) or {})
+    if user_agent:
+        headers["User-Agent"] = user_agent
+    return {
+        "headers": headers,
+        "timeout": timeout,
+        "follow_redirects": True,
+        "http2": http2_available(),
+        "limits": build_limits(),
+        **options,
+    }
+
+
+def create_async_client(user_agent: Optional[str] = None,
+                        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                        **options) -> httpx.AsyncClient:
+    """Build the pooled async client used by the fetch engine."""
+    return httpx.AsyncClient(**_client_options(user_agent, timeout, options))
+
+
+def create_client(user_agent: Optional[str] = None,
+                  timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                  **options) -> httpx.Client:
+    """Build the pooled, thread-safe sync client used by health checks."""
+    return httpx.Client(**_client_options(user_agent, timeout, options))
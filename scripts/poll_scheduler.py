@@ -0,0 +1,183 @@
+"""
+Adaptive per-URL polling for the T&S Policy Watcher.
+
+Every tracked page used to be fetched on every run, although some pages
+(Twitch legal terms) almost never change while others (TikTok) change
+often. With ADAPTIVE_POLLING=1, fetch.py only fetches pages that are due:
+
+- Each slug's checks and changes are counted in ``poll_schedule.json`` next
+  to the snapshots, seeded on first use from the history manifests (change
+  times) and the run log (how long pages have been watched)
+- The change rate is estimated from the share of checks that found a
+  change, corrected for changes missed between checks (Cho & Garcia-Molina's
+  estimator), so a page that changes at every check converges on the
+  minimum interval instead of its current one
+- A page is polled about twice per expected change, clamped between
+  POLL_MIN_INTERVAL_HOURS (default 6) and POLL_MAX_INTERVAL_HOURS (default
+  168, the minimum cadence: no page waits longer than this); intervals at
+  most double from one check to the next
+- New pages, pages without stats and pages whose last fetch failed are due
+  immediately; ``fetch.py --all`` ignores the schedule for one run
+"""
+
+import json
+import math
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Iterable, Optional
+
+SCHEDULE_FILENAME = "poll_schedule.json"
+DEFAULT_MIN_INTERVAL_HOURS = 6
+DEFAULT_MAX_INTERVAL_HOURS = 168
+
+# Polls per expected change interval
+POLLS_PER_CHANGE = 2
+# Runs don't start exactly on time; pages due this close to now are fetched early
+DUE_SLACK = timedelta(hours=1)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def format_timestamp(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def history_change_times(chain_path: Path, manifest_path: Path) -> list[datetime]:
+    """Times a slug's cleaned text changed, from its history chain or, failing that, its manifest."""
+    for path, is_chain in ((chain_path, True), (manifest_path, False)):
+        if not path.exists():
+            continue
+        try:
+            if is_chain:
+                entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line]
+            else:
+                entries = json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            continue
+        times = {parse_timestamp(entry.get("timestamp")) for entry in entries if isinstance(entry, dict)}
+        times.discard(None)
+        if times:
+            return sorted(times)
+    return []
+
+
+def run_log_start(run_log: Iterable[dict]) -> Optional[datetime]:
+    """Timestamp of the oldest run in the run log (every page was checked on each logged run)."""
+    times = [parse_timestamp(entry.get("timestamp_utc")) for entry in run_log if isinstance(entry, dict)]
+    times = [t for t in times if t is not None]
+    return min(times) if times else None
+
+
+class PollSchedule:
+    """Per-slug change statistics and next-due times."""
+
+    def __init__(self, path: Path, min_interval_hours: float = DEFAULT_MIN_INTERVAL_HOURS,
+                 max_interval_hours: float = DEFAULT_MAX_INTERVAL_HOURS):
+        self.path = Path(path)
+        self.min_interval = timedelta(hours=min_interval_hours)
+        self.max_interval = timedelta(hours=max(max_interval_hours, min_interval_hours))
+        self.entries: dict[str, dict] = {}
+        self._dirty = False
+
+    def load(self) -> "PollSchedule":
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.entries = data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, OSError) as exc:
+                print(f"    - WARNING: Ignoring unreadable poll schedule at {self.path}: {exc}", file=sys.stderr)
+                self.entries = {}
+        return self
+
+    def seed(self, slug: str, change_times: list[datetime], watched_since: Optional[datetime],
+             now: Optional[datetime] = None) -> None:
+        """Initial stats for a slug with no entry yet; due now so the first scheduled run checks it."""
+        if slug in self.entries:
+            return
+        now = now or datetime.now(UTC)
+        starts = [t for t in (watched_since, change_times[0] if change_times else None) if t is not None]
+        first_seen = min(starts) if starts else now
+        # There are no per-slug check records yet: assume one check per maximum
+        # interval watched, and at least one per recorded change
+        watched_checks = int((now - first_seen) / self.max_interval)
+        self.entries[slug] = {
+            "first_seen": format_timestamp(first_seen),
+            "last_checked": None,
+            "last_changed": format_timestamp(change_times[-1]) if change_times else None,
+            "checks": max(watched_checks, len(change_times)),
+            "changes": len(change_times),
+            "next_due": format_timestamp(now),
+        }
+        self._dirty = True
+
+    def interval(self, slug: str, now: Optional[datetime] = None) -> timedelta:
+        """Polling interval from the estimated change rate of a slug."""
+        entry = self.entries.get(slug) or {}
+        now = now or datetime.now(UTC)
+        first_seen = parse_timestamp(entry.get("first_seen")) or now
+        observed = max(now - first_seen, timedelta(0))
+        checks = max(int(entry.get("checks") or 0), 0)
+        changes = min(max(int(entry.get("changes") or 0), 0), checks)
+        if not checks:
+            return self.min_interval
+        mean_check_interval = max(observed / checks, self.min_interval)
+        # Expected changes per check, counting changes hidden between checks
+        changes_per_check = -math.log((checks - changes + 0.5) / (checks + 0.5))
+        if changes_per_check <= 0:
+            return self.max_interval
+        interval = mean_check_interval / (changes_per_check * POLLS_PER_CHANGE)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def next_due(self, slug: str) -> Optional[datetime]:
+        entry = self.entries.get(slug)
+        return parse_timestamp(entry.get("next_due")) if isinstance(entry, dict) else None
+
+    def is_due(self, slug: str, now: Optional[datetime] = None) -> bool:
+        due = self.next_due(slug)
+        if due is None:
+            return True
+        return due - (now or datetime.now(UTC)) <= DUE_SLACK
+
+    def split(self, pages: list[dict], now: Optional[datetime] = None) -> tuple[list[dict], list[dict]]:
+        """(pages due now, deferred pages), each in configuration order."""
+        due, deferred = [], []
+        for page in pages:
+            (due if self.is_due(page["slug"], now) else deferred).append(page)
+        return due, deferred
+
+    def record(self, slug: str, changed: bool, now: Optional[datetime] = None) -> None:
+        """Count a successful check and schedule the slug's next one."""
+        now = now or datetime.now(UTC)
+        entry = self.entries.setdefault(slug, {"first_seen": format_timestamp(now), "checks": 0, "changes": 0,
+                                               "last_changed": None})
+        entry["checks"] = entry.get("checks", 0) + 1
+        entry["last_checked"] = format_timestamp(now)
+        if changed:
+            entry["changes"] = entry.get("changes", 0) + 1
+            entry["last_changed"] = format_timestamp(now)
+        previous_hours = entry.get("interval_hours")
+        if previous_hours is None and entry["checks"] == 1:
+            previous_hours = self.min_interval.total_seconds() / 3600
+        interval = self.interval(slug, now)
+        if previous_hours:
+            # Back off gradually: one quiet check of a new page shouldn't defer it for a week
+            interval = min(interval, timedelta(hours=previous_hours * 2))
+        entry["interval_hours"] = round(interval.total_seconds() / 3600, 1)
+        entry["next_due"] = format_timestamp(now + interval)
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8")
+        self._dirty = False
@@ -0,0 +1,128 @@
+"""
+Per-host rate limiting and retry pacing for the T&S Policy Watcher.
+
+Concurrency caps alone still let a host see bursts: every time a fetch
+finishes, the next page for that host starts at once, and failed fetches
+were retried after a fixed 5 seconds. Hosts such as help.whatnot.com and
+TikTok block bursts. The fetch engine now also paces requests:
+
+- A token bucket per hostname: FETCH_HOST_REQUESTS_PER_MINUTE (default 20),
+  with bursts of up to FETCH_HOST_BURST (default 2) requests
+- A 429 or 503 response with ``Retry-After`` pauses the whole host until
+  then, not just the page that got it; waits longer than
+  MAX_RETRY_AFTER_SECONDS give up on the page for this run
+- Otherwise retries wait an exponential backoff with full jitter, so pages
+  that failed together don't retry together
+- One retry budget per run (FETCH_RETRY_BUDGET, default 10), so a host
+  that is down can't stretch a run with retries for every page
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, UTC
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+DEFAULT_REQUESTS_PER_MINUTE = 20
+DEFAULT_BURST = 2
+DEFAULT_RETRY_BUDGET = 10
+DEFAULT_BACKOFF_BASE_SECONDS = 5
+DEFAULT_BACKOFF_CAP_SECONDS = 60
+MAX_RETRY_AFTER_SECONDS = 120
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max((retry_at - (now or datetime.now(UTC))).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+                  cap: float = DEFAULT_BACKOFF_CAP_SECONDS,
+                  rng: Callable[[float, float], float] = random.uniform) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt`` (0 for the first retry)."""
+    return rng(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns how long to wait before using it."""
+        now = self.clock()
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 and self.rate > 0 else 0.0
+        return max(wait, self.paused_until - now, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request back for ``seconds`` (Retry-After)."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class HostRateLimiter:
+    """Token buckets keyed by hostname."""
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE, burst: int = DEFAULT_BURST,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+        self.waited_seconds = 0.0
+
+    def bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst, self.clock)
+        return bucket
+
+    async def acquire(self, host: str) -> None:
+        """Wait for the host's next request slot.
+
+        Reserving is synchronous, so concurrent callers get successive slots.
+        """
+        wait = self.bucket(host).reserve()
+        if wait > 0:
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+
+    def pause(self, host: str, seconds: float) -> None:
+        self.bucket(host).pause(seconds)
+
+
+class RetryBudget:
+    """Retries left for the whole run."""
+
+    def __init__(self, total: int = DEFAULT_RETRY_BUDGET):
+        self.total = max(0, total)
+        self.used = 0
+
+    def try_spend(self) -> bool:
+        if self.used >= self.total:
+            return False
+        self.used += 1
+        return True
@@ -0,0 +1,106 @@
+"""
+Readiness waits for Playwright page loads.
+
+fetch_with_playwright() used to sleep a fixed 3 seconds after
+``domcontentloaded``: too long for pages that are already rendered, too
+short for pages that hydrate slowly. A ReadinessStrategy waits only as long
+as the page needs, in this order, all bounded by one overall deadline:
+
+1. ``selector``: wait until the platform's content container is attached
+2. ``network_idle``: wait for Playwright's ``networkidle`` load state
+3. ``stable_ms``: poll the body text length until it stops changing
+
+A client-side rendered page can briefly stop changing while it still shows
+a loading shell, so the stability window only starts once the body holds at
+least ``min_text_chars`` of text. A page that never gets there stops at the
+deadline with reason ``"too_short"`` and is not saved.
+
+Strategies are configured per platform under ``"browser": {"ready": ...}``
+in extraction_rules.json. wait_until_ready() reports how long it waited and
+why it stopped so the run log can be used to tune each platform.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+DEFAULT_STABLE_MS = 750
+DEFAULT_POLL_MS = 250
+DEFAULT_DEADLINE_MS = 10000
+
+_TEXT_LENGTH_JS = "() => document.body ? document.body.innerText.length : 0"
+
+
+@dataclass(frozen=True)
+class ReadinessStrategy:
+    """How to decide a rendered page is complete."""
+    selector: Optional[str] = None
+    network_idle: bool = False
+    stable_ms: int = DEFAULT_STABLE_MS
+    poll_ms: int = DEFAULT_POLL_MS
+    deadline_ms: int = DEFAULT_DEADLINE_MS
+    min_text_chars: int = 0
+
+
+@dataclass
+class ReadinessResult:
+    waited_ms: int
+    reason: str  # "stable", "selector", "network_idle", "deadline", "too_short" or "immediate"
+
+    @property
+    def hit_deadline(self) -> bool:
+        return self.reason in ("deadline", "too_short")
+
+
+async def _wait_for_stable_text(page, strategy: ReadinessStrategy, deadline: float) -> Optional[str]:
+    """Poll the body text length until it is unchanged for ``stable_ms``.
+
+    Returns None once stable, else why the deadline was hit: ``"too_short"``
+    if the text never reached ``min_text_chars``, otherwise ``"deadline"``.
+    """
+    last_length = await page.evaluate(_TEXT_LENGTH_JS)
+    stable_since = time.monotonic()
+    while True:
+        now = time.monotonic()
+        long_enough = last_length >= strategy.min_text_chars
+        if long_enough and (now - stable_since) * 1000 >= strategy.stable_ms:
+            return None
+        if now >= deadline:
+            return "deadline" if long_enough else "too_short"
+        await page.wait_for_timeout(min(strategy.poll_ms, max(1, int((deadline - now) * 1000))))
+        length = await page.evaluate(_TEXT_LENGTH_JS)
+        if length != last_length:
+            last_length = length
+            stable_since = time.monotonic()
+
+
+async def wait_until_ready(page, strategy: ReadinessStrategy) -> ReadinessResult:
+    """Wait for ``page`` per ``strategy``; never longer than ``deadline_ms``."""
+    start = time.monotonic()
+    deadline = start + strategy.deadline_ms / 1000
+
+    def remaining_ms() -> int:
+        return max(1, int((deadline - time.monotonic()) * 1000))
+
+    def result(reason: str) -> ReadinessResult:
+        return ReadinessResult(waited_ms=int((time.monotonic() - start) * 1000), reason=reason)
+
+    reason = "immediate"
+    try:
+        if strategy.selector:
+            await page.wait_for_selector(strategy.selector, state="attached", timeout=remaining_ms())
+            reason = "selector"
+        if strategy.network_idle:
+            await page.wait_for_load_state("networkidle", timeout=remaining_ms())
+            reason = "network_idle"
+    except PlaywrightTimeoutError:
+        return result("deadline")
+
+    if strategy.stable_ms > 0 or strategy.min_text_chars > 0:
+        timed_out = await _wait_for_stable_text(page, strategy, deadline)
+        if timed_out:
+            return result(timed_out)
+        reason = "stable"
+    return result(reason)
@@ -0,0 +1,139 @@
+"""
+Adaptive renderer selection for the T&S Policy Watcher.
+
+Pages configured with ``"renderer": "auto"`` (or every page, when
+ADAPTIVE_RENDERER=1) are fetched cheapest-first: plain httpx, escalating to
+Playwright only when the HTTP response is unusable:
+
+- A bot wall or challenge page (known challenge markers), including one
+  served as an HTTP error, and a plain 403. A 429/503 without challenge
+  markers is the host asking us to slow down, so it goes through the
+  normal Retry-After pacing and retries instead
+- A page that needs JavaScript to render (tiny cleaned text)
+- A missing content root on platforms that declare ``expect_content_root``
+
+The renderer that worked is remembered per slug in ``renderer_cache.json``
+next to the snapshots, for RENDERER_CACHE_TTL_HOURS (default 72), so later
+runs go straight to it. Expired entries are probed with httpx again.
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Optional
+
+HTTPX = "httpx"
+PLAYWRIGHT = "playwright"
+AUTO = "auto"
+
+RENDERER_CACHE_FILENAME = "renderer_cache.json"
+DEFAULT_TTL_HOURS = 72
+
+# Matched case-insensitively against the cleaned text
+CHALLENGE_TEXT_MARKERS = (
+    "just a moment...",
+    "checking your browser",
+    "verify you are human",
+    "attention required! | cloudflare",
+    "access denied",
+    "enable javascript",
+    "javascript is disabled",
+    "without javascript enabled",
+    "please enable cookies",
+)
+
+# Matched against the raw HTML; specific to interstitial pages
+CHALLENGE_HTML_MARKERS = (
+    "cf-browser-verification",
+    "cf-chl-",
+    "_Incapsula_Resource",
+    "px-captcha",
+    "ddos-guard",
+)
+
+# Statuses that mean "not for this client" even without a challenge page
+BLOCKED_STATUSES = (403,)
+
+
+def unusable_content_reason(html: str, cleaned: str, root_found: bool,
+                            min_text_chars: int, expect_content_root: bool = False) -> Optional[str]:
+    """Why an HTTP-fetched page can't be used as a snapshot, or None if it can."""
+    lowered = cleaned.lower()
+    for marker in CHALLENGE_TEXT_MARKERS:
+        if marker in lowered:
+            return f"challenge marker {marker!r}"
+    for marker in CHALLENGE_HTML_MARKERS:
+        if marker in html:
+            return f"challenge marker {marker!r}"
+    if expect_content_root and not root_found:
+        return "content root missing"
+    if len(cleaned) < min_text_chars:
+        return f"cleaned text too short ({len(cleaned)} < {min_text_chars} chars)"
+    return None
+
+
+def blocked_response_reason(status: Optional[int], body: str) -> Optional[str]:
+    """Why an HTTP error response looks like a bot wall a browser may get past, or None."""
+    lowered = body.lower()
+    for marker in CHALLENGE_TEXT_MARKERS:
+        if marker in lowered:
+            return f"HTTP {status} challenge marker {marker!r}"
+    for marker in CHALLENGE_HTML_MARKERS:
+        if marker in body:
+            return f"HTTP {status} challenge marker {marker!r}"
+    if status in BLOCKED_STATUSES:
+        return f"HTTP {status}"
+    return None
+
+
+class RendererCache:
+    """Per-slug memory of the cheapest renderer that produced usable content."""
+
+    def __init__(self, path: Path, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.path = Path(path)
+        self.ttl = timedelta(hours=ttl_hours)
+        self.entries: dict[str, dict] = {}
+        self._dirty = False
+
+    def load(self) -> "RendererCache":
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.entries = data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, OSError) as exc:
+                print(f"    - WARNING: Ignoring unreadable renderer cache at {self.path}: {exc}", file=sys.stderr)
+                self.entries = {}
+        return self
+
+    def get(self, slug: str, now: Optional[datetime] = None) -> Optional[str]:
+        """The remembered renderer for a slug, or None when unknown or expired."""
+        entry = self.entries.get(slug)
+        if not isinstance(entry, dict) or entry.get("renderer") not in (HTTPX, PLAYWRIGHT):
+            return None
+        try:
+            chosen_at = datetime.fromisoformat(entry["chosen_at"].replace("Z", "+00:00"))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if (now or datetime.now(UTC)) - chosen_at > self.ttl:
+            return None
+        return entry["renderer"]
+
+    def remember(self, slug: str, renderer: str, reason: Optional[str] = None,
+                 now: Optional[datetime] = None) -> None:
+        previous = self.entries.get(slug, {})
+        if previous.get("renderer") == renderer and self.get(slug, now) == renderer:
+            return
+        self.entries[slug] = {
+            "renderer": renderer,
+            "chosen_at": (now or datetime.now(UTC)).isoformat().replace("+00:00", "Z"),
+            "reason": reason,
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8")
+        self._dirty = False
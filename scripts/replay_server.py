@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Local stand-in server that replays a cassette for the T&S Policy Watcher.
+
+Serves the pages recorded in a cassette (see cassette.py) so fetch.py and
+health_check.py can run end to end on an offline box, with
+URL_REWRITE_PREFIX pointing at this server. Network conditions are
+simulated per request:
+
+- ``--latency-ms`` plus up to ``--jitter-ms`` of extra delay
+- ``--error-rate`` of requests fail with ``--error-status`` (default 503),
+  with ``Retry-After: --retry-after`` when set
+- Bot walls: ``--bot-wall-rate`` of pages, and with ``--bot-wall-recorded``
+  every page that was recorded with Playwright, answer with a challenge
+  page that only a browser gets past (its script sets a cookie and
+  reloads), so the adaptive renderer escalates like it does live
+- Conditional requests get 304 when the recorded ETag/Last-Modified match,
+  and bodies are sent gzip-encoded when the client accepts it
+
+Random choices are derived from ``--seed``, the URL and how often the URL
+was requested, so the same run sees the same delays and failures however
+its requests interleave. ``GET /__replay__/stats`` returns request counts.
+
+Usage:
+    python scripts/replay_server.py serve <cassette> [--port 8700] [--latency-ms 150 --jitter-ms 100]
+    python scripts/replay_server.py import-snapshots <cassette>
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+from cassette import Cassette, original_url
+from snapshot_store import read_snapshot, snapshot_exists
+
+DEFAULT_PORT = 8700
+STATS_PATH = "/__replay__/stats"
+BOT_WALL_COOKIE = "replay_challenge=passed"
+BOT_WALL_HTML = f"""<!DOCTYPE html>
+<html><head><title>Just a moment...</title></head>
+<body><div id="cf-browser-verification"><h1>Just a moment...</h1><p>Checking your browser before accessing the site.</p></div>
+<script>document.cookie = "{BOT_WALL_COOKIE}; path=/"; location.reload();</script>
+</body></html>
+"""
+
+
+@dataclass
+class ReplayOptions:
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    error_rate: float = 0
+    error_status: int = 503
+    retry_after: Optional[int] = None
+    bot_wall_rate: float = 0
+    bot_wall_recorded: bool = False
+    seed: int = 0
+
+
+class ReplayServer:
+    """Threaded HTTP server answering from a cassette; also usable in-process (tests, benchmarks)."""
+
+    def __init__(self, cassette: Cassette, options: Optional[ReplayOptions] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.cassette = cassette
+        self.options = options or ReplayOptions()
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._request_counts: dict[str, int] = {}
+        self.stats = {"requests": 0, "statuses": {}, "bytes_sent": 0, "bot_walls": 0, "unknown_urls": []}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _rng(self, url: str) -> random.Random:
+        with self._lock:
+            count = self._request_counts.get(url, 0)
+            self._request_counts[url] = count + 1
+        return random.Random(f"{self.options.seed}:{url}:{count}")
+
+    def _count(self, status: int, sent: int) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            key = str(status)
+            self.stats["statuses"][key] = self.stats["statuses"].get(key, 0) + 1
+            self.stats["bytes_sent"] += sent
+
+    def respond(self, method: str, path: str, headers: dict) -> tuple[int, dict, bytes]:
+        """(status, headers, body) for one request, after the simulated delay."""
+        if path == STATS_PATH:
+            with self._lock:
+                body = json.dumps(self.stats).encode("utf-8")
+            return 200, {"Content-Type": "application/json", "Content-Length": str(len(body))}, body
+
+        url = original_url(path)
+        entry = self.cassette.get(url) if url else None
+        if entry is None:
+            with self._lock:
+                if url and len(self.stats["unknown_urls"]) < 50:
+                    self.stats["unknown_urls"].append(url)
+            return self._finish(404, {"Content-Type": "text/plain"}, b"Not recorded\n", method)
+
+        options = self.options
+        rng = self._rng(url)
+        delay_ms = options.latency_ms + rng.uniform(0, options.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if rng.random() < options.error_rate:
+            error_headers = {"Content-Type": "text/plain"}
+            if options.retry_after is not None:
+                error_headers["Retry-After"] = str(options.retry_after)
+            return self._finish(options.error_status, error_headers, b"Injected error\n", method)
+
+        walled = options.bot_wall_recorded and entry.get("renderer") == "playwright"
+        if (walled or rng.random() < options.bot_wall_rate) and BOT_WALL_COOKIE not in headers.get("cookie", ""):
+            with self._lock:
+                self.stats["bot_walls"] += 1
+            return self._finish(200, {"Content-Type": "text/html; charset=utf-8", "Cache-Control": "no-store"},
+                                BOT_WALL_HTML.encode("utf-8"), method)
+
+        response_headers = {"Content-Type": entry["content_type"]}
+        if entry.get("etag"):
+            response_headers["ETag"] = entry["etag"]
+        if entry.get("last_modified"):
+            response_headers["Last-Modified"] = entry["last_modified"]
+        if ((entry.get("etag") and headers.get("if-none-match") == entry["etag"])
+                or (entry.get("last_modified") and headers.get("if-modified-since") == entry["last_modified"])):
+            return self._finish(304, response_headers, b"", method)
+
+        if "gzip" in headers.get("accept-encoding", ""):
+            response_headers["Content-Encoding"] = "gzip"
+            body = self.cassette.compressed_body(entry)
+        else:
+            body = self.cassette.body(entry)
+        return self._finish(entry.get("status", 200), response_headers, body, method)
+
+    def _finish(self, status: int, headers: dict, body: bytes, method: str) -> tuple[int, dict, bytes]:
+        headers["Content-Length"] = str(len(body))
+        if method == "HEAD":
+            body = b""
+        self._count(status, len(body))
+        return status, headers, body
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL for URL_REWRITE_PREFIX."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                status, headers, body = server.respond(
+                    self.command, self.path, {key.lower(): value for key, value in self.headers.items()})
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            do_GET = do_HEAD = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def wait(self) -> None:
+        """Block until the server is stopped."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "ReplayServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def import_snapshots(cassette: Cassette, pages: list[dict], snapshots_dir: Path,
+                     load_validators: Callable[[Path], dict] = lambda slug_dir: {}) -> int:
+    """Record each page's stored snapshot (and validators) under its URL; returns the pages recorded."""
+    recorded = 0
+    for page in pages:
+        slug_dir = snapshots_dir / page["slug"]
+        if not snapshot_exists(slug_dir):
+            print(f"    - WARNING: No snapshot for {page['slug']}; not recorded.", file=sys.stderr)
+            continue
+        cassette.record(page["url"], read_snapshot(slug_dir), load_validators(slug_dir),
+                        page.get("renderer", "httpx"))
+        recorded += 1
+    return recorded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded policy pages for offline runs and benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Serve a cassette over HTTP")
+    serve.add_argument("cassette", type=Path)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--latency-ms", type=float, default=0)
+    serve.add_argument("--jitter-ms", type=float, default=0)
+    serve.add_argument("--error-rate", type=float, default=0, help="Fraction of requests that fail (0-1)")
+    serve.add_argument("--error-status", type=int, default=503)
+    serve.add_argument("--retry-after", type=int, default=None, help="Retry-After seconds on injected errors")
+    serve.add_argument("--bot-wall-rate", type=float, default=0, help="Fraction of requests that get a challenge page")
+    serve.add_argument("--bot-wall-recorded", action="store_true",
+                       help="Challenge non-browser clients on pages recorded with Playwright")
+    serve.add_argument("--seed", type=int, default=0)
+
+    importer = subparsers.add_parser("import-snapshots", help="Build a cassette from the stored snapshots")
+    importer.add_argument("cassette", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "import-snapshots":
+        import fetch  # Only needed here; serving doesn't load the fetcher
+
+        pages = json.loads(fetch.URL_CONFIG_FILE.read_text(encoding="utf-8"))
+        cassette = Cassette(args.cassette).load()
+        recorded = import_snapshots(cassette, pages, fetch.SNAPSHOTS_DIR, fetch.load_http_validators)
+        cassette.save()
+        print(f"Recorded {recorded} of {len(pages)} page(s) from {fetch.SNAPSHOTS_DIR} into {args.cassette}.")
+        return
+
+    cassette = Cassette(args.cassette).load()
+    if not cassette.entries:
+        print(f"FATAL: No recorded pages in {args.cassette}", file=sys.stderr)
+        sys.exit(1)
+    options = ReplayOptions(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status, args.retry_after,
+                            args.bot_wall_rate, args.bot_wall_recorded, args.seed)
+    server = ReplayServer(cassette, options, args.host, args.port)
+    base_url = server.start()
+    print(f"Replaying {len(cassette.entries)} page(s) from {args.cassette} at {base_url}")
+    print(f"Point the watcher at it with URL_REWRITE_PREFIX={base_url}")
+    try:
+        server.wait()
+    except KeyboardInterrupt:
+        print("Stopping replay server.")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
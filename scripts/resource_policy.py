@@ -0,0 +1,89 @@
+"""
+Resource policy for Playwright page loads.
+
+We only keep the rendered HTML, so images, fonts, media, stylesheets and
+analytics beacons are wasted bandwidth and load time. A ResourcePolicy is
+applied through Playwright request routing in browser_pool.py and aborts:
+
+- Requests whose Playwright resource type is blocked (never the document)
+- Requests to known tracker/analytics domains (and their subdomains)
+
+Scripts are allowed by default because the TikTok and Meta pages render
+client-side; per-platform overrides live in extraction_rules.json under
+``"browser"``. Health checks use DOCUMENT_ONLY, since they only need the
+status code. Set BROWSER_BLOCK_RESOURCES=0 to disable blocking entirely
+(fetch.py and health_check.py both read it through blocking_enabled()).
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+from urllib.parse import urlsplit
+
+# Playwright request.resource_type values we never need to capture the HTML
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+
+# Valid request.resource_type values, for validating config
+RESOURCE_TYPES = frozenset({
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+})
+
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "connect.facebook.net",
+    "analytics.tiktok.com",
+    "analytics.twitter.com",
+    "bat.bing.com",
+    "hotjar.com",
+    "cdn.segment.com",
+    "api.segment.io",
+    "scorecardresearch.com",
+    "js-agent.newrelic.com",
+    "bam.nr-data.net",
+)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """Which subresources a page load may skip."""
+    blocked_resource_types: frozenset = frozenset(DEFAULT_BLOCKED_RESOURCE_TYPES)
+    blocked_domains: tuple = TRACKER_DOMAINS
+
+    @classmethod
+    def build(cls, blocked_resource_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+              block_trackers: bool = True) -> "ResourcePolicy":
+        return cls(
+            # The main document is always fetched, whatever the config says
+            blocked_resource_types=frozenset(blocked_resource_types) - {"document"},
+            blocked_domains=TRACKER_DOMAINS if block_trackers else (),
+        )
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type == "document":
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        if self.blocked_domains:
+            host = (urlsplit(url).hostname or "").lower()
+            return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+        return False
+
+
+ALLOW_ALL = ResourcePolicy(blocked_resource_types=frozenset(), blocked_domains=())
+DEFAULT_POLICY = ResourcePolicy.build()
+# Health checks only look at the main document's status code
+DOCUMENT_ONLY = ResourcePolicy.build(RESOURCE_TYPES)
+
+BLOCK_RESOURCES_ENV = "BROWSER_BLOCK_RESOURCES"
+# Values that turn blocking off; unset or empty keeps the default (on)
+DISABLED_VALUES = frozenset({"0", "false", "no", "off"})
+
+
+def blocking_enabled(environ: Mapping[str, str] = os.environ) -> bool:
+    """Whether BROWSER_BLOCK_RESOURCES leaves subresource blocking on."""
+    return environ.get(BLOCK_RESOURCES_ENV, "").strip().lower() not in DISABLED_VALUES
@@ -0,0 +1,251 @@
+"""
+Deterministic sharding of fetch runs for the T&S Policy Watcher.
+
+fetch.py used to handle the whole URL list in one process. ``fetch.py
+--shard i/N`` fetches only shard i (1-based) of N, so a run can fan out
+across CI runners or machines, one checkout per shard:
+
+- Pages are balanced by historical fetch cost: the median response time of
+  recent successful checks in ``url_health.json`` (pages with no history
+  cost the median of the others). The heaviest pages are placed first, each
+  on the least-loaded shard, with ties broken by slug, so every shard
+  computes the same split from the same files. Costs are read from the
+  committed ``url_health.json`` (``git show HEAD:``), since each runner's
+  health step rewrites its working copy before the fetch
+- A shard writes its snapshots as usual, but instead of ``run_log.json``
+  and ``failures.log`` it writes ``run_log.shard-<i>-of-<N>.json``, with the
+  configured pages, its slugs, its run log entry and its failures
+- ``python scripts/sharding.py merge <shard dir> ...`` combines the shard
+  outputs (each a checkout or artifact with the same layout) into one run
+  log entry and ``failures.log``, and copies each shard's snapshot
+  directories and per-slug renderer cache and poll schedule entries into
+  the local snapshots directory. It refuses shards whose splits disagree:
+  a page fetched by two shards, or by none when every shard is present
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+from fetch_metrics import summarize
+
+DEFAULT_COST_MS = 1000
+PARTIAL_RUN_LOG_GLOB = "run_log.shard-*.json"
+
+# Per-slug JSON maps kept next to the snapshots, merged entry by entry
+SHARED_SLUG_FILES = ("renderer_cache.json", "poll_schedule.json")
+
+
+class ShardError(ValueError):
+    """A shard spec or shard output is invalid."""
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """``"i/N"`` as (i, N), with 1 <= i <= N."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ShardError(f"Invalid shard {spec!r}; expected i/N, e.g. 1/4") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ShardError(f"Invalid shard {spec!r}; i must be between 1 and N")
+    return index, count
+
+
+def partial_run_log_name(index: int, count: int) -> str:
+    return f"run_log.shard-{index}-of-{count}.json"
+
+
+def page_costs(pages: list[dict], health_db: dict) -> dict[str, float]:
+    """Median response time in ms of each page's recent successful health checks."""
+    records = health_db.get("urls", {}) if isinstance(health_db, dict) else {}
+    costs = {}
+    for page in pages:
+        history = (records.get(page["url"]) or {}).get("health_history") or []
+        times = [check.get("response_time_ms") for check in history
+                 if isinstance(check, dict) and check.get("status") != "failed"]
+        times = [t for t in times if isinstance(t, (int, float)) and t > 0]
+        if times:
+            costs[page["slug"]] = statistics.median(times)
+    default = statistics.median(costs.values()) if costs else DEFAULT_COST_MS
+    return {page["slug"]: costs.get(page["slug"], default) for page in pages}
+
+
+def committed_health_db(path: Path, revision: str = "HEAD", cwd: Optional[Path] = None) -> Optional[dict]:
+    """The health database ``path`` as committed at ``revision``, or None when git can't provide it."""
+    try:
+        proc = subprocess.run(["git", "show", f"{revision}:./{Path(path).as_posix()}"],
+                              cwd=cwd, capture_output=True)
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    try:
+        data = json.loads(proc.stdout)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def assign_shards(pages: list[dict], costs: dict[str, float], count: int) -> list[list[dict]]:
+    """Split ``pages`` into ``count`` cost-balanced shards, each in configuration order."""
+    loads = [0.0] * count
+    members: list[set[str]] = [set() for _ in range(count)]
+    for page in sorted(pages, key=lambda p: (-costs.get(p["slug"], DEFAULT_COST_MS), p["slug"])):
+        target = min(range(count), key=lambda shard: (loads[shard], shard))
+        loads[target] += costs.get(page["slug"], DEFAULT_COST_MS)
+        members[target].add(page["slug"])
+    return [[page for page in pages if page["slug"] in shard_slugs] for shard_slugs in members]
+
+
+def select_shard(pages: list[dict], index: int, count: int, health_db: dict) -> list[dict]:
+    return assign_shards(pages, page_costs(pages, health_db), count)[index - 1]
+
+
+def _add_counts(total: dict, counts: Optional[dict]) -> None:
+    for key, value in (counts or {}).items():
+        total[key] = total.get(key, 0) + value
+
+
+def merge_run_entries(entries: list[dict], page_metrics: Optional[list[dict]] = None) -> dict:
+    """One run log entry from the shard entries of a run.
+
+    ``page_metrics`` are the shards' per-page metrics records; percentiles
+    can't be combined from the shard summaries, so they are recomputed.
+    """
+    merged = {
+        "timestamp_utc": min(entry["timestamp_utc"] for entry in entries),
+        "status": "success" if all(entry["status"] == "success" for entry in entries) else "partial_failure",
+        "pages_checked": sum(entry.get("pages_checked", 0) for entry in entries),
+        "changes_found": sum(entry.get("changes_found", 0) for entry in entries),
+        "errors": [error for entry in entries for error in entry.get("errors", [])],
+        "conditional_get": {},
+        "readiness_waits": {},
+        "renderers": {},
+    }
+    for entry in entries:
+        _add_counts(merged["conditional_get"], entry.get("conditional_get"))
+        _add_counts(merged["renderers"], entry.get("renderers"))
+        if "schedule" in entry:
+            _add_counts(merged.setdefault("schedule", {}), entry["schedule"])
+        for platform, stats in (entry.get("readiness_waits") or {}).items():
+            total = merged["readiness_waits"].setdefault(
+                platform, {"pages": 0, "total_wait_ms": 0, "max_wait_ms": 0, "deadline_hits": 0})
+            total["pages"] += stats["pages"]
+            total["total_wait_ms"] += stats["total_wait_ms"]
+            total["max_wait_ms"] = max(total["max_wait_ms"], stats["max_wait_ms"])
+            total["deadline_hits"] += stats["deadline_hits"]
+            total["avg_wait_ms"] = total["total_wait_ms"] // total["pages"]
+    if page_metrics is not None:
+        # Shards run side by side, so the run took as long as the slowest one
+        walls = [entry["metrics"]["wall_ms"] for entry in entries if "wall_ms" in entry.get("metrics", {})]
+        merged["metrics"] = summarize(page_metrics, max(walls) if walls else None)
+    merged["shards"] = len(entries)
+    return merged
+
+
+def load_partial_run_logs(shard_dirs: Iterable[Path]) -> list[tuple[Path, dict]]:
+    """(shard dir, partial run log) for every shard output; all must belong to one N-way split."""
+    partials = []
+    for shard_dir in shard_dirs:
+        paths = sorted(Path(shard_dir).glob(PARTIAL_RUN_LOG_GLOB))
+        if not paths:
+            raise ShardError(f"No {PARTIAL_RUN_LOG_GLOB} in {shard_dir}")
+        for path in paths:
+            try:
+                partials.append((Path(shard_dir), json.loads(path.read_text(encoding="utf-8"))))
+            except (json.JSONDecodeError, OSError) as exc:
+                raise ShardError(f"Unreadable shard output {path}: {exc}") from None
+
+    specs = [parse_shard(partial["shard"]) for _, partial in partials]
+    counts = {count for _, count in specs}
+    if len(counts) != 1:
+        raise ShardError(f"Shard outputs come from different splits: {sorted(p['shard'] for _, p in partials)}")
+    count = counts.pop()
+    indices = sorted(index for index, _ in specs)
+    if indices != list(range(1, count + 1)):
+        print(f"    - WARNING: Merging shards {indices} of {count}; missing shards are not in the run log.",
+              file=sys.stderr)
+    partials = sorted(partials, key=lambda item: parse_shard(item[1]["shard"]))
+    check_coverage([partial for _, partial in partials], count)
+    return partials
+
+
+def check_coverage(partials: list[dict], count: int) -> None:
+    """Raise ShardError unless the shards split one page list without overlaps or gaps."""
+    owners: dict[str, str] = {}
+    for partial in partials:
+        for slug in partial["slugs"]:
+            if slug in owners:
+                raise ShardError(f"{slug} was fetched by shards {owners[slug]} and {partial['shard']}; "
+                                 f"the shards computed different splits")
+            owners[slug] = partial["shard"]
+
+    page_lists = {tuple(partial["pages"]) for partial in partials if partial.get("pages")}
+    if len(page_lists) > 1:
+        raise ShardError("Shard outputs were split from different page lists")
+    if page_lists and len(partials) == count:
+        pages = set(page_lists.pop())
+        missing = sorted(pages - owners.keys())
+        unknown = sorted(owners.keys() - pages)
+        if missing or unknown:
+            raise ShardError(f"Shards don't cover the configured pages (missing: {missing}, unknown: {unknown}); "
+                             f"the shards computed different splits")
+
+
+def merge_slug_files(shard_snapshots: Path, snapshots_dir: Path, slugs: list[str]) -> None:
+    """Copy a shard's snapshot directories and its slugs' entries in the shared per-slug files."""
+    if shard_snapshots.resolve() == snapshots_dir.resolve():
+        return
+    for slug in slugs:
+        source = shard_snapshots / slug
+        if source.is_dir():
+            shutil.copytree(source, snapshots_dir / slug, dirs_exist_ok=True)
+    for name in SHARED_SLUG_FILES:
+        source = shard_snapshots / name
+        if not source.exists():
+            continue
+        target = snapshots_dir / name
+        merged = json.loads(target.read_text(encoding="utf-8")) if target.exists() else {}
+        shard_entries = json.loads(source.read_text(encoding="utf-8"))
+        merged.update({slug: shard_entries[slug] for slug in slugs if slug in shard_entries})
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(merged, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def main() -> None:
+    import fetch  # CLI only; fetch.py imports this module
+
+    parser = argparse.ArgumentParser(description="Merge the outputs of sharded fetch runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge = subparsers.add_parser("merge", help="Combine shard outputs into run_log.json and failures.log")
+    merge.add_argument("shard_dirs", nargs="+", type=Path,
+                       help="Shard checkouts or artifacts containing run_log.shard-*.json")
+    args = parser.parse_args()
+
+    try:
+        partials = load_partial_run_logs(args.shard_dirs)
+    except ShardError as e:
+        print(f"FATAL: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    failures = []
+    page_metrics = []
+    for shard_dir, partial in partials:
+        merge_slug_files(shard_dir / fetch.SNAPSHOTS_DIR, fetch.SNAPSHOTS_DIR, partial["slugs"])
+        failures.extend(partial.get("failures", []))
+        page_metrics.extend(partial.get("page_metrics", []))
+
+    entry = merge_run_entries([partial["run"] for _, partial in partials], page_metrics)
+    fetch.append_run_log(entry)
+    fetch.write_failure_log(failures)
+    print(f"Merged {len(partials)} shard(s): {entry['pages_checked']} pages checked, "
+          f"{entry['changes_found']} changes found, {len(failures)} failures.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compressed snapshot storage for the T&S Policy Watcher.
+
+Raw HTML snapshots (up to ~1.4 MB per page) used to be stored and committed
+as plain ``snapshot.html``. They are now written gzip-compressed as
+``snapshot.html.gz`` and every reader goes through this module:
+
+- read_snapshot() / write_snapshot() pick whichever variant exists, so
+  plain and compressed snapshots can coexist during the migration
+- Compression is deterministic (no timestamp or name in the gzip header),
+  so unchanged HTML produces byte-identical files
+- read_snapshot_at() reads a snapshot from any commit, for the notifier
+- ``python scripts/snapshot_store.py migrate`` converts existing plain
+  snapshots in one pass (``--compression none`` converts back)
+
+SNAPSHOT_COMPRESSION=none keeps writing plain HTML.
+"""
+
+import argparse
+import gzip
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+SNAPSHOT_BASENAME = "snapshot.html"
+COMPRESSED_SUFFIX = ".gz"
+GZIP = "gzip"
+NONE = "none"
+COMPRESSIONS = (GZIP, NONE)
+DEFAULT_COMPRESSION = GZIP
+
+# Preferred first when both variants exist
+SNAPSHOT_FILENAMES = (SNAPSHOT_BASENAME + COMPRESSED_SUFFIX, SNAPSHOT_BASENAME)
+
+
+def configured_compression() -> str:
+    compression = os.getenv("SNAPSHOT_COMPRESSION", DEFAULT_COMPRESSION).strip().lower() or DEFAULT_COMPRESSION
+    if compression not in COMPRESSIONS:
+        print(f"    - WARNING: Unsupported SNAPSHOT_COMPRESSION={compression!r}; using {DEFAULT_COMPRESSION}.",
+              file=sys.stderr)
+        return DEFAULT_COMPRESSION
+    return compression
+
+
+def is_snapshot_file(path: str) -> bool:
+    """True for repo paths of stored snapshots, compressed or not."""
+    return Path(path).name in SNAPSHOT_FILENAMES
+
+
+def snapshot_file(slug_dir: Path) -> Optional[Path]:
+    """The stored snapshot file in ``slug_dir``, or None."""
+    for name in SNAPSHOT_FILENAMES:
+        path = Path(slug_dir) / name
+        if path.exists():
+            return path
+    return None
+
+
+def snapshot_exists(slug_dir: Path) -> bool:
+    return snapshot_file(slug_dir) is not None
+
+
+def decode_snapshot(data: bytes, name: str) -> str:
+    if name.endswith(COMPRESSED_SUFFIX):
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
+
+
+def encode_snapshot(html: str, compression: str) -> bytes:
+    data = html.encode("utf-8")
+    if compression == GZIP:
+        data = gzip.compress(data, compresslevel=9, mtime=0)
+    return data
+
+
+def read_snapshot(slug_dir: Path) -> str:
+    """HTML of the stored snapshot; raises FileNotFoundError when there is none."""
+    path = snapshot_file(slug_dir)
+    if path is None:
+        raise FileNotFoundError(f"No snapshot in {slug_dir}")
+    return decode_snapshot(path.read_bytes(), path.name)
+
+
+def write_snapshot(slug_dir: Path, html: str, compression: Optional[str] = None) -> Path:
+    """Store ``html`` atomically, replacing the other variant if present."""
+    compression = compression or configured_compression()
+    name = SNAPSHOT_BASENAME + (COMPRESSED_SUFFIX if compression == GZIP else "")
+    slug_dir = Path(slug_dir)
+    slug_dir.mkdir(parents=True, exist_ok=True)
+    path = slug_dir / name
+    tmp_path = path.with_name(name + ".tmp")
+    tmp_path.write_bytes(encode_snapshot(html, compression))
+    tmp_path.replace(path)
+    for other in SNAPSHOT_FILENAMES:
+        if other != name:
+            (slug_dir / other).unlink(missing_ok=True)
+    return path
+
+
+def read_snapshot_at(revision: str, slug_dir: str, cwd: Optional[Path] = None) -> Optional[str]:
+    """HTML of the snapshot in repo directory ``slug_dir`` at a git revision, or None."""
+    for name in SNAPSHOT_FILENAMES:
+        proc = subprocess.run(["git", "show", f"{revision}:{Path(slug_dir, name).as_posix()}"],
+                              cwd=cwd, capture_output=True)
+        if proc.returncode == 0:
+            return decode_snapshot(proc.stdout, name)
+    return None
+
+
+def migrate_snapshots(base_dir: Path, compression: str = DEFAULT_COMPRESSION) -> dict:
+    """Rewrite every snapshot under ``base_dir`` with ``compression``; returns byte totals."""
+    stats = {"files": 0, "bytes_before": 0, "bytes_after": 0}
+    target = SNAPSHOT_BASENAME + (COMPRESSED_SUFFIX if compression == GZIP else "")
+    for slug_dir in sorted(p for p in Path(base_dir).iterdir() if p.is_dir()):
+        path = snapshot_file(slug_dir)
+        if path is None or path.name == target:
+            continue
+        before = path.stat().st_size
+        written = write_snapshot(slug_dir, decode_snapshot(path.read_bytes(), path.name), compression)
+        stats["files"] += 1
+        stats["bytes_before"] += before
+        stats["bytes_after"] += written.stat().st_size
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage stored policy snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="Convert existing snapshots to the given compression")
+    migrate.add_argument("--dir", type=Path, default=Path("snapshots/production"),
+                         help="Snapshot environment directory (default: snapshots/production)")
+    migrate.add_argument("--compression", choices=COMPRESSIONS, default=DEFAULT_COMPRESSION)
+    args = parser.parse_args()
+
+    if not args.dir.is_dir():
+        print(f"Snapshot directory not found: {args.dir}", file=sys.stderr)
+        sys.exit(1)
+    stats = migrate_snapshots(args.dir, args.compression)
+    print(f"Migrated {stats['files']} snapshots in {args.dir}: "
+          f"{stats['bytes_before']} -> {stats['bytes_after']} bytes")
+
+
+if __name__ == "__main__":
+    main()
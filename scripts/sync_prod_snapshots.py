@@ -12,6 +12,8 @@ import os
 from pathlib import Path
 import json
 
+from snapshot_store import snapshot_file
+
 def get_available_policies():
     """Get list of available policies from configuration."""
     config_file = Path("platform_urls.json")
@@ -116,10 +118,10 @@ def list_production_policies():
     for item in source_dir.iterdir():
         if item.is_dir():
             # Get policy info
-            snapshot_file = item / "snapshot.html"
-            if snapshot_file.exists():
-                size = snapshot_file.stat().st_size
-                modified = snapshot_file.stat().st_mtime
+            stored_file = snapshot_file(item)
+            if stored_file is not None:
+                size = stored_file.stat().st_size
+                modified = stored_file.stat().st_mtime
                 policies.append({
                     'name': item.name,
                     'size': size,
@@ -0,0 +1,337 @@
+"""
+Long-running watcher daemon for self-hosted deployments.
+
+Each GitHub Actions run is a cold process: it reinstalls Playwright,
+re-imports BeautifulSoup and google.generativeai and relaunches Chromium.
+``python scripts/watcher_daemon.py`` stays up instead and runs the same
+cycles on an internal schedule:
+
+- health: health_check.py's checks and alerts, every --health-interval
+  minutes (default 360)
+- fetch: fetch.py's run, with the HTTP client and browser pool kept warm
+  between runs. Adaptive polling (poll_scheduler.py) is on by default, so
+  each run every --fetch-interval minutes (default 60) only fetches the
+  pages that are due. ADAPTIVE_POLLING=0 turns it off: every run then
+  fetches all pages, and --fetch-interval defaults to the watch workflow's
+  weekly cadence (10080) instead
+- diff: with --commit, snapshot changes are committed (as the workflow does)
+  and diff_and_notify.py summarizes them in-process
+
+On-demand runs: write a command per line to the control file (default
+``.watcher/control``): ``fetch``, ``fetch-all``, ``health``, ``diff`` or
+``stop``. The daemon picks it up within --poll-seconds and reports job
+times and results in ``.watcher/status.json``. SIGINT/SIGTERM stop it
+after the current job.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import fetch
+from browser_pool import BrowserPool
+from extraction_rules import ExtractionRulesError, load_extraction_rules
+from health_check import URLHealthChecker, run_health_check_cycle
+from http_client import create_async_client, create_client
+
+DEFAULT_STATE_DIR = Path(".watcher")
+CONTROL_FILENAME = "control"
+STATUS_FILENAME = "status.json"
+DEFAULT_FETCH_INTERVAL_MINUTES = 60
+# Without adaptive polling every run fetches every page: match watch.yml's weekly cron
+FULL_FETCH_INTERVAL_MINUTES = 7 * 24 * 60
+DEFAULT_HEALTH_INTERVAL_MINUTES = 360
+DEFAULT_POLL_SECONDS = 5
+
+COMMANDS = ("fetch", "fetch-all", "health", "diff", "stop")
+SNAPSHOT_COMMIT_MESSAGE = "CHORE: Update T&S policy snapshots and health data"
+
+
+def format_timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat().replace("+00:00", "Z") if value else None
+
+
+@dataclass
+class Job:
+    """A cycle run on an interval (``interval`` None: on demand only)."""
+
+    name: str
+    run: Callable[[], Awaitable[str]]
+    interval: Optional[timedelta]
+    next_run: Optional[datetime] = None
+    requested: bool = False
+    last_run: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_result: Optional[str] = None
+    runs: int = 0
+    failures: int = 0
+
+    def is_due(self, now: datetime) -> bool:
+        return self.requested or (self.next_run is not None and self.next_run <= now)
+
+    def status(self) -> dict:
+        return {
+            "interval_minutes": self.interval.total_seconds() / 60 if self.interval else None,
+            "next_run": format_timestamp(self.next_run),
+            "last_run": format_timestamp(self.last_run),
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_result": self.last_result,
+            "runs": self.runs,
+            "failures": self.failures,
+        }
+
+
+@dataclass
+class WatcherDaemon:
+    """Runs health, fetch and diff cycles in one process with warm pools."""
+
+    fetch_interval: timedelta
+    health_interval: timedelta
+    state_dir: Path = DEFAULT_STATE_DIR
+    commit: bool = False
+    poll_seconds: float = DEFAULT_POLL_SECONDS
+    jobs: dict[str, Job] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.state_dir = Path(self.state_dir)
+        self.control_path = self.state_dir / CONTROL_FILENAME
+        self.status_path = self.state_dir / STATUS_FILENAME
+        self.started_at = datetime.now(UTC)
+        self.stopping = asyncio.Event()
+        self.fetch_all_requested = False
+        self.http_client = None
+        self.browser_pool = None
+        self.health_checker = None
+        self._diff_module = None
+        now = datetime.now(UTC)
+        # Health runs first on the same tick, as in the workflow
+        self.jobs = {
+            "health": Job("health", self.run_health, self.health_interval, next_run=now),
+            "fetch": Job("fetch", self.run_fetch, self.fetch_interval, next_run=now),
+            "diff": Job("diff", self.run_diff, None),
+        }
+
+    # --- cycles ---------------------------------------------------------
+
+    async def run_health(self) -> str:
+        results = await asyncio.to_thread(run_health_check_cycle, self.health_checker)
+        system_health = results["system_health"]
+        return (f"{system_health['healthy_urls']} healthy, {system_health['degraded_urls']} degraded, "
+                f"{system_health['failed_urls']} failed")
+
+    async def run_fetch(self) -> str:
+        fetch_all, self.fetch_all_requested = self.fetch_all_requested, False
+        with open(fetch.URL_CONFIG_FILE, "r") as f:
+            pages_to_track = json.load(f)
+        entry = await fetch.fetch_and_record(pages_to_track, fetch_all=fetch_all,
+                                             http_client=self.http_client, browser_pool=self.browser_pool)
+        if entry["changes_found"] and self.commit:
+            self.jobs["diff"].requested = True
+        return f"{entry['pages_checked']} checked, {entry['changes_found']} changed, {entry['status']}"
+
+    async def run_diff(self) -> str:
+        commit_sha = await asyncio.to_thread(commit_snapshots) if self.commit else None
+        commit_sha = commit_sha or os.environ.get("COMMIT_SHA") or git_output("rev-parse", "HEAD")
+        if self._diff_module is None:
+            # Imported once and kept: google.generativeai is slow to import
+            self._diff_module = importlib.import_module("diff_and_notify")
+        os.environ["COMMIT_SHA"] = commit_sha
+        await asyncio.to_thread(self._diff_module.main)
+        return f"summarized {commit_sha[:7]}"
+
+    # --- scheduling -----------------------------------------------------
+
+    async def run_job(self, job: Job) -> None:
+        print(f"\n=== [{format_timestamp(datetime.now(UTC))}] {job.name} cycle ===")
+        job.requested = False
+        start = time.monotonic()
+        try:
+            job.last_result = await job.run()
+        except Exception as e:
+            job.failures += 1
+            job.last_result = f"error: {e}"
+            print(f"    - WARNING: {job.name} cycle failed: {e}", file=sys.stderr)
+            traceback.print_exc()
+        finished = datetime.now(UTC)
+        job.runs += 1
+        job.last_run = finished
+        job.last_duration_seconds = round(time.monotonic() - start, 1)
+        if job.interval:
+            job.next_run = finished + job.interval
+        print(f"=== {job.name} cycle finished in {job.last_duration_seconds}s: {job.last_result} ===")
+
+    def read_control(self) -> None:
+        """Apply and remove pending commands from the control file."""
+        if not self.control_path.exists():
+            return
+        # Renamed first so commands written meanwhile land in a new file
+        claimed = self.control_path.with_name(CONTROL_FILENAME + ".processing")
+        try:
+            self.control_path.replace(claimed)
+            commands = claimed.read_text(encoding="utf-8").split()
+            claimed.unlink()
+        except OSError as e:
+            print(f"    - WARNING: Could not read control file {self.control_path}: {e}", file=sys.stderr)
+            return
+        for command in commands:
+            if command not in COMMANDS:
+                print(f"    - WARNING: Ignoring unknown control command {command!r}; expected one of {COMMANDS}.",
+                      file=sys.stderr)
+            elif command == "stop":
+                self.stopping.set()
+            else:
+                if command == "fetch-all":
+                    self.fetch_all_requested = True
+                self.jobs[command.removesuffix("-all")].requested = True
+                print(f"Control: {command} requested.")
+
+    def write_status(self) -> None:
+        status = {
+            "pid": os.getpid(),
+            "started_at": format_timestamp(self.started_at),
+            "updated_at": format_timestamp(datetime.now(UTC)),
+            "jobs": {name: job.status() for name, job in self.jobs.items()},
+        }
+        tmp_path = self.status_path.with_name(STATUS_FILENAME + ".tmp")
+        tmp_path.write_text(json.dumps(status, indent=2), encoding="utf-8")
+        tmp_path.replace(self.status_path)
+
+    def seconds_until_next_job(self) -> float:
+        upcoming = [job.next_run for job in self.jobs.values() if job.next_run is not None]
+        if not upcoming:
+            return self.poll_seconds
+        wait = (min(upcoming) - datetime.now(UTC)).total_seconds()
+        return min(max(wait, 0), self.poll_seconds)
+
+    async def tick(self) -> None:
+        """Run every due or requested job once."""
+        self.read_control()
+        for job in self.jobs.values():
+            if self.stopping.is_set():
+                break
+            if job.is_due(datetime.now(UTC)):
+                await self.run_job(job)
+                self.read_control()
+        self.write_status()
+
+    async def serve(self) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # not on the main thread or not supported on this platform
+
+        self.health_checker = URLHealthChecker()
+        self.health_checker.http_client = create_client(timeout=self.health_checker.timeout_seconds)
+        if self.health_checker.enable_playwright_health:
+            self.health_checker.browser_pool = self.health_checker.create_browser_pool()
+        try:
+            # Chromium launches lazily in both pools and then stays up between cycles
+            async with create_async_client(fetch.USER_AGENT) as self.http_client, \
+                    BrowserPool(fetch.BROWSER_POOL_SIZE, fetch.BROWSER_CONTEXT_MAX_NAVIGATIONS,
+                                user_agent=fetch.USER_AGENT) as self.browser_pool:
+                while not self.stopping.is_set():
+                    await self.tick()
+                    try:
+                        await asyncio.wait_for(self.stopping.wait(), timeout=self.seconds_until_next_job())
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if self.health_checker.browser_pool is not None:
+                self.health_checker.browser_pool.close()
+            self.health_checker.http_client.close()
+            self.write_status()
+            print("--- Watcher daemon stopped ---")
+
+
+def git_output(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit_snapshots() -> Optional[str]:
+    """Commit snapshot and health changes like the workflow does; returns the new commit or None."""
+    subprocess.run(["git", "add", "snapshots/", "url_health.json"], check=True)
+    if subprocess.run(["git", "diff", "--staged", "--quiet"]).returncode == 0:
+        return None
+    subprocess.run(["git", "commit", "-q", "-m", SNAPSHOT_COMMIT_MESSAGE], check=True)
+    return git_output("rev-parse", "HEAD")
+
+
+def fetch_schedule(fetch_interval: Optional[float], environ=os.environ) -> tuple[bool, float]:
+    """Whether fetch runs use adaptive polling, and the fetch interval in minutes.
+
+    Adaptive polling is on unless ADAPTIVE_POLLING is set to a false value.
+    """
+    raw_value = environ.get("ADAPTIVE_POLLING")
+    adaptive = raw_value is None or raw_value.strip().lower() not in {"", "0", "false", "no", "off"}
+    if fetch_interval is None:
+        fetch_interval = DEFAULT_FETCH_INTERVAL_MINUTES if adaptive else FULL_FETCH_INTERVAL_MINUTES
+    return adaptive, fetch_interval
+
+
+def send_command(state_dir: Path, command: str) -> None:
+    state_dir.mkdir(parents=True, exist_ok=True)
+    with open(state_dir / CONTROL_FILENAME, "a", encoding="utf-8") as f:
+        f.write(command + "\n")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the policy watcher as a long-lived daemon")
+    parser.add_argument("--fetch-interval", type=float, metavar="MINUTES",
+                        help=f"Minutes between fetch runs (default: {DEFAULT_FETCH_INTERVAL_MINUTES}, "
+                             f"or {FULL_FETCH_INTERVAL_MINUTES} with ADAPTIVE_POLLING=0)")
+    parser.add_argument("--health-interval", type=float, default=DEFAULT_HEALTH_INTERVAL_MINUTES,
+                        metavar="MINUTES")
+    parser.add_argument("--state-dir", type=Path, default=DEFAULT_STATE_DIR,
+                        help="Directory of the control and status files (default: .watcher)")
+    parser.add_argument("--commit", action="store_true",
+                        help="Commit snapshot changes and run diff_and_notify.py after fetches that found changes")
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS,
+                        help="How often the control file is checked")
+    parser.add_argument("--send", choices=COMMANDS,
+                        help="Queue a command for a running daemon and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.send:
+        send_command(args.state_dir, args.send)
+        print(f"Queued {args.send!r} in {args.state_dir / CONTROL_FILENAME}")
+        return
+
+    try:
+        load_extraction_rules()
+    except ExtractionRulesError as e:
+        print(f"FATAL: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    fetch.ADAPTIVE_POLLING, fetch_interval = fetch_schedule(args.fetch_interval)
+    daemon = WatcherDaemon(
+        fetch_interval=timedelta(minutes=fetch_interval),
+        health_interval=timedelta(minutes=args.health_interval),
+        state_dir=args.state_dir,
+        commit=args.commit,
+        poll_seconds=args.poll_seconds,
+    )
+    polling = "adaptive polling" if fetch.ADAPTIVE_POLLING else "all pages"
+    print(f"--- Watcher daemon started (pid {os.getpid()}): fetch every {fetch_interval:g} min ({polling}), "
+          f"health every {args.health_interval:g} min; control file {daemon.control_path} ---")
+    asyncio.run(daemon.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -39,6 +39,8 @@ import warnings
 # import resend      # Removed: not needed while emails are disabled
 # import markdown    # Removed: was only used for HTML email formatting
 
+from snapshot_store import is_snapshot_file
+
 # Suppress BeautifulSoup warnings
 warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 
@@ -144,12 +146,12 @@ class WeeklyAggregator:
         """Get changed snapshot files for a specific commit."""
         try:
             result = subprocess.run([
-                "git", "diff", "--name-only", 
+                "git", "diff", "--name-only", "--diff-filter=d",
                 f"{commit_sha}^", commit_sha
             ], capture_output=True, text=True, check=True)
             
             files = result.stdout.strip().split("\n")
-            snapshot_files = [f for f in files if f and f.startswith("snapshots/") and f.endswith(".html")]
+            snapshot_files = [f for f in files if f and f.startswith("snapshots/") and is_snapshot_file(f)]
             return snapshot_files
             
         except subprocess.CalledProcessError as e:
@@ -0,0 +1,255 @@
+"""
+Unit tests for the shared Playwright browser pool.
+Uses a fake Playwright driver so no real browser is launched.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import browser_pool
+from browser_pool import BrowserPool, SyncBrowserPool
+from health_check import URLHealthChecker
+from resource_policy import DEFAULT_POLICY, DOCUMENT_ONLY, blocking_enabled
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.handlers = {}
+        self.routes = []
+
+    def is_closed(self):
+        return self.closed
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def route(self, pattern, handler):
+        self.routes.append(handler)
+
+    async def goto(self, url, **kwargs):
+        return url
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeDriver:
+    """Stands in for the object returned by ``async_playwright()``."""
+
+    launched = []
+
+    def __init__(self):
+        self.chromium = self
+
+    async def start(self):
+        return self
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        FakeDriver.launched.append(browser)
+        return browser
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def fake_playwright(monkeypatch):
+    FakeDriver.launched = []
+    monkeypatch.setattr(browser_pool, "async_playwright", FakeDriver)
+
+
+class TestBrowserPool:
+    """Test browser reuse and context recycling."""
+
+    def test_single_browser_is_shared_across_leases(self):
+        """Test that many leases reuse one browser process and one context."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1, max_navigations=10, user_agent="UA") as pool:
+                for _ in range(5):
+                    async with pool.page() as page:
+                        await page.goto("https://example.com/")
+                return pool.browser_launches, pool.contexts_created
+
+        assert asyncio.run(scenario()) == (1, 1)
+        assert FakeDriver.launched[0].contexts[0].options == {"user_agent": "UA"}
+
+    def test_context_recycled_after_max_navigations(self):
+        """Test that a context is replaced once it reaches its navigation budget."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1, max_navigations=2) as pool:
+                for _ in range(5):
+                    async with pool.page():
+                        pass
+                return pool.contexts_created
+
+        assert asyncio.run(scenario()) == 3
+
+    def test_context_recycled_after_error(self):
+        """Test that an error during a lease discards the context."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1, max_navigations=10) as pool:
+                with pytest.raises(RuntimeError):
+                    async with pool.page():
+                        raise RuntimeError("navigation failed")
+                async with pool.page():
+                    pass
+                return pool.contexts_created, FakeDriver.launched[0].contexts[0].closed
+
+        assert asyncio.run(scenario()) == (2, True)
+
+    def test_browser_relaunched_after_disconnect(self):
+        """Test that a crashed browser is relaunched on the next lease."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1) as pool:
+                async with pool.page():
+                    pass
+                FakeDriver.launched[0].connected = False
+                async with pool.page():
+                    pass
+                return pool.browser_launches
+
+        assert asyncio.run(scenario()) == 2
+
+    def test_lease_waits_when_pool_is_busy(self):
+        """Test that concurrent leases never exceed the context limit."""
+        async def scenario():
+            in_use = 0
+            peak = 0
+            async with BrowserPool(max_contexts=2) as pool:
+                async def lease():
+                    nonlocal in_use, peak
+                    async with pool.page():
+                        in_use += 1
+                        peak = max(peak, in_use)
+                        await asyncio.sleep(0.01)
+                        in_use -= 1
+
+                await asyncio.gather(*(lease() for _ in range(6)))
+            return peak
+
+        assert asyncio.run(scenario()) == 2
+
+
+class TestResourcePolicyRouting:
+    """Test that leased pages route requests through the resource policy."""
+
+    @staticmethod
+    async def send(page, resource_type, url):
+        route = FakeRoute(resource_type, url)
+        for handler in page.routes:
+            await handler(route)
+        return route.outcome
+
+    def test_no_policy_installs_no_route(self):
+        """Test that pools without a policy leave requests untouched."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1) as pool:
+                async with pool.page() as page:
+                    return page.routes
+
+        assert asyncio.run(scenario()) == []
+
+    def test_pool_policy_blocks_subresources(self):
+        """Test that images and trackers are aborted but documents and scripts load."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1, resource_policy=DEFAULT_POLICY) as pool:
+                async with pool.page() as page:
+                    outcomes = [
+                        await self.send(page, "document", "https://example.com/"),
+                        await self.send(page, "script", "https://example.com/app.js"),
+                        await self.send(page, "image", "https://example.com/logo.png"),
+                        await self.send(page, "script", "https://www.googletagmanager.com/gtm.js"),
+                    ]
+                return outcomes, pool.requests_blocked
+
+        assert asyncio.run(scenario()) == (["continued", "continued", "aborted", "aborted"], 2)
+
+    def test_lease_policy_overrides_pool_policy(self):
+        """Test that a per-lease policy applies to that lease only, on one route."""
+        async def scenario():
+            async with BrowserPool(max_contexts=1, resource_policy=DEFAULT_POLICY) as pool:
+                async with pool.page(DOCUMENT_ONLY) as page:
+                    strict = await self.send(page, "script", "https://example.com/app.js")
+                async with pool.page() as page:
+                    default = await self.send(page, "script", "https://example.com/app.js")
+                return strict, default, len(page.routes)
+
+        assert asyncio.run(scenario()) == ("aborted", "continued", 1)
+
+    def test_blocking_flag(self, monkeypatch):
+        """Test that BROWSER_BLOCK_RESOURCES is read the same way by the fetcher and health checks."""
+        assert blocking_enabled({}) and blocking_enabled({"BROWSER_BLOCK_RESOURCES": ""})
+        assert blocking_enabled({"BROWSER_BLOCK_RESOURCES": "yes"})
+        assert not blocking_enabled({"BROWSER_BLOCK_RESOURCES": " Off "})
+
+        monkeypatch.setenv("BROWSER_BLOCK_RESOURCES", "")
+        assert URLHealthChecker().resource_policy is DOCUMENT_ONLY
+        monkeypatch.setenv("BROWSER_BLOCK_RESOURCES", "0")
+        assert URLHealthChecker().resource_policy is None
+
+
+class TestSyncBrowserPool:
+    """Test the blocking facade used by thread-based callers."""
+
+    def test_run_returns_page_function_result(self):
+        """Test that a page function runs on the pool thread and returns its value."""
+        async def visit(page):
+            return await page.goto("https://example.com/health")
+
+        with SyncBrowserPool(max_contexts=1) as pool:
+            assert pool.run(visit) == "https://example.com/health"
+            assert pool.run(visit) == "https://example.com/health"
+            assert pool.pool.browser_launches == 1
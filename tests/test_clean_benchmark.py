@@ -0,0 +1,149 @@
+"""
+Unit tests for the clean_html benchmark.
+Covers measuring a small snapshot corpus, baseline comparison and baseline updates.
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from clean_benchmark import changed_inputs, compare_to_baseline, main, run_benchmark, save_baseline
+from html_cleaner import DEFAULT_PARSER
+from snapshot_store import write_snapshot
+
+HTML = ("<html><body><nav>Home | Help</nav><main><h1>Community Guidelines</h1>"
+        + "".join(f"<p>Rule {n}: treat other members with respect.</p>" for n in range(30))
+        + "</main><footer>© Acme</footer></body></html>")
+
+
+def make_corpus(tmp_path):
+    snapshots_dir = tmp_path / "snapshots"
+    for slug in ("acme-guidelines", "acme-terms"):
+        write_snapshot(snapshots_dir / slug, HTML.replace("Guidelines", slug))
+    # One current export, one stale one
+    (snapshots_dir / "acme-guidelines" / fetch.CLEAN_SNAPSHOT_FILENAME).write_text(
+        fetch.clean_html(HTML.replace("Guidelines", "acme-guidelines"), "acme-guidelines"), encoding="utf-8")
+    (snapshots_dir / "acme-terms" / fetch.CLEAN_SNAPSHOT_FILENAME).write_text("Old terms\n", encoding="utf-8")
+    return snapshots_dir
+
+
+def slowed(report, parser, slug, factor):
+    report = copy.deepcopy(report)
+    report["parsers"][parser]["slugs"][slug]["clean_ms"] *= factor
+    return report
+
+
+class TestRunBenchmark:
+    """Test measuring the corpus."""
+
+    def test_report_per_parser_and_slug(self, tmp_path):
+        """Test timings, memory and clean.txt matching for every snapshot."""
+        report = run_benchmark(make_corpus(tmp_path), [DEFAULT_PARSER], repeat=2)
+        slugs = report["parsers"][DEFAULT_PARSER]["slugs"]
+        assert sorted(slugs) == ["acme-guidelines", "acme-terms"]
+        assert slugs["acme-guidelines"]["matches_clean_txt"] is True
+        assert slugs["acme-terms"]["matches_clean_txt"] is False
+        assert all(result["clean_ms"] > 0 and result["peak_kb"] > 0 for result in slugs.values())
+        assert report["calibration_ms"] > 0
+        assert fetch.CLEAN_HTML_PARSER == DEFAULT_PARSER
+
+        only = run_benchmark(tmp_path / "snapshots", [DEFAULT_PARSER], repeat=1, slugs=["acme-terms"])
+        assert list(only["parsers"][DEFAULT_PARSER]["slugs"]) == ["acme-terms"]
+
+
+class TestCompareToBaseline:
+    """Test regression detection."""
+
+    def baseline(self):
+        results = {slug: {"html_bytes": 2000, "html_sha256": f"{slug}-html", "clean_ms": ms, "extract_ms": ms, "noise_ms": 0.1, "trim_ms": 0.0,
+                          "peak_kb": 100.0, "clean_sha256": slug, "matches_clean_txt": slug == "acme-guidelines"}
+                   for slug, ms in (("acme-guidelines", 40.0), ("acme-terms", 20.0))}
+        return {"calibration_ms": 30.0, "parsers": {"lxml": {"total_ms": 60.0, "slugs": results}}}
+
+    def test_unchanged_run_passes(self):
+        """Test that a run equal to the baseline has no problems."""
+        assert compare_to_baseline(self.baseline(), self.baseline()) == []
+
+    def test_time_regressions_are_scaled_by_calibration(self):
+        """Test that slowdowns fail, unless the whole machine is slower by as much."""
+        report = slowed(self.baseline(), "lxml", "acme-guidelines", 3)
+        problems = compare_to_baseline(report, self.baseline())
+        assert any(problem.startswith("lxml: total 140.0 ms") for problem in problems)
+        assert any(problem.startswith("lxml acme-guidelines: 120.0 ms") for problem in problems)
+
+        slower_machine = slowed(slowed(self.baseline(), "lxml", "acme-guidelines", 3), "lxml", "acme-terms", 3)
+        slower_machine["calibration_ms"] = 90.0
+        assert compare_to_baseline(slower_machine, self.baseline()) == []
+
+        # Small absolute slowdowns are noise
+        assert compare_to_baseline(slowed(self.baseline(), "lxml", "acme-terms", 1.4), self.baseline(),
+                                   threshold=1.0, slug_threshold=0.1) == []
+
+    def test_output_and_memory_changes(self):
+        """Test changed output, a lost clean.txt match, --strict-clean and memory growth."""
+        report = self.baseline()
+        slugs = report["parsers"]["lxml"]["slugs"]
+        slugs["acme-guidelines"]["matches_clean_txt"] = False
+        slugs["acme-terms"]["clean_sha256"] = "different"
+        slugs["acme-terms"]["peak_kb"] = 150.0
+        assert compare_to_baseline(report, self.baseline()) == [
+            "lxml acme-guidelines: output no longer matches clean.txt",
+            "lxml acme-terms: output changed since the baseline",
+            "lxml acme-terms: peak 150 KB vs 100 KB baseline",
+        ]
+        strict = compare_to_baseline(self.baseline(), self.baseline(), strict_clean=True)
+        assert strict == ["lxml acme-terms: output differs from clean.txt"]
+
+    def test_changed_input_is_not_compared(self):
+        """Test that a slug whose snapshot changed is skipped, not failed."""
+        report = slowed(self.baseline(), "lxml", "acme-guidelines", 3)
+        guidelines = report["parsers"]["lxml"]["slugs"]["acme-guidelines"]
+        guidelines.update(html_sha256="updated-snapshot", clean_sha256="new-output", peak_kb=500.0)
+        assert changed_inputs(report, self.baseline()) == [("lxml", "acme-guidelines")]
+        assert compare_to_baseline(report, self.baseline()) == []
+
+
+class TestBaselineFile:
+    """Test storing and checking baselines through the CLI."""
+
+    def test_update_then_check(self, tmp_path, capsys, monkeypatch):
+        """Test that a fresh baseline passes and keeps parsers the run didn't benchmark."""
+        snapshots_dir = make_corpus(tmp_path)
+        baseline_path = tmp_path / "baseline.json"
+        kept = {"calibration_ms": 10.0, "parsers": {"other": {"total_ms": 5.0, "slugs": {
+            "acme-terms": {"clean_ms": 5.0}}}}}
+        baseline_path.write_text(json.dumps(kept), encoding="utf-8")
+
+        args = ["--parser", DEFAULT_PARSER, "--repeat", "1", "--snapshots-dir", str(snapshots_dir),
+                "--baseline", str(baseline_path)]
+        assert main(args + ["--update-baseline"]) == 0
+        stored = json.loads(baseline_path.read_text())
+        assert sorted(stored["parsers"]) == sorted(["other", DEFAULT_PARSER])
+        scale = stored["calibration_ms"] / 10.0
+        assert stored["parsers"]["other"]["slugs"]["acme-terms"]["clean_ms"] == round(5.0 * scale, 2)
+
+        # Generous thresholds: only output changes can fail this check
+        assert main(args + ["--threshold", "100", "--slug-threshold", "100", "--memory-threshold", "100"]) == 0
+        assert "No regressions" in capsys.readouterr().out
+
+        # A routine snapshot update asks for a new baseline instead of failing
+        write_snapshot(snapshots_dir / "acme-guidelines", HTML.replace("respect", "kindness"))
+        assert main(args + ["--threshold", "100", "--slug-threshold", "100", "--memory-threshold", "100"]) == 0
+        assert "acme-guidelines: input changed, re-baseline" in capsys.readouterr().out
+
+        # The same input cleaned differently fails
+        clean_html = fetch.clean_html
+        monkeypatch.setattr(fetch, "clean_html", lambda html, slug=None: clean_html(html, slug) + "\nExtra")
+        assert main(args + ["--threshold", "100", "--slug-threshold", "100", "--memory-threshold", "100"]) == 1
+        assert "acme-terms: output changed since the baseline" in capsys.readouterr().err
+
+    def test_save_without_previous_baseline(self, tmp_path):
+        """Test that the baseline directory is created."""
+        report = {"calibration_ms": 30.0, "parsers": {}}
+        save_baseline(tmp_path / "benchmarks" / "baseline.json", report, None)
+        assert json.loads((tmp_path / "benchmarks" / "baseline.json").read_text()) == report
@@ -0,0 +1,78 @@
+"""
+Unit tests for the cleaned-content fingerprint index.
+Tests when the stored snapshot is (and is not) re-cleaned.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from fetch import (CLEANER_VERSION, FINGERPRINT_FILENAME, clean_html, content_sha256,
+                   save_clean_fingerprint, stored_clean_sha256)
+
+OLD_HTML = "<html><body><p>Old policy text. Stays the same.</p></body></html>"
+
+
+@pytest.fixture
+def slug_dir(tmp_path):
+    return tmp_path / "test-policy"
+
+
+class TestStoredCleanFingerprint:
+    """Test fingerprint-based change detection."""
+
+    def test_valid_fingerprint_skips_recleaning(self, slug_dir):
+        """Test that a matching fingerprint is used without parsing the old snapshot."""
+        slug_dir.mkdir()
+        save_clean_fingerprint(slug_dir, content_sha256(OLD_HTML), "cached-hash")
+
+        with patch.object(fetch, "clean_html", side_effect=AssertionError("re-cleaned")):
+            assert stored_clean_sha256("test-policy", slug_dir, OLD_HTML) == "cached-hash"
+
+    def test_missing_fingerprint_is_rebuilt(self, slug_dir):
+        """Test that the old snapshot is cleaned once and the index written."""
+        slug_dir.mkdir()
+        expected = content_sha256(clean_html(OLD_HTML, "test-policy"))
+
+        assert stored_clean_sha256("test-policy", slug_dir, OLD_HTML) == expected
+        stored = json.loads((slug_dir / FINGERPRINT_FILENAME).read_text())
+        assert stored == {
+            "cleaner_version": CLEANER_VERSION,
+            "parser": fetch.CLEAN_HTML_PARSER,
+            "rules": fetch.load_extraction_rules().for_slug("test-policy").digest,
+            "raw_sha256": content_sha256(OLD_HTML),
+            "clean_sha256": expected,
+        }
+
+    def test_changed_snapshot_invalidates_fingerprint(self, slug_dir):
+        """Test that a snapshot edited outside the fetcher is re-cleaned."""
+        slug_dir.mkdir()
+        save_clean_fingerprint(slug_dir, content_sha256("<p>something else</p>"), "stale-hash")
+
+        assert stored_clean_sha256("test-policy", slug_dir, OLD_HTML) != "stale-hash"
+
+    def test_cleaner_version_bump_invalidates_fingerprint(self, slug_dir):
+        """Test that fingerprints from an older cleaner version are ignored."""
+        slug_dir.mkdir()
+        (slug_dir / FINGERPRINT_FILENAME).write_text(json.dumps({
+            "cleaner_version": CLEANER_VERSION - 1,
+            "raw_sha256": content_sha256(OLD_HTML),
+            "clean_sha256": "old-cleaner-hash",
+        }))
+
+        assert stored_clean_sha256("test-policy", slug_dir, OLD_HTML) != "old-cleaner-hash"
+
+    def test_parser_switch_invalidates_fingerprint(self, slug_dir):
+        """Test that fingerprints produced by another parser backend are ignored."""
+        slug_dir.mkdir()
+        save_clean_fingerprint(slug_dir, content_sha256(OLD_HTML), "html-parser-hash")
+
+        with patch.object(fetch, "CLEAN_HTML_PARSER", "lxml"):
+            assert stored_clean_sha256("test-policy", slug_dir, OLD_HTML) != "html-parser-hash"
@@ -0,0 +1,111 @@
+"""
+Unit tests for conditional GET with stored HTTP validators.
+Covers the request headers, 304 short-circuits, stale validator cleanup and the run log counts.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from snapshot_store import write_snapshot
+
+URL = "https://acme.example/terms"
+HTML = "<html><body><main>" + "".join(f"<p>Term {n} of service.</p>" for n in range(40)) + "</main></body></html>"
+VALIDATORS = {"etag": '"v1"', "last_modified": "Sat, 17 Oct 2026 00:00:00 GMT"}
+
+
+@pytest.fixture
+def snapshots(monkeypatch, tmp_path):
+    """A run directory with one stored snapshot and its validators."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "snapshots")
+    monkeypatch.setattr(fetch, "FETCH_HOST_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(fetch, "FETCH_METRICS_FILE", "")
+    slug_dir = tmp_path / "snapshots" / "acme-terms"
+    write_snapshot(slug_dir, HTML)
+    fetch.save_http_validators(slug_dir, URL, VALIDATORS)
+    return slug_dir
+
+
+def run(pages, handler):
+    async def fetch_all():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch.fetch_and_record(pages, http_client=client)
+
+    return asyncio.run(fetch_all())
+
+
+class TestFetchWithHttpx:
+    """Test the conditional request itself."""
+
+    def test_validators_are_sent(self):
+        """Test that If-None-Match and If-Modified-Since carry the stored validators."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers)
+            return httpx.Response(304, headers={"etag": '"v1"'})
+
+        async def request(validators):
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await fetch.fetch_with_httpx(URL, client, validators)
+
+        fetched = asyncio.run(request({"url": URL, **VALIDATORS}))
+        assert seen[0]["if-none-match"] == '"v1"'
+        assert seen[0]["if-modified-since"] == VALIDATORS["last_modified"]
+        assert fetched.not_modified and fetched.content is None
+
+        # Validators stored for another URL (the page moved) are not used
+        asyncio.run(request({"url": "https://acme.example/old-terms", **VALIDATORS}))
+        assert "if-none-match" not in seen[1] and "if-modified-since" not in seen[1]
+
+
+class TestConditionalRun:
+    """Test conditional GET through fetch_and_record."""
+
+    def test_not_modified_skips_cleaning(self, snapshots, monkeypatch):
+        """Test that a 304 is reported as NO CHANGE without parsing anything."""
+        def no_cleaning(*args, **kwargs):
+            raise AssertionError("clean_html called for a 304")
+
+        monkeypatch.setattr(fetch, "clean_html", no_cleaning)
+        monkeypatch.setattr(fetch, "clean_html_with_root", no_cleaning)
+        entry = run([{"slug": "acme-terms", "url": URL, "platform": "Acme"}],
+                    lambda request: httpx.Response(304, headers={"etag": '"v1"'}))
+
+        assert entry["status"] == "success"
+        assert entry["conditional_get"] == {"hits": 1, "misses": 0}
+        assert fetch.read_snapshot(snapshots) == HTML
+
+    def test_stale_validators_are_removed(self, snapshots):
+        """Test that a 200 without ETag/Last-Modified deletes the stored validators."""
+        updated = HTML.replace("Term 1 ", "Updated term 1 ")
+        run([{"slug": "acme-terms", "url": URL, "platform": "Acme"}],
+            lambda request: httpx.Response(200, headers={"content-type": "text/html"}, text=updated))
+
+        assert not (snapshots / fetch.VALIDATORS_FILENAME).exists()
+        assert fetch.read_snapshot(snapshots) == updated
+
+    def test_hits_and_misses_in_run_log(self, snapshots):
+        """Test that revalidated and re-downloaded pages are counted in the run log entry."""
+        pages = [{"slug": "acme-terms", "url": URL, "platform": "Acme"},
+                 {"slug": "acme-privacy", "url": "https://acme.example/privacy", "platform": "Acme"}]
+
+        def handler(request):
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"etag": '"v1"'})
+            return httpx.Response(200, headers={"content-type": "text/html", "etag": '"p1"'}, text=HTML)
+
+        entry = run(pages, handler)
+        assert entry["conditional_get"] == {"hits": 1, "misses": 1}
+        assert json.loads(Path("run_log.json").read_text())[0]["conditional_get"] == {"hits": 1, "misses": 1}
+        assert fetch.load_http_validators(snapshots.parent / "acme-privacy") == {"url": pages[1]["url"],
+                                                                                 "etag": '"p1"'}
@@ -0,0 +1,89 @@
+"""
+Unit tests for streamed fetches with size and content-type limits.
+Uses httpx.MockTransport so no network is needed.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from content_limits import ERROR_BODY_MAX_BYTES, ContentRejectedError
+from fetch import URLErrorTypes, classify_error, error_body, fetch_with_httpx, should_retry
+
+URL = "https://policies.example/terms"
+
+
+def fetch(handler, max_bytes=1024):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_with_httpx(URL, client, max_bytes=max_bytes)
+
+    return asyncio.run(run())
+
+
+class TestStreamingFetch:
+    """Test streamed httpx downloads."""
+
+    def test_small_html_page_decoded(self):
+        """Test that a page under the cap is decoded with its declared charset."""
+        body = "<p>Règles de la communauté</p>".encode("latin-1")
+        page = fetch(lambda request: httpx.Response(
+            200, content=body, headers={"content-type": "text/html; charset=iso-8859-1"}))
+        assert page.content == "<p>Règles de la communauté</p>"
+
+    def test_declared_length_over_cap_rejected(self):
+        """Test that an oversized Content-Length is rejected before reading the body."""
+        with pytest.raises(ContentRejectedError, match="exceeds"):
+            fetch(lambda request: httpx.Response(200, content=b"x" * 2048,
+                                                 headers={"content-type": "text/html"}))
+
+    def test_streamed_body_over_cap_rejected(self):
+        """Test that a body without Content-Length is cut off once it passes the cap."""
+        async def chunks():
+            for _ in range(100):
+                yield b"<p>" + b"x" * 100 + b"</p>"
+
+        with pytest.raises(ContentRejectedError, match="exceeds"):
+            fetch(lambda request: httpx.Response(200, content=chunks(), headers={"content-type": "text/html"}))
+
+    def test_non_html_content_type_rejected(self):
+        """Test that a redirect to a binary asset is rejected."""
+        with pytest.raises(ContentRejectedError, match="application/pdf"):
+            fetch(lambda request: httpx.Response(200, content=b"%PDF-1.7",
+                                                 headers={"content-type": "application/pdf"}))
+
+    def test_error_body_read_up_to_a_small_cap(self):
+        """Test that only the start of an HTML error page is kept, and nothing of other types."""
+        sent = []
+
+        async def chunks():
+            for _ in range(1000):
+                sent.append(1)
+                yield b"<p>" + b"x" * 1000 + b"</p>"
+
+        with pytest.raises(httpx.HTTPStatusError) as error:
+            fetch(lambda request: httpx.Response(503, content=chunks(), headers={"content-type": "text/html"}),
+                  max_bytes=10 * 1024 * 1024)
+        assert len(error_body(error.value)) == ERROR_BODY_MAX_BYTES
+        assert len(sent) < 1000
+        assert classify_error(error.value) == URLErrorTypes.SERVER_ERROR
+
+        with pytest.raises(httpx.HTTPStatusError) as error:
+            fetch(lambda request: httpx.Response(403, content=b"%PDF-1.7", headers={"content-type": "application/pdf"}))
+        assert error_body(error.value) == ""
+
+
+class TestContentRejectedClassification:
+    """Test how rejections are reported."""
+
+    def test_rejections_are_classified_and_not_retried(self):
+        """Test the dedicated error class, even when the message mentions 404-like numbers."""
+        error = ContentRejectedError(f"Content rejected for {URL}: 40400 bytes exceeds the 1024-byte limit")
+        assert classify_error(error) == URLErrorTypes.CONTENT_REJECTED
+        assert not should_retry(URLErrorTypes.CONTENT_REJECTED)
@@ -0,0 +1,138 @@
+"""
+Unit tests for the declarative per-platform extraction rules.
+Covers validation, default/platform merging and loading from disk.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from extraction_rules import ExtractionRuleRegistry, ExtractionRulesError, load_extraction_rules
+from fetch import clean_html, trim_leading_navigation
+from html_cleaner import extract_text
+
+RULES = {
+    "default": {
+        "content_roots": [{"tags": ["div"], "attr": "class", "value": "article-body"}],
+        "strip": [{"attr": "class", "pattern": "menu"}],
+        "noise_patterns": ["Help Center"],
+    },
+    "platforms": {
+        "acme-": {
+            "content_roots": [{"tags": ["main"], "attr": "id", "value": "policy"}],
+            "strip": [{"tags": ["aside"], "attr": "class", "value": "promo"}],
+            "noise_patterns": ["Acme Home"],
+            "trim_leading_navigation": True,
+            "start_anchors": ["Our rules"],
+        },
+    },
+}
+
+
+class TestRegistry:
+    """Test how platform rules extend the defaults."""
+
+    def test_unknown_slug_uses_defaults(self):
+        """Test that slugs without a platform entry get the default rules."""
+        rules = ExtractionRuleRegistry(RULES).for_slug("other-policy")
+        assert rules.prefix is None
+        assert rules.noise.search("Help Center") and not rules.noise.search("Acme Home")
+        assert rules.trim_leading_navigation is False
+
+    def test_platform_rules_extend_defaults(self):
+        """Test that platform roots come first and strip/noise rules are added."""
+        rules = ExtractionRuleRegistry(RULES).for_slug("acme-terms")
+        html = ('<div class="article-body">Default root</div>'
+                '<main id="policy">Platform <div class="menu">Nav</div><aside class="promo">Ad</aside></main>')
+        assert extract_text(html, rules.cleaning).split() == ["Platform"]
+        assert rules.noise.search("Help Center") and rules.noise.search("Acme Home")
+        assert rules.start_anchors == ("Our rules",)
+
+    def test_digest_changes_with_rules(self):
+        """Test that editing a platform's rules changes only its digest."""
+        edited = json.loads(json.dumps(RULES))
+        edited["platforms"]["acme-"]["noise_patterns"].append("Sign in")
+        before, after = ExtractionRuleRegistry(RULES), ExtractionRuleRegistry(edited)
+        assert before.for_slug("acme-terms").digest != after.for_slug("acme-terms").digest
+        assert before.default.digest == after.default.digest
+
+    def test_browser_overrides_resource_policy(self):
+        """Test that a platform can let stylesheets through and keep other defaults."""
+        data = json.loads(json.dumps(RULES))
+        data["platforms"]["acme-"]["browser"] = {"block_resource_types": ["image"]}
+        registry = ExtractionRuleRegistry(data)
+        policy = registry.for_slug("acme-terms").resource_policy
+        assert not policy.blocks("stylesheet", "https://acme.example/site.css")
+        assert policy.blocks("image", "https://acme.example/logo.png")
+        assert policy.blocks("script", "https://www.google-analytics.com/analytics.js")
+        assert registry.for_slug("other-policy").resource_policy.blocks("stylesheet", "https://x.example/a.css")
+        # Browser settings don't affect cleaning, so fingerprints stay valid
+        assert registry.for_slug("acme-terms").digest == ExtractionRuleRegistry(RULES).for_slug("acme-terms").digest
+
+    def test_readiness_requires_platform_text(self):
+        """Test that Playwright waits default to the platform's min_text_chars, unless ready overrides it."""
+        data = json.loads(json.dumps(RULES))
+        data["platforms"]["acme-"]["min_text_chars"] = 1200
+        registry = ExtractionRuleRegistry(data)
+        assert registry.for_slug("acme-terms").readiness.min_text_chars == 1200
+        assert registry.for_slug("other-policy").readiness.min_text_chars == registry.default.min_text_chars
+
+        data["platforms"]["acme-"]["browser"] = {"ready": {"min_text_chars": 0, "stable_ms": 250}}
+        readiness = ExtractionRuleRegistry(data).for_slug("acme-terms").readiness
+        assert (readiness.min_text_chars, readiness.stable_ms) == (0, 250)
+
+    @pytest.mark.parametrize("data, message", [
+        ({"defaults": {}}, "unknown keys"),
+        ({"default": {"strip": [{"attr": "class"}]}}, "exactly one of"),
+        ({"default": {"strip": [{"attr": "id", "pattern": "("}]}}, "not a valid regex"),
+        ({"default": {"noise_patterns": "Help"}}, "list of non-empty strings"),
+        ({"platforms": {"acme-": {"trim_leading_navigation": "yes"}}}, "true or false"),
+        ({"default": {"browser": {"block_resource_types": ["pictures"]}}}, "unknown types"),
+        ({"default": {"browser": {"ready": {"min_text_chars": -1}}}}, "min_text_chars must be an integer"),
+    ])
+    def test_invalid_rules_rejected(self, data, message):
+        """Test that malformed rules fail validation with a useful message."""
+        with pytest.raises(ExtractionRulesError, match=message):
+            ExtractionRuleRegistry(data)
+
+
+class TestLoading:
+    """Test loading the rules file."""
+
+    def test_repository_rules_are_valid(self):
+        """Test that the shipped extraction_rules.json compiles."""
+        registry = load_extraction_rules()
+        assert registry.for_slug("meta-hate-speech").start_anchors
+        assert registry.for_slug("twitch-community-guidelines").trim_leading_navigation
+
+    def test_invalid_json_reported_with_path(self, tmp_path):
+        """Test that a broken rules file names the offending path."""
+        rules_file = tmp_path / "extraction_rules.json"
+        rules_file.write_text("{not json")
+        with pytest.raises(ExtractionRulesError, match="Invalid JSON"):
+            load_extraction_rules(rules_file)
+
+
+class TestStartAnchors:
+    """Test trimming of leading navigation with platform start anchors."""
+
+    def test_meta_anchor_wins_over_punctuation(self):
+        """Test that Meta pages start at their known anchor line."""
+        lines = ["Home", "Policies.", "The Community Standards outline what is allowed.", "More."]
+        assert trim_leading_navigation(lines, "meta-hate-speech") == lines[2:]
+
+    def test_punctuation_fallback(self):
+        """Test that pages without anchors start just before the first sentence."""
+        lines = ["Home", "Safety", "Heading", "Real sentence."]
+        assert trim_leading_navigation(lines, "twitch-community-guidelines") == lines[2:]
+
+    def test_trim_only_for_configured_platforms(self):
+        """Test that clean_html trims only where the rules enable it."""
+        html = "<p>Nav</p><p>Heading</p><p>Sentence one.</p>"
+        assert clean_html(html, "twitch-community-guidelines") == "Heading\nSentence one."
+        assert clean_html(html, "discord-guidelines") == "Nav\nHeading\nSentence one."
@@ -0,0 +1,127 @@
+"""
+Unit tests for the concurrent fetch engine.
+Tests global/per-host concurrency caps, result ordering and per-page error isolation.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from fetch_engine import FetchEngine, host_key
+
+
+class ConcurrencyProbe:
+    """Records peak in-flight counts overall and per host."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.host_in_flight = {}
+        self.host_peak = {}
+
+    async def hit(self, engine: FetchEngine, url: str, delay: float = 0.01) -> str:
+        host = host_key(url)
+        async with engine.slot(url):
+            self.in_flight += 1
+            self.host_in_flight[host] = self.host_in_flight.get(host, 0) + 1
+            self.peak = max(self.peak, self.in_flight)
+            self.host_peak[host] = max(self.host_peak.get(host, 0), self.host_in_flight[host])
+            await asyncio.sleep(delay)
+            self.in_flight -= 1
+            self.host_in_flight[host] -= 1
+        return url
+
+
+class TestFetchEngine:
+    """Test concurrency limits of the fetch engine."""
+
+    def test_results_keep_input_order(self):
+        """Test that results come back in configuration order, not completion order."""
+        async def scenario():
+            engine = FetchEngine(max_concurrency=4, per_host_concurrency=4)
+
+            async def worker(delay):
+                async with engine.slot("https://example.com/"):
+                    await asyncio.sleep(delay)
+                return delay
+
+            return await engine.map([0.03, 0.01, 0.02], worker)
+
+        assert asyncio.run(scenario()) == [0.03, 0.01, 0.02]
+
+    def test_per_host_cap_is_enforced(self):
+        """Test that a single busy host never exceeds its per-host limit."""
+        probe = ConcurrencyProbe()
+        urls = [f"https://help.whatnot.com/page-{i}" for i in range(8)]
+
+        async def scenario():
+            engine = FetchEngine(max_concurrency=6, per_host_concurrency=2)
+            await engine.map(urls, lambda url: probe.hit(engine, url))
+
+        asyncio.run(scenario())
+        assert probe.host_peak["help.whatnot.com"] == 2
+
+    def test_global_cap_spans_hosts(self):
+        """Test that the global cap holds when many hosts are fetched together."""
+        probe = ConcurrencyProbe()
+        urls = [f"https://host-{i}.example.com/" for i in range(10)]
+
+        async def scenario():
+            engine = FetchEngine(max_concurrency=3, per_host_concurrency=2)
+            await engine.map(urls, lambda url: probe.hit(engine, url))
+
+        asyncio.run(scenario())
+        assert probe.peak == 3
+
+    @pytest.mark.parametrize("url,expected", [
+        ("https://Legal.Twitch.com/legal/", "legal.twitch.com"),
+        ("https://support.google.com/youtube/answer/1", "support.google.com"),
+    ])
+    def test_host_key_normalizes_hostname(self, url, expected):
+        """Test that host buckets are case-insensitive hostnames."""
+        assert host_key(url) == expected
+
+
+class TestFetchCycleIsolation:
+    """Test that one page's unexpected error doesn't end the run."""
+
+    def test_failing_page_is_recorded_and_others_complete(self, monkeypatch, tmp_path):
+        """Test that an exception outside the retry loop becomes that page's failure."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "snapshots")
+        monkeypatch.setattr(fetch, "FETCH_HOST_REQUESTS_PER_MINUTE", 0)
+        monkeypatch.setattr(fetch, "FETCH_METRICS_FILE", "")
+        pages = [{"slug": f"acme-page-{n}", "url": f"https://acme.example/{n}", "platform": "Acme"} for n in range(3)]
+        html = "<html><body><main>" + "<p>Be kind to other members.</p>" * 40 + "</main></body></html>"
+
+        process_fetched_page = fetch.process_fetched_page
+
+        def disk_full_for_page_1(slug, *args, **kwargs):
+            if slug == "acme-page-1":
+                raise OSError(28, "No space left on device")
+            return process_fetched_page(slug, *args, **kwargs)
+
+        monkeypatch.setattr(fetch, "process_fetched_page", disk_full_for_page_1)
+
+        async def run():
+            handler = lambda request: httpx.Response(200, headers={"content-type": "text/html"}, text=html)
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await fetch.fetch_and_record(pages, http_client=client)
+
+        entry = asyncio.run(run())
+        assert entry["status"] == "partial_failure"
+        assert entry["pages_checked"] == 3
+        assert any("acme-page-1" in error and "No space left" in error for error in entry["errors"])
+
+        failures = [json.loads(line) for line in (tmp_path / "failures.log").read_text().splitlines()]
+        assert [failure["platform"] for failure in failures] == ["acme-page-1"]
+        assert json.loads((tmp_path / "run_log.json").read_text())[0] == entry
+        assert fetch.snapshot_exists(tmp_path / "snapshots" / "acme-page-2")
@@ -0,0 +1,135 @@
+"""
+Unit tests for per-page fetch metrics.
+Covers stage timing, percentile summaries, the metrics file formats and a metered fetch run.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from fetch_metrics import PageMetrics, percentile, prometheus_text, summarize, write_metrics_file
+from sharding import merge_run_entries
+
+HTML = "<html><body><main>" + "".join(f"<p>Clause {n} of the policy.</p>" for n in range(50)) + "</main></body></html>"
+
+
+def record(slug, total, **stages):
+    return {"slug": slug, "url": f"https://acme.example/{slug}", "platform": "Acme", "renderer": "httpx",
+            "status": "unchanged", "retries": 0, "bytes_downloaded": 1000, "bytes_written": 0,
+            "stages_ms": stages, "total_ms": total}
+
+
+class TestPageMetrics:
+    """Test recording one page."""
+
+    def test_nested_stages_are_not_counted_twice(self):
+        """Test that connect time recorded inside a download is excluded from download."""
+        metrics = PageMetrics("acme-terms", "https://acme.example/terms")
+        with metrics.timed("download"):
+            metrics.add("connect", 5000)
+            time.sleep(0.01)
+        assert metrics.stages_ms["connect"] == 5000
+        assert metrics.stages_ms["download"] == 0
+
+        with metrics.timed("clean"):
+            time.sleep(0.01)
+        assert metrics.stages_ms["clean"] >= 9
+
+    def test_trace_times_connection_setup(self):
+        """Test that httpx trace events for TCP and TLS setup add up to the connect stage."""
+        metrics = PageMetrics("acme-terms", "https://acme.example/terms")
+
+        async def run():
+            for step in ("connection.connect_tcp", "connection.start_tls"):
+                await metrics.trace(f"{step}.started", {})
+                await asyncio.sleep(0.01)
+                await metrics.trace(f"{step}.complete", {})
+            await metrics.trace("http11.send_request_headers.started", {})
+
+        asyncio.run(run())
+        assert set(metrics.stages_ms) == {"connect"}
+        assert metrics.stages_ms["connect"] >= 18
+
+
+class TestSummary:
+    """Test run-level aggregation and output."""
+
+    def test_percentiles_per_stage(self):
+        """Test interpolated percentiles, stage coverage and the slowest pages."""
+        assert percentile([10, 20, 30, 40], 50) == 25
+        records = [record(f"page-{n}", 10.0 * n + 10, download=10.0 * n, clean=10) for n in range(10)]
+        records[0]["stages_ms"]["connect"] = 40
+
+        summary = summarize(records, wall_ms=250)
+        assert summary["stages_ms"]["download"]["p50"] == 45
+        assert summary["stages_ms"]["download"]["max"] == 90
+        assert summary["stages_ms"]["connect"]["count"] == 1
+        assert summary["bytes_downloaded"] == 10000
+        assert summary["slowest"][0] == {"slug": "page-9", "total_ms": 100, "slowest_stage": "download"}
+
+    def test_metrics_file_formats(self, tmp_path):
+        """Test that JSON lines are appended per run and Prometheus textfiles are replaced."""
+        records = [record("acme-terms", 30, download=20, clean=10)]
+        summary = summarize(records)
+        jsonl = tmp_path / "fetch_metrics.jsonl"
+        for _ in range(2):
+            write_metrics_file(jsonl, records, summary, "2026-10-17T00:00:00Z", 0)
+        lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+        assert len(lines) == 2 and lines[0]["slug"] == "acme-terms"
+
+        prom = tmp_path / "fetch.prom"
+        write_metrics_file(prom, records, summary, "2026-10-17T00:00:00Z", 1760659200)
+        text = prom.read_text()
+        assert 'policy_watcher_fetch_stage_seconds{stage="download",quantile="0.9"} 0.02' in text
+        assert 'policy_watcher_fetch_page_bytes_downloaded{slug="acme-terms",renderer="httpx"} 1000' in text
+        assert text == prometheus_text(records, summary, 1760659200)
+
+    def test_shard_merge_recomputes_percentiles(self):
+        """Test that merged shard entries summarize all pages, not the shard summaries."""
+        first = [record("page-a", 10, download=10), record("page-b", 20, download=20)]
+        second = [record("page-c", 90, download=90)]
+        entries = [{"timestamp_utc": "2026-10-17T00:00:00Z", "status": "success",
+                    "metrics": summarize(records, wall_ms=wall)}
+                   for records, wall in ((first, 500), (second, 800))]
+        merged = merge_run_entries(entries, first + second)
+        assert merged["metrics"]["stages_ms"]["download"]["p50"] == 20
+        assert merged["metrics"]["wall_ms"] == 800
+
+
+class TestMeteredRun:
+    """Test fetch_and_record with a scripted transport."""
+
+    def test_run_log_and_metrics_file(self, monkeypatch, tmp_path):
+        """Test that a run records per-page stages in the metrics file and percentiles in the run log."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "snapshots")
+        monkeypatch.setattr(fetch, "FETCH_HOST_REQUESTS_PER_MINUTE", 0)
+        pages = [{"slug": f"acme-page-{n}", "url": f"https://acme.example/{n}", "platform": "Acme"}
+                 for n in range(3)]
+
+        def handler(request):
+            # A streamed body, so httpx counts the bytes as they arrive
+            return httpx.Response(200, headers={"content-type": "text/html"}, stream=httpx.ByteStream(HTML.encode()))
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await fetch.fetch_and_record(pages, http_client=client)
+
+        entry = asyncio.run(run())
+        assert entry["metrics"]["pages"] == 3
+        assert set(entry["metrics"]["stages_ms"]) >= {"queue_wait", "download", "write"}
+        assert entry["metrics"]["bytes_written"] > 0
+
+        records = [json.loads(line) for line in (tmp_path / "fetch_metrics.jsonl").read_text().splitlines()]
+        assert [r["slug"] for r in records] == [p["slug"] for p in pages]
+        assert {r["status"] for r in records} == {"new"}
+        assert all(r["bytes_downloaded"] == len(HTML) for r in records)
+        assert json.loads((tmp_path / "run_log.json").read_text())[0]["metrics"] == entry["metrics"]
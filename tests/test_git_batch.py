@@ -0,0 +1,75 @@
+"""
+Unit tests for bulk restore of history files from a git ref.
+Builds a throwaway repository with a data branch in a temp directory.
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from git_batch import GitBatchError, iter_blob_contents, list_tree_blobs, restore_tree
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+HISTORY = "snapshots/production/history"
+FILES = {
+    f"{HISTORY}/acme-terms/index.json": b'[{"file": "20250101T000000Z.txt"}]',
+    f"{HISTORY}/acme-terms/20250101T000000Z.txt": "Règles\r\nBe kind.\n".encode("utf-8"),
+    f"{HISTORY}/acme-privacy/20250101T000000Z.txt": "Règles\r\nBe kind.\n".encode("utf-8"),
+    f"{HISTORY}/acme privacy/index.json": b"[]",
+    "snapshots/production/acme-terms/snapshot.html": b"<p>not history</p>",
+}
+
+
+def git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def data_repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "data-updates")
+    for path, content in FILES.items():
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_bytes(content)
+    git(repo, "add", "-A")
+    git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", "data")
+    git(repo, "checkout", "-q", "--orphan", "main")
+    git(repo, "rm", "-rqf", ".")
+    return repo
+
+
+class TestRestoreTree:
+    """Test listing and streaming a subtree from a branch."""
+
+    def test_history_subtree_restored_byte_for_byte(self, data_repo):
+        """Test that every history file comes back exactly, and nothing else."""
+        stats = restore_tree("data-updates", HISTORY, data_repo)
+
+        history_files = {path: content for path, content in FILES.items() if path.startswith(HISTORY)}
+        for path, content in history_files.items():
+            assert (data_repo / path).read_bytes() == content
+        assert not (data_repo / "snapshots/production/acme-terms/snapshot.html").exists()
+        assert stats.files == len(history_files)
+        assert stats.bytes == sum(len(content) for content in history_files.values())
+        assert stats.missing == []
+
+    def test_missing_objects_reported(self, data_repo):
+        """Test that an unknown object id is yielded as None without ending the stream."""
+        blobs = list_tree_blobs("data-updates", HISTORY, cwd=data_repo)
+        object_ids = ["0" * 40, blobs[0][0]]
+        contents = dict(iter_blob_contents(object_ids, cwd=data_repo))
+        assert contents["0" * 40] is None
+        assert contents[blobs[0][0]] is not None
+
+    def test_unknown_ref_raises(self, data_repo):
+        """Test that a missing branch surfaces as GitBatchError."""
+        with pytest.raises(GitBatchError, match="no-such-branch"):
+            restore_tree("no-such-branch", HISTORY, data_repo)
@@ -0,0 +1,114 @@
+"""
+Unit tests for the delta-encoded history chain.
+Covers exact rebuilds, keyframe spacing, trimming and the fetch.py hook.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from history_delta import CHAIN_FILENAME, DeltaChain, HistoryChainError, apply_delta, line_delta
+
+BASE = "Community Guidelines\nDo not post hate speech or harassment.\nReport abuse to our team.\n"
+
+
+def versions(count):
+    """Policy texts with a one-word edit per version and an occasional new paragraph."""
+    lines = BASE.splitlines(keepends=True)
+    texts = []
+    for version in range(count):
+        lines[1] = f"Do not post hate speech or harassment (rev {version}).\n"
+        if version % 7 == 0:
+            lines.append(f"Section {version}: appeals are reviewed within 7 days.\n")
+        texts.append("".join(lines))
+    return texts
+
+
+class TestLineDelta:
+    """Test delta computation and application."""
+
+    def test_word_edit_stored_inside_the_line(self):
+        """Test that a one-word change is stored as a word op, not the whole paragraph."""
+        old = BASE.splitlines(keepends=True)
+        new = BASE.replace("harassment", "bullying").splitlines(keepends=True)
+        ops = line_delta(old, new)
+        assert ops == [[1, [[27, 37, "bullying"]]]]
+        assert apply_delta(old, ops) == new
+
+    def test_insertions_and_deletions_round_trip(self):
+        """Test line runs added and removed, without a trailing newline."""
+        old = ["a\n", "b\n", "c\n", "d"]
+        new = ["a\n", "x\n", "y\n", "c\n"]
+        assert apply_delta(old, line_delta(old, new)) == new
+
+
+class TestDeltaChain:
+    """Test the on-disk chain."""
+
+    def test_every_version_rebuilds_exactly(self, tmp_path):
+        """Test rebuilds after reloading, with keyframes at the configured interval."""
+        texts = versions(25)
+        chain = DeltaChain(tmp_path / CHAIN_FILENAME, keyframe_interval=10)
+        for text in texts:
+            chain.append(text, {"timestamp": "2026-01-01T00:00:00Z", "label": "ignored"})
+
+        reloaded = DeltaChain(tmp_path / CHAIN_FILENAME).load()
+        assert [reloaded.text(seq) for seq in range(25)] == texts
+        assert [r["seq"] for r in reloaded.records if "key" in r] == [0, 10, 20]
+        assert "label" not in reloaded.versions()[0]
+
+    def test_unchanged_text_not_appended(self, tmp_path):
+        """Test that re-recording the latest text is a no-op."""
+        chain = DeltaChain(tmp_path / CHAIN_FILENAME)
+        assert chain.append(BASE) is not None
+        assert chain.append(BASE) is None
+        assert len(chain) == 1
+
+    def test_trimmed_chain_starts_with_keyframe(self, tmp_path):
+        """Test that trimming re-keys the oldest kept version."""
+        texts = versions(12)
+        chain = DeltaChain(tmp_path / CHAIN_FILENAME, keyframe_interval=50, max_versions=5)
+        for text in texts:
+            chain.append(text)
+
+        reloaded = DeltaChain(tmp_path / CHAIN_FILENAME).load()
+        assert [r["seq"] for r in reloaded.records] == list(range(7, 12))
+        assert "key" in reloaded.records[0]
+        assert [reloaded.text(seq) for seq in range(7, 12)] == texts[7:]
+
+    def test_corrupted_delta_fails_hash_check(self, tmp_path):
+        """Test that a tampered record is detected on rebuild."""
+        path = tmp_path / CHAIN_FILENAME
+        chain = DeltaChain(path)
+        for text in versions(3):
+            chain.append(text)
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        records[0]["key"] = records[0]["key"].replace("hate", "hat")
+        path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+        with pytest.raises(HistoryChainError, match="hash check"):
+            DeltaChain(path).load().text(2)
+
+
+class TestHistoryChainHook:
+    """Test that history exports feed the chain beyond the manifest cap."""
+
+    def test_chain_keeps_versions_the_manifest_drops(self, monkeypatch, tmp_path):
+        """Test that the chain outlives the dashboard retention cap."""
+        monkeypatch.setattr(fetch, "HISTORY_EXPORT_ENABLED", True)
+        monkeypatch.setattr(fetch, "_HISTORY_BOOTSTRAP_ATTEMPTED", True)
+        monkeypatch.setattr(fetch, "MAX_HISTORY_ENTRIES", 2)
+        texts = versions(6)
+        for text in texts:
+            fetch.update_history_artifacts("acme-terms", text, tmp_path)
+
+        chain = DeltaChain(tmp_path / "history" / "acme-terms" / CHAIN_FILENAME).load()
+        manifest = json.loads((tmp_path / "history" / "acme-terms" / "index.json").read_text())
+        assert len(manifest) == 2
+        assert [chain.text(seq) for seq in range(6)] == texts
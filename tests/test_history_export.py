@@ -0,0 +1,82 @@
+"""
+Unit tests for history export-only mode.
+Checks that parallel cleaning writes the same artifacts as a serial run.
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from snapshot_store import SNAPSHOT_BASENAME
+
+PAGES = {
+    "acme-terms": "<html><body><main><h1>Terms</h1><p>Be kind. No spam.</p></main></body></html>",
+    "acme-privacy": "<html><body><nav>Home</nav><p>We keep your data safe.</p></body></html>",
+    "acme-safety": "<html><body><article><p>Report abuse to our team.</p></article></body></html>",
+}
+
+
+@pytest.fixture
+def export_env(monkeypatch):
+    monkeypatch.setattr(fetch, "HISTORY_EXPORT_ENABLED", True)
+    monkeypatch.setattr(fetch, "_HISTORY_BOOTSTRAP_ATTEMPTED", True)
+
+    def run(snapshots_dir: Path, workers: int) -> None:
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", snapshots_dir)
+        fetch.run_history_export_only_mode(workers)
+
+    return run
+
+
+def make_snapshots(root: Path) -> Path:
+    for slug, html in PAGES.items():
+        (root / slug).mkdir(parents=True)
+        (root / slug / SNAPSHOT_BASENAME).write_text(html, encoding="utf-8")
+    return root
+
+
+def exported_texts(root: Path) -> dict:
+    """clean.txt plus the ordered history texts per slug (history filenames are timestamps)."""
+    texts = {}
+    for slug in PAGES:
+        manifest = json.loads((root / "history" / slug / "index.json").read_text())
+        texts[slug] = {
+            "clean": (root / slug / fetch.CLEAN_SNAPSHOT_FILENAME).read_text(encoding="utf-8"),
+            "history": [(root / "history" / slug / entry["file"]).read_text(encoding="utf-8")
+                        for entry in manifest],
+        }
+    return texts
+
+
+class TestParallelHistoryExport:
+    """Test the process-pool export path against the serial one."""
+
+    def test_parallel_output_matches_serial(self, export_env, tmp_path):
+        """Test that worker count does not change any exported text."""
+        serial = make_snapshots(tmp_path / "serial")
+        parallel = tmp_path / "parallel"
+        shutil.copytree(serial, parallel)
+
+        export_env(serial, workers=1)
+        export_env(parallel, workers=3)
+
+        assert exported_texts(parallel) == exported_texts(serial)
+        assert exported_texts(serial)["acme-terms"]["clean"] == fetch.clean_html(PAGES["acme-terms"], "acme-terms")
+
+    def test_unreadable_snapshot_is_skipped(self, export_env, tmp_path, capsys):
+        """Test that a snapshot that can't be read is reported and the rest exported."""
+        root = make_snapshots(tmp_path / "snapshots")
+        (root / "acme-broken" / SNAPSHOT_BASENAME).mkdir(parents=True)
+
+        export_env(root, workers=2)
+
+        assert "Failed to read" in capsys.readouterr().err
+        assert not (root / "history" / "acme-broken").exists()
+        assert set(exported_texts(root)) == set(PAGES)
@@ -0,0 +1,105 @@
+"""
+Unit tests for the content-addressed history blob store.
+Covers deduplication, legacy migration and garbage collection.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from history_store import BLOBS_DIRNAME, HistoryBlobStore, blob_id
+
+
+@pytest.fixture
+def history_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(fetch, "HISTORY_EXPORT_ENABLED", True)
+    monkeypatch.setattr(fetch, "_HISTORY_BOOTSTRAP_ATTEMPTED", True)
+    return tmp_path
+
+
+def manifest(root: Path, slug: str) -> list[dict]:
+    return json.loads((root / "history" / slug / "index.json").read_text())
+
+
+def read_entry(root: Path, slug: str, entry: dict) -> str:
+    """Resolve an entry the way the dashboard does: relative to history/<slug>/."""
+    return HistoryBlobStore(root / "history").read(root / "history" / slug / entry["file"])
+
+
+class TestHistoryBlobStore:
+    """Test storing, reading and collecting blobs."""
+
+    def test_identical_texts_share_one_blob(self, tmp_path):
+        """Test that the same text is stored once, under its hash."""
+        store = HistoryBlobStore(tmp_path)
+        first_id, first_path = store.put("Be kind.")
+        second_id, second_path = store.put("Be kind.")
+        assert first_id == second_id == blob_id("Be kind.")
+        assert first_path == second_path
+        assert first_path.parent.parent == tmp_path / BLOBS_DIRNAME
+
+    def test_gzip_blobs_round_trip(self, tmp_path):
+        """Test that compressed blobs read back and are deterministic."""
+        store = HistoryBlobStore(tmp_path, compression="gzip")
+        _, path = store.put("Règles de la communauté\n" * 50)
+        assert path.name.endswith(".txt.gz")
+        assert store.read(path) == "Règles de la communauté\n" * 50
+        assert path.stat().st_size < len("Règles de la communauté\n" * 50)
+
+    def test_unreferenced_blobs_collected(self, tmp_path):
+        """Test that only blobs missing from every manifest are deleted."""
+        store = HistoryBlobStore(tmp_path)
+        kept_id, kept_path = store.put("kept")
+        _, dropped_path = store.put("dropped")
+        (tmp_path / "acme-terms").mkdir()
+        (tmp_path / "acme-terms" / "index.json").write_text(json.dumps([{"blob": kept_id}]))
+
+        assert store.collect_garbage() == 1
+        assert kept_path.exists()
+        assert not dropped_path.exists()
+
+
+class TestHistoryArtifacts:
+    """Test update_history_artifacts() on top of the blob store."""
+
+    def test_slugs_with_same_text_share_a_blob(self, history_env):
+        """Test cross-slug deduplication with dashboard-compatible manifests."""
+        fetch.update_history_artifacts("instagram-blocking-people", "Block someone.", history_env)
+        fetch.update_history_artifacts("meta-blocking-people", "Block someone.", history_env)
+
+        instagram = manifest(history_env, "instagram-blocking-people")[0]
+        meta = manifest(history_env, "meta-blocking-people")[0]
+        assert instagram["blob"] == meta["blob"] == blob_id("Block someone.")
+        assert read_entry(history_env, "meta-blocking-people", meta) == "Block someone."
+        assert len(list((history_env / "history" / BLOBS_DIRNAME).glob("*/*"))) == 1
+
+    def test_legacy_entries_migrated_and_deduplicated(self, history_env):
+        """Test that per-slug .txt files move into the store on the next update."""
+        slug_dir = history_env / "history" / "acme-terms"
+        slug_dir.mkdir(parents=True)
+        (slug_dir / "20250101T000000Z.txt").write_text("Old terms.", encoding="utf-8")
+        (slug_dir / "index.json").write_text(json.dumps([{"timestamp": "", "label": "", "file": "20250101T000000Z.txt"}]))
+
+        fetch.update_history_artifacts("acme-terms", "Old terms.", history_env)
+
+        entries = manifest(history_env, "acme-terms")
+        assert len(entries) == 1
+        assert entries[0]["blob"] == blob_id("Old terms.")
+        assert not (slug_dir / "20250101T000000Z.txt").exists()
+        assert read_entry(history_env, "acme-terms", entries[0]) == "Old terms."
+
+    def test_retention_releases_blobs_for_gc(self, history_env, monkeypatch):
+        """Test that blobs dropped by the retention cap are collected."""
+        monkeypatch.setattr(fetch, "MAX_HISTORY_ENTRIES", 2)
+        for version in ("v1", "v2", "v3"):
+            fetch.update_history_artifacts("acme-terms", version, history_env)
+
+        store = fetch.history_blob_store(history_env)
+        assert store.collect_garbage() == 1
+        assert [read_entry(history_env, "acme-terms", e) for e in manifest(history_env, "acme-terms")] == ["v3", "v2"]
@@ -0,0 +1,102 @@
+"""
+Unit tests for raw-HTML snapshot canonicalization.
+Covers noise removal, clean_html() equivalence, determinism and the fetch.py opt-in.
+"""
+
+import sys
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from html_canonicalizer import canonicalize_html, referenced_attributes, verified_canonical_html
+from snapshot_store import read_snapshot
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Terms</title>
+<script nonce="a1b2">window.__STATE__ = {"session": "x9"};</script>
+<style>.x { color: red }</style><meta name="csrf-token" content="f00">
+</head>
+<body onload="init()">
+  <nav class="site-nav"><a href="/home?utm_source=mail&amp;lang=en">Home</a></nav>
+  <main data-reactid="42" id="content">
+    <h1>Community   Guidelines</h1><!-- build 1234 -->
+    <p>Be kind.<span>Report abuse</span><script>track()</script>to our team.</p>
+    <p class="note" data-testid="n1">Appeals are reviewed
+       within 7 days.</p>
+    <pre>  keep   this  </pre>
+  </main>
+</body></html>
+"""
+
+
+def keep_attributes():
+    return referenced_attributes(fetch.load_extraction_rules())
+
+
+class TestCanonicalizeHtml:
+    """Test the canonical serialization."""
+
+    def test_noise_removed_and_rule_attributes_kept(self):
+        """Test that scripts, comments and volatile attributes go while matched attributes stay."""
+        canonical = canonicalize_html(PAGE, keep_attributes())
+        for noise in ("<script", "<style", "<meta", "nonce", "onload", "data-reactid", "build 1234", "utm_source"):
+            assert noise not in canonical
+        assert 'id="content"' in canonical
+        assert 'class="note"' in canonical
+        assert 'href="/home?lang=en"' in canonical
+        assert "<pre>  keep   this  </pre>" in canonical
+
+    def test_removed_elements_keep_text_apart(self):
+        """Test that text around a removed script does not merge."""
+        canonical = canonicalize_html("<p>before<script>x()</script>after</p>")
+        assert "beforeafter" not in canonical
+
+    def test_output_is_deterministic_and_idempotent(self):
+        """Test that canonicalizing twice gives the same bytes."""
+        canonical = canonicalize_html(PAGE, keep_attributes())
+        assert canonicalize_html(PAGE, keep_attributes()) == canonical
+        assert canonicalize_html(canonical, keep_attributes()) == canonical
+
+
+class TestVerification:
+    """Test that canonical snapshots are only used when clean_html() agrees."""
+
+    def test_clean_text_unchanged_for_sample_page(self):
+        """Test clean_html() equality on the sample page."""
+        cleaned = fetch.clean_html(PAGE, "acme-terms")
+        stored, difference = fetch.canonical_snapshot_html("acme-terms", PAGE, cleaned)
+        assert difference is None
+        assert len(stored) < len(PAGE)
+        assert fetch.clean_html(stored, "acme-terms") == cleaned
+
+    def test_falls_back_to_raw_html_on_difference(self):
+        """Test that a cleaning mismatch keeps the raw HTML and reports where."""
+        stored, difference = verified_canonical_html(PAGE, "expected text\n", lambda html: "other text\n")
+        assert stored == PAGE
+        assert "line 1" in difference
+
+
+class TestFetchCanonicalization:
+    """Test the per-page opt-in in process_fetched_page."""
+
+    def test_opted_in_page_stores_canonical_html(self, monkeypatch, tmp_path):
+        """Test that the stored snapshot and its fingerprint use the canonical HTML."""
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path)
+        outcome = fetch.process_fetched_page("acme-terms", "https://acme.example/terms", PAGE,
+                                             canonicalize=True)
+        stored = read_snapshot(tmp_path / "acme-terms")
+        assert outcome["failure"] is None
+        assert "<script" not in stored
+        assert fetch.load_clean_fingerprint(tmp_path / "acme-terms")["raw_sha256"] == fetch.content_sha256(stored)
+
+        # Refetching the same raw page is recognised as unchanged
+        assert not fetch.process_fetched_page("acme-terms", "https://acme.example/terms", PAGE,
+                                              canonicalize=True)["changed"]
+
+    def test_pages_not_opted_in_store_raw_html(self, monkeypatch, tmp_path):
+        """Test that the default keeps snapshots exactly as fetched."""
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path)
+        fetch.process_fetched_page("acme-terms", "https://acme.example/terms", PAGE)
+        assert read_snapshot(tmp_path / "acme-terms") == PAGE
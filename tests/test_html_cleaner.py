@@ -0,0 +1,94 @@
+"""
+Unit tests for the single-pass HTML cleaning engine.
+Checks that each strip rule matches what the old find()/find_all() calls removed.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from extraction_rules import load_extraction_rules
+from html_cleaner import ElementRule, extract_text, parser_available
+
+
+def words(html: str, parser: str = "html.parser") -> list[str]:
+    return extract_text(html, load_extraction_rules().default.cleaning, parser=parser).split()
+
+
+class TestStripRules:
+    """Test that noisy elements are removed in one pass."""
+
+    def test_dynamic_elements_removed(self):
+        """Test every default strip rule from extraction_rules.json against a small fixture."""
+        html = """
+        <body>
+          <p>Keep</p>
+          <div class="subscribe-btn">Follow</div>
+          <span id="survey-123.456">Dynamic</span>
+          <div data-page-data-key="zwieback_id">Session</div>
+          <p style="color: red; display: none">Hidden</p>
+          <input type="search" value="Query"><button type="search">Go</button>
+          <ul class="main-menu"><li>Menu</li></ul>
+          <form role="search">SearchForm</form>
+          <p>Policy</p>
+        </body>
+        """
+        assert words(html) == ["Keep", "Policy"]
+
+    def test_only_first_survey_container_removed(self):
+        """Test that the feedback form rule keeps find() semantics."""
+        html = ('<div class="article-survey-container">First</div>'
+                '<div class="article-survey-container">Second</div>')
+        assert words(html) == ["Second"]
+
+    def test_multi_valued_class_matching(self):
+        """Test per-token matching of multi-valued class attributes."""
+        assert words('<div class="x subscribe-btn">Gone</div><p>Kept</p>') == ["Kept"]
+        assert words('<div class="nav site-menu-item">Gone</div><p>Kept</p>') == ["Kept"]
+        assert words('<div class="subscribe-btn-wide">Kept</div>') == ["Kept"]
+
+    def test_nested_matches_removed_once(self):
+        """Test that matches inside an already-removed element are harmless."""
+        html = '<div class="menu"><div class="search">Nav</div></div><p>Body</p>'
+        assert words(html) == ["Body"]
+
+    def test_rule_requires_value_or_pattern(self):
+        """Test that a rule without a matcher is rejected."""
+        with pytest.raises(ValueError):
+            ElementRule("class")
+
+
+class TestContentRoots:
+    """Test selection of the main article container."""
+
+    def test_article_body_preferred_over_itemprop(self):
+        """Test that the class selector wins even when itemprop appears first."""
+        html = ('<div itemprop="articleBody">Schema</div>'
+                '<div class="article-body">Article <div class="menu">Nav</div></div>')
+        assert words(html) == ["Article"]
+
+    def test_itemprop_fallback_strips_inside_root_only(self):
+        """Test that only noise inside the chosen root is considered."""
+        html = ('<div class="article-survey-container">Outside</div>'
+                '<div itemprop="articleBody">Body'
+                '<div class="article-survey-container">Inside</div></div>')
+        assert words(html) == ["Body"]
+
+    def test_whole_document_without_root(self):
+        """Test that pages without an article root use the whole document."""
+        assert words('<p>One</p><p class="search">Two</p><p>Three</p>') == ["One", "Three"]
+
+
+@pytest.mark.skipif(not parser_available("lxml"), reason="lxml not installed")
+class TestParserBackends:
+    """Test that the lxml backend extracts the same text."""
+
+    def test_lxml_matches_html_parser(self):
+        """Test both backends on well-formed markup."""
+        html = ('<html><body><div class="article-body"><h1>Rules</h1>'
+                '<div class="subscribe-btn">Follow</div><p>Be kind.</p></div></body></html>')
+        assert words(html, "lxml") == words(html) == ["Rules", "Be", "kind."]
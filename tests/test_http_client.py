@@ -0,0 +1,108 @@
+"""
+Unit tests for the run-scoped HTTP client factories.
+Covers pool limits from the environment, header merging and the HTTP/2 toggle.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import http_client
+from http_client import (DEFAULT_KEEPALIVE_EXPIRY_SECONDS, DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                         build_limits, create_async_client, create_client)
+
+LIMIT_VARIABLES = ("HTTP_MAX_CONNECTIONS", "HTTP_MAX_KEEPALIVE_CONNECTIONS", "HTTP_KEEPALIVE_EXPIRY_SECONDS")
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for name in LIMIT_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def fake_find_spec(find_spec, h2_installed):
+    """importlib.util.find_spec, answering for ``h2`` as if it were (not) installed."""
+    return lambda name, *args: (object() if h2_installed else None) if name == "h2" else find_spec(name, *args)
+
+
+class TestBuildLimits:
+    """Test pool limits read from the environment."""
+
+    def test_defaults(self, clean_env):
+        """Test the defaults when nothing is set, or a variable is blank."""
+        clean_env.setenv("HTTP_MAX_CONNECTIONS", "  ")
+        limits = build_limits()
+        assert limits.max_connections == DEFAULT_MAX_CONNECTIONS
+        assert limits.max_keepalive_connections == DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+        assert limits.keepalive_expiry == DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+
+    def test_valid_values(self, clean_env):
+        """Test that integer and float settings are parsed."""
+        clean_env.setenv("HTTP_MAX_CONNECTIONS", "40")
+        clean_env.setenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", " 8 ")
+        clean_env.setenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "2.5")
+        limits = build_limits()
+        assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (40, 8, 2.5)
+
+    def test_garbage_values_fall_back_with_a_warning(self, clean_env, capsys):
+        """Test that unparseable settings keep the default and say so."""
+        clean_env.setenv("HTTP_MAX_CONNECTIONS", "lots")
+        clean_env.setenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30s")
+        limits = build_limits()
+        assert limits.max_connections == DEFAULT_MAX_CONNECTIONS
+        assert limits.keepalive_expiry == DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+        warnings = capsys.readouterr().err
+        assert "Ignoring invalid HTTP_MAX_CONNECTIONS='lots'" in warnings
+        assert "HTTP_KEEPALIVE_EXPIRY_SECONDS='30s'" in warnings
+
+
+class TestClientOptions:
+    """Test the clients the factories build."""
+
+    def test_headers_are_merged(self, clean_env):
+        """Test that extra headers join httpx's defaults and the user agent wins."""
+        with create_client("Watcher/1.0", headers={"Accept-Language": "en", "User-Agent": "other"}) as client:
+            assert client.headers["user-agent"] == "Watcher/1.0"
+            assert client.headers["accept-language"] == "en"
+            assert "gzip" in client.headers["accept-encoding"]
+            assert client.follow_redirects is True
+
+        with create_client(headers={"User-Agent": "kept"}) as client:
+            assert client.headers["user-agent"] == "kept"
+
+    def test_async_client_sends_merged_headers(self, clean_env):
+        """Test the async factory end to end, with options passed through to httpx."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers)
+            return httpx.Response(200, text="ok")
+
+        async def run():
+            async with create_async_client("Watcher/1.0", headers={"X-Probe": "1"},
+                                           transport=httpx.MockTransport(handler)) as client:
+                await client.get("https://acme.example/")
+
+        asyncio.run(run())
+        assert seen[0]["user-agent"] == "Watcher/1.0" and seen[0]["x-probe"] == "1"
+
+    def test_http2_follows_h2_availability(self, clean_env, monkeypatch):
+        """Test that HTTP/2 is requested only when h2 can be imported."""
+        find_spec = http_client.importlib.util.find_spec
+        monkeypatch.setattr(http_client.importlib.util, "find_spec", fake_find_spec(find_spec, h2_installed=False))
+        assert http_client.http2_available() is False
+        assert http_client._client_options(None, 5.0, {})["http2"] is False
+        with create_client() as client:
+            assert client.headers["user-agent"].startswith("python-httpx")
+
+        monkeypatch.setattr(http_client.importlib.util, "find_spec", fake_find_spec(find_spec, h2_installed=True))
+        assert http_client.http2_available() is True
+        options = http_client._client_options(None, 5.0, {})
+        assert options["http2"] is True and options["limits"] == build_limits()
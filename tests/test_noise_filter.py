@@ -0,0 +1,42 @@
+"""
+Unit tests for the compiled line noise filter used by clean_html().
+"""
+
+import sys
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from extraction_rules import load_extraction_rules
+from fetch import lines_without_noise
+
+
+class TestNoiseFilter:
+    """Test shared and slug-specific noise patterns."""
+
+    def test_shared_patterns_apply_to_every_slug(self):
+        """Test that global navigation noise is dropped for any platform."""
+        lines = ["Google Help", "Real policy text.", "", "Was it helpful? Yes"]
+        assert lines_without_noise(lines, "meta-hate-speech") == ["Real policy text."]
+        assert lines_without_noise(lines, None) == ["Real policy text."]
+
+    def test_slug_patterns_only_apply_to_their_prefix(self):
+        """Test that platform-specific patterns don't leak across platforms."""
+        lines = ["Search", "Policy text."]
+        assert lines_without_noise(lines, "twitch-community-guidelines") == ["Policy text."]
+        assert lines_without_noise(lines, "tiktok-community-guidelines") == lines
+
+    def test_patterns_are_literal(self):
+        """Test that regex metacharacters in patterns are matched literally."""
+        lines = ["Community Standards | Transparency Center", "Community Standards"]
+        assert lines_without_noise(lines, None) == ["Community Standards"]
+
+    def test_long_unspaced_lines_dropped(self):
+        """Test that language grids and nav blobs are removed."""
+        assert lines_without_noise(["x" * 200, "Short line."], None) == ["Short line."]
+
+    def test_matcher_compiled_once_per_prefix(self):
+        """Test that slugs sharing a prefix reuse one compiled matcher."""
+        registry = load_extraction_rules()
+        assert registry.for_slug("youtube-harassment").noise is registry.for_slug("youtube-spam").noise
@@ -0,0 +1,129 @@
+"""
+Unit tests for the adaptive polling scheduler.
+Covers change-rate intervals, the minimum cadence, seeding from history and fetch.py integration.
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from poll_scheduler import SCHEDULE_FILENAME, PollSchedule, history_change_times, run_log_start
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+RUN = timedelta(hours=6)
+
+
+def simulate(schedule, change_every, runs):
+    """Run a 6-hourly poller against a page that changes every ``change_every``; returns fetch count."""
+    schedule.seed("acme-terms", [], None, START)
+    seen_version = 0
+    fetches = 0
+    for run in range(runs):
+        now = START + run * RUN
+        if schedule.is_due("acme-terms", now):
+            version = (now - START) // change_every if change_every else 0
+            schedule.record("acme-terms", version != seen_version, now)
+            seen_version = version
+            fetches += 1
+    return fetches
+
+
+class TestPollSchedule:
+    """Test interval estimation."""
+
+    def test_volatile_page_polled_every_run(self, tmp_path):
+        """Test that a page changing between every run stays at the minimum interval."""
+        schedule = PollSchedule(tmp_path / SCHEDULE_FILENAME, min_interval_hours=6, max_interval_hours=168)
+        fetches = simulate(schedule, RUN, runs=200)
+        assert schedule.entries["acme-terms"]["interval_hours"] == 6.0
+        assert fetches > 150
+
+    def test_stable_page_polled_at_minimum_cadence(self, tmp_path):
+        """Test that a page that never changes is still fetched once per maximum interval."""
+        schedule = PollSchedule(tmp_path / SCHEDULE_FILENAME, min_interval_hours=6, max_interval_hours=168)
+        fetches = simulate(schedule, None, runs=4 * 7 * 8)
+        assert schedule.entries["acme-terms"]["interval_hours"] == 168.0
+        assert fetches <= 8 + 5  # backing off from 6 hours takes five checks
+
+    def test_failed_page_stays_due(self, tmp_path):
+        """Test that a slug is only rescheduled once a check is recorded."""
+        schedule = PollSchedule(tmp_path / SCHEDULE_FILENAME)
+        schedule.seed("acme-terms", [], None, START)
+        assert schedule.is_due("acme-terms", START + timedelta(days=30))
+        schedule.record("acme-terms", False, START)
+        assert not schedule.is_due("acme-terms", START + RUN)
+
+    def test_schedule_round_trips(self, tmp_path):
+        """Test that saved stats reload."""
+        schedule = PollSchedule(tmp_path / SCHEDULE_FILENAME)
+        schedule.record("acme-terms", True, START)
+        schedule.save()
+        reloaded = PollSchedule(tmp_path / SCHEDULE_FILENAME).load()
+        assert reloaded.entries["acme-terms"]["changes"] == 1
+        assert reloaded.next_due("acme-terms") == schedule.next_due("acme-terms")
+
+
+class TestSeeding:
+    """Test stats taken from history manifests and the run log."""
+
+    def test_change_times_and_watch_window(self, tmp_path):
+        """Test that manifest timestamps and the oldest run log entry seed the stats."""
+        manifest = tmp_path / "index.json"
+        manifest.write_text(json.dumps([{"timestamp": "2025-12-01T00:00:00Z"},
+                                        {"timestamp": "2025-11-01T00:00:00Z"}]))
+        times = history_change_times(tmp_path / "chain.jsonl", manifest)
+        assert times == [datetime(2025, 11, 1, tzinfo=UTC), datetime(2025, 12, 1, tzinfo=UTC)]
+        watched_since = run_log_start([{"timestamp_utc": "2025-10-01T00:00:00Z"},
+                                       {"timestamp_utc": "2025-12-01T00:00:00Z"}])
+
+        schedule = PollSchedule(tmp_path / SCHEDULE_FILENAME)
+        schedule.seed("acme-terms", times, watched_since, START)
+        entry = schedule.entries["acme-terms"]
+        assert entry["first_seen"] == "2025-10-01T00:00:00Z"
+        assert entry["changes"] == 2
+        assert schedule.is_due("acme-terms", START)
+
+
+class TestFetchScheduling:
+    """Test that fetch.py only fetches due pages."""
+
+    def run_main(self, monkeypatch, tmp_path, pages, argv):
+        fetched = []
+
+        async def fake_cycle(pages_to_track, *pools):
+            fetched.append([page["slug"] for page in pages_to_track])
+            return [{"failures": [], "errors": [], "changed": False, "conditional_get": None,
+                     "renderer": "httpx", "readiness": None} for _ in pages_to_track]
+
+        config = tmp_path / "platform_urls.json"
+        config.write_text(json.dumps(pages))
+        monkeypatch.setattr(fetch, "URL_CONFIG_FILE", config)
+        monkeypatch.setattr(fetch, "RUN_LOG_FILE", tmp_path / "run_log.json")
+        monkeypatch.setattr(fetch, "FAILURE_LOG_FILE", tmp_path / "failures.log")
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "snapshots")
+        monkeypatch.setattr(fetch, "ADAPTIVE_POLLING", True)
+        monkeypatch.setattr(fetch, "run_fetch_cycle", fake_cycle)
+        fetch.main(argv)
+        return fetched[0] if fetched else []
+
+    def test_only_due_pages_fetched(self, monkeypatch, tmp_path):
+        """Test that a recently checked page is deferred and logged as such."""
+        pages = [{"slug": "acme-terms", "url": "https://acme.example/terms"},
+                 {"slug": "acme-privacy", "url": "https://acme.example/privacy"}]
+        schedule = PollSchedule(tmp_path / "snapshots" / SCHEDULE_FILENAME)
+        schedule.record("acme-terms", False)
+        schedule.save()
+
+        assert self.run_main(monkeypatch, tmp_path, pages, []) == ["acme-privacy"]
+        run_log = json.loads((tmp_path / "run_log.json").read_text())
+        assert run_log[0]["schedule"] == {"due": 1, "deferred": 1}
+        assert run_log[0]["pages_checked"] == 1
+
+        # Both are now recorded, so --all is the only way to fetch them again this soon
+        assert self.run_main(monkeypatch, tmp_path, pages, []) == []
+        assert self.run_main(monkeypatch, tmp_path, pages, ["--all"]) == ["acme-terms", "acme-privacy"]
@@ -0,0 +1,159 @@
+"""
+Unit tests for per-host rate limiting and retry pacing.
+Covers token buckets, Retry-After parsing, jittered backoff and the retry loop in fetch.py.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+
+import httpx
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from fetch_engine import FetchEngine
+from rate_limiter import HostRateLimiter, RetryBudget, TokenBucket, backoff_delay, parse_retry_after
+
+URL = "https://help.acme.example/terms"
+HTML = "<html><body><main><p>Be kind.</p></main></body></html>"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPacing:
+    """Test the building blocks."""
+
+    def test_bucket_allows_burst_then_spaces_requests(self):
+        """Test that requests beyond the burst wait one token interval each."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.5, burst=2, clock=clock)
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 2.0, 4.0]
+        clock.now += 10
+        assert bucket.reserve() == 0.0
+
+    def test_pause_holds_back_the_host(self):
+        """Test that a Retry-After pause applies even when tokens are available."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=5, clock=clock)
+        bucket.pause(30)
+        assert bucket.reserve() == 30.0
+
+    def test_retry_after_formats(self):
+        """Test delta-seconds, HTTP-date and invalid values."""
+        now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC)
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Thu, 01 Jan 2026 12:00:30 GMT", now) == 30.0
+        assert parse_retry_after("Thu, 01 Jan 2026 11:00:00 GMT", now) == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_backoff_grows_and_is_capped(self):
+        """Test full-jitter bounds."""
+        upper = lambda low, high: high
+        assert [backoff_delay(n, base=5, cap=60, rng=upper) for n in range(5)] == [5, 10, 20, 40, 60]
+        assert backoff_delay(3, base=5, cap=60, rng=lambda low, high: low) == 0
+
+    def test_hosts_are_limited_independently(self):
+        """Test that one host's queue doesn't slow another host."""
+        limiter = HostRateLimiter(requests_per_minute=600, burst=1)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire("a.example") for _ in range(3)))
+            slow = time.monotonic() - start
+            start = time.monotonic()
+            await limiter.acquire("b.example")
+            return slow, time.monotonic() - start
+
+        slow, fast = asyncio.run(run())
+        assert slow >= 0.18
+        assert fast < 0.05
+
+    def test_budget_runs_out(self):
+        """Test the shared retry budget."""
+        budget = RetryBudget(2)
+        assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+class TestErrorClassification:
+    """Test status-based classification."""
+
+    def test_status_codes(self):
+        """Test 429, 5xx and 404 from httpx and the browser renderer."""
+        request = httpx.Request("GET", URL)
+        limited = httpx.HTTPStatusError("429", request=request,
+                                        response=httpx.Response(429, headers={"Retry-After": "7"}))
+        assert fetch.classify_error(limited) == fetch.URLErrorTypes.RATE_LIMITED
+        assert fetch.retry_after_seconds(limited) == 7.0
+        assert fetch.should_retry(fetch.URLErrorTypes.RATE_LIMITED)
+        assert fetch.classify_error(fetch.HTTPStatusFetchError(503, "HTTP 503: Unavailable")) == \
+            fetch.URLErrorTypes.SERVER_ERROR
+        assert fetch.classify_error(fetch.HTTPStatusFetchError(404, "HTTP 404: Not Found")) == \
+            fetch.URLErrorTypes.BROKEN_LINK
+
+
+class TestRetryLoop:
+    """Test fetch_with_retries against scripted responses."""
+
+    def fetch(self, monkeypatch, tmp_path, responses, engine):
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path)
+        monkeypatch.setattr(fetch, "backoff_delay", lambda *args: 0)
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return responses[min(len(requests), len(responses)) - 1]
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                result = {"failures": [], "errors": [], "conditional_get": None}
+                fetched = await fetch.fetch_with_retries(
+                    URL, "acme-terms", "httpx", engine, None, client,
+                    fetch.load_extraction_rules().for_slug("acme-terms"), result)
+                return fetched, result
+
+        fetched, result = asyncio.run(run())
+        return fetched, result, len(requests)
+
+    def test_retry_after_pauses_host_then_succeeds(self, monkeypatch, tmp_path):
+        """Test that a 429 pauses the host and the retry goes through."""
+        limiter = HostRateLimiter(requests_per_minute=6000, burst=5)
+        paused = []
+        monkeypatch.setattr(limiter, "pause", lambda host, seconds: paused.append((host, seconds)))
+        engine = FetchEngine(rate_limiter=limiter, retry_budget=RetryBudget(5))
+        responses = [httpx.Response(429, headers={"Retry-After": "0"}),
+                     httpx.Response(200, headers={"content-type": "text/html"}, text=HTML)]
+
+        fetched, result, attempts = self.fetch(monkeypatch, tmp_path, responses, engine)
+        assert fetched.content == HTML
+        assert attempts == 2
+        assert paused == [("help.acme.example", 0.0)]
+        assert engine.retry_budget.used == 1
+        assert result["failures"] == []
+
+    def test_exhausted_budget_stops_retries(self, monkeypatch, tmp_path):
+        """Test that an empty run budget turns a retryable error into a failure."""
+        engine = FetchEngine(rate_limiter=HostRateLimiter(6000, 5), retry_budget=RetryBudget(0))
+        fetched, result, attempts = self.fetch(monkeypatch, tmp_path, [httpx.Response(503)], engine)
+        assert fetched is None
+        assert attempts == 1
+        assert result["failures"][0]["error_type"] == fetch.URLErrorTypes.SERVER_ERROR
+
+    def test_long_retry_after_gives_up(self, monkeypatch, tmp_path):
+        """Test that a Retry-After beyond the cap fails the page for this run."""
+        engine = FetchEngine(rate_limiter=HostRateLimiter(6000, 5), retry_budget=RetryBudget(5))
+        responses = [httpx.Response(429, headers={"Retry-After": "3600"})]
+        fetched, result, attempts = self.fetch(monkeypatch, tmp_path, responses, engine)
+        assert fetched is None
+        assert attempts == 1
+        assert engine.retry_budget.used == 0
@@ -0,0 +1,108 @@
+"""
+Unit tests for Playwright readiness waits.
+Uses a fake page whose body text grows on a schedule.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from fetch import record_readiness_wait
+from readiness import ReadinessResult, ReadinessStrategy, wait_until_ready
+
+
+class FakePage:
+    """Body text length follows ``lengths``, one value per evaluate() call, then stays put."""
+
+    def __init__(self, lengths, selector_appears=True):
+        self.lengths = list(lengths)
+        self.selector_appears = selector_appears
+        self.calls = []
+
+    async def evaluate(self, script):
+        return self.lengths.pop(0) if len(self.lengths) > 1 else self.lengths[0]
+
+    async def wait_for_timeout(self, ms):
+        await asyncio.sleep(ms / 1000)
+
+    async def wait_for_selector(self, selector, **kwargs):
+        self.calls.append(("selector", selector))
+        if not self.selector_appears:
+            await asyncio.sleep(kwargs["timeout"] / 1000)
+            raise PlaywrightTimeoutError("selector timeout")
+
+    async def wait_for_load_state(self, state, **kwargs):
+        self.calls.append(("load_state", state))
+
+
+def wait(page, **strategy):
+    return asyncio.run(wait_until_ready(page, ReadinessStrategy(poll_ms=10, **strategy)))
+
+
+class TestWaitUntilReady:
+    """Test each readiness strategy and the overall deadline."""
+
+    def test_static_page_ready_after_stability_window(self):
+        """Test that an unchanging page is ready after one stability window."""
+        ready = wait(FakePage([500]), stable_ms=30, deadline_ms=1000)
+        assert ready.reason == "stable"
+        assert 30 <= ready.waited_ms < 500
+
+    def test_hydrating_page_waits_for_text_to_settle(self):
+        """Test that growing text resets the stability window."""
+        page = FakePage([0, 100, 200, 300, 300])
+        ready = wait(page, stable_ms=30, deadline_ms=1000)
+        assert ready.reason == "stable"
+        assert page.lengths == [300]
+
+    def test_never_settling_page_stops_at_deadline(self):
+        """Test that the deadline bounds the wait."""
+        page = FakePage(list(range(1000)))
+        ready = wait(page, stable_ms=50, deadline_ms=100)
+        assert ready.hit_deadline
+        assert ready.waited_ms < 500
+
+    def test_loading_shell_is_not_stable(self):
+        """Test that a short, unchanging loading shell doesn't start the stability window."""
+        page = FakePage([40, 40, 40, 40, 900, 1200])
+        ready = wait(page, stable_ms=30, min_text_chars=500, deadline_ms=1000)
+        assert ready.reason == "stable"
+        assert page.lengths == [1200]
+
+        shell = wait(FakePage([40]), stable_ms=30, min_text_chars=500, deadline_ms=100)
+        assert shell.reason == "too_short" and shell.hit_deadline
+
+        # Without a stability window the text floor still applies
+        assert wait(FakePage([40, 600]), stable_ms=0, min_text_chars=500, deadline_ms=1000).reason == "stable"
+
+    def test_selector_and_network_idle_checked_first(self):
+        """Test that configured conditions run in order before the text check."""
+        page = FakePage([10])
+        ready = wait(page, selector="main", network_idle=True, stable_ms=0, deadline_ms=1000)
+        assert ready.reason == "network_idle"
+        assert page.calls == [("selector", "main"), ("load_state", "networkidle")]
+
+    def test_missing_selector_hits_deadline(self):
+        """Test that a selector that never appears returns at the deadline."""
+        ready = wait(FakePage([10], selector_appears=False), selector="main", deadline_ms=50)
+        assert ready.hit_deadline
+
+
+class TestReadinessSummary:
+    """Test the per-platform wait summary written to the run log."""
+
+    def test_waits_aggregated_per_platform(self):
+        """Test page counts, averages, maxima and deadline hits."""
+        summary = {}
+        record_readiness_wait(summary, "TikTok", ReadinessResult(800, "stable"))
+        record_readiness_wait(summary, "TikTok", ReadinessResult(10000, "deadline"))
+        record_readiness_wait(summary, "Whatnot", ReadinessResult(300, "selector"))
+        assert summary["TikTok"] == {
+            "pages": 2, "total_wait_ms": 10800, "max_wait_ms": 10000, "deadline_hits": 1, "avg_wait_ms": 5400,
+        }
+        assert summary["Whatnot"]["deadline_hits"] == 0
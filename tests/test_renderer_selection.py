@@ -0,0 +1,191 @@
+"""
+Unit tests for adaptive renderer selection.
+Covers unusable-content detection, the TTL cache and httpx-to-Playwright escalation.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from fetch_engine import FetchEngine
+from renderer_selection import PLAYWRIGHT, HTTPX, RendererCache, blocked_response_reason, unusable_content_reason
+
+POLICY_HTML = "<html><body><p>" + "Users must not post hateful content. " * 30 + "</p></body></html>"
+SHELL_HTML = "<html><body><noscript>You need to enable JavaScript to run this app.</noscript></body></html>"
+REAL_FETCH_WITH_HTTPX = fetch.fetch_with_httpx
+CHALLENGE_HTML = "<html><head><title>Just a moment...</title></head><body><div id=\"cf-browser-verification\"></div></body></html>"
+
+
+class TestUnusableContent:
+    """Test detection of bot walls and JavaScript shells."""
+
+    def test_full_policy_page_is_usable(self):
+        """Test that a normal page is accepted."""
+        cleaned = fetch.clean_html(POLICY_HTML)
+        assert unusable_content_reason(POLICY_HTML, cleaned, False, 500) is None
+
+    def test_challenge_markers_detected(self):
+        """Test that challenge pages are rejected from text or raw HTML markers."""
+        assert "challenge" in unusable_content_reason("<html></html>", "Just a moment...", False, 0)
+        assert "challenge" in unusable_content_reason('<div id="cf-chl-widget">', "x" * 600, False, 500)
+
+    def test_blocked_error_responses_detected(self):
+        """Test that challenge bodies and bot-wall statuses count as blocked, other errors don't."""
+        assert "challenge" in blocked_response_reason(500, CHALLENGE_HTML)
+        assert blocked_response_reason(403, "Forbidden") == "HTTP 403"
+        assert blocked_response_reason(404, "Not Found") is None
+        assert blocked_response_reason(429, "Too Many Requests") is None
+        assert blocked_response_reason(503, "Service Unavailable") is None
+        assert blocked_response_reason(500, "") is None
+
+    def test_tiny_text_and_missing_root_detected(self):
+        """Test that empty shells and pages without their content root are rejected."""
+        assert "too short" in unusable_content_reason("<html></html>", "Loading", False, 500)
+        assert "content root" in unusable_content_reason("<html></html>", "x" * 600, False, 500,
+                                                         expect_content_root=True)
+
+
+class TestRendererCache:
+    """Test remembering renderers with a TTL."""
+
+    def test_round_trip_and_expiry(self, tmp_path):
+        """Test that choices persist and expire after the TTL."""
+        now = datetime(2026, 1, 1, tzinfo=UTC)
+        cache = RendererCache(tmp_path / "renderer_cache.json", ttl_hours=24)
+        cache.remember("tiktok-community-guidelines", PLAYWRIGHT, "too short", now=now)
+        cache.save()
+
+        reloaded = RendererCache(tmp_path / "renderer_cache.json", ttl_hours=24).load()
+        assert reloaded.get("tiktok-community-guidelines", now=now + timedelta(hours=23)) == PLAYWRIGHT
+        assert reloaded.get("tiktok-community-guidelines", now=now + timedelta(hours=25)) is None
+        assert reloaded.get("unknown-slug", now=now) is None
+
+    def test_unchanged_choice_is_not_rewritten(self, tmp_path):
+        """Test that re-confirming a fresh choice keeps its timestamp and skips the write."""
+        cache = RendererCache(tmp_path / "renderer_cache.json")
+        cache.remember("youtube-harassment-policy", HTTPX)
+        cache.save()
+        chosen_at = cache.entries["youtube-harassment-policy"]["chosen_at"]
+
+        cache.remember("youtube-harassment-policy", HTTPX)
+        assert cache.entries["youtube-harassment-policy"]["chosen_at"] == chosen_at
+        assert cache._dirty is False
+
+
+@pytest.fixture
+def fake_renderers(monkeypatch, tmp_path):
+    """Stub both fetchers; httpx serves ``httpx_pages[slug]``, Playwright the full page."""
+    monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path)
+    calls = []
+    httpx_pages = {}
+
+    async def fake_httpx(url, client, validators=None, max_bytes=None, trace=None):
+        calls.append(HTTPX)
+        return fetch.FetchedPage(content=httpx_pages[url])
+
+    async def fake_playwright(url, browser_pool, resource_policy=None, readiness=None, max_bytes=None):
+        calls.append(PLAYWRIGHT)
+        return fetch.FetchedPage(content=POLICY_HTML)
+
+    monkeypatch.setattr(fetch, "fetch_with_httpx", fake_httpx)
+    monkeypatch.setattr(fetch, "fetch_with_playwright", fake_playwright)
+    return calls, httpx_pages
+
+
+def fetch_auto(url, cache):
+    page = {"url": url, "slug": "acme-policy", "renderer": "auto"}
+    return asyncio.run(fetch.fetch_page_content(page, FetchEngine(), None, None, cache))
+
+
+class TestAdaptiveFetch:
+    """Test cheap-first fetching with escalation."""
+
+    def test_usable_httpx_page_stays_on_httpx(self, fake_renderers, tmp_path):
+        """Test that a page served fine over HTTP never starts a browser."""
+        calls, httpx_pages = fake_renderers
+        httpx_pages["https://acme.example/policy"] = POLICY_HTML
+        cache = RendererCache(tmp_path / "cache.json")
+
+        result = fetch_auto("https://acme.example/policy", cache)
+        assert calls == [HTTPX]
+        assert result["renderer"] == HTTPX
+        assert result["fetched"].cleaned == fetch.clean_html(POLICY_HTML, "acme-policy")
+        assert cache.get("acme-policy") == HTTPX
+
+    def test_javascript_shell_escalates_and_is_remembered(self, fake_renderers, tmp_path):
+        """Test escalation to Playwright, then going straight to it next run."""
+        calls, httpx_pages = fake_renderers
+        httpx_pages["https://acme.example/app"] = SHELL_HTML
+        cache = RendererCache(tmp_path / "cache.json")
+
+        result = fetch_auto("https://acme.example/app", cache)
+        assert calls == [HTTPX, PLAYWRIGHT]
+        assert result["renderer"] == PLAYWRIGHT
+        assert result["fetched"].content == POLICY_HTML
+        assert result["conditional_get"] is None
+
+        calls.clear()
+        fetch_auto("https://acme.example/app", cache)
+        assert calls == [PLAYWRIGHT]
+
+    @pytest.mark.parametrize("status", [403, 503])
+    def test_bot_wall_error_escalates_without_retries(self, fake_renderers, monkeypatch, tmp_path, status):
+        """Test that a challenge served as an HTTP error goes to Playwright instead of failing the page."""
+        calls, _ = fake_renderers
+        requests = []
+
+        def bot_wall(request):
+            requests.append(request.url)
+            return httpx.Response(status, headers={"content-type": "text/html", "retry-after": "1"},
+                                  text=CHALLENGE_HTML)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(bot_wall)) as client:
+                page = {"url": "https://acme.example/walled", "slug": "acme-policy", "renderer": "auto"}
+                return await fetch.fetch_page_content(page, FetchEngine(), None, client, cache)
+
+        cache = RendererCache(tmp_path / "cache.json")
+        # The real httpx fetcher, so the error body is read like in production
+        monkeypatch.setattr(fetch, "fetch_with_httpx", REAL_FETCH_WITH_HTTPX)
+        result = asyncio.run(run())
+
+        assert len(requests) == 1
+        assert calls == [PLAYWRIGHT]
+        assert result["renderer"] == PLAYWRIGHT
+        assert result["fetched"].content == POLICY_HTML
+        assert result["failures"] == [] and result["errors"] == []
+        assert "challenge" in cache.entries["acme-policy"]["reason"]
+
+    def test_rate_limit_is_not_escalated(self, fake_renderers, monkeypatch, tmp_path):
+        """Test that a 429 without a challenge page is retried over httpx, not sent to a browser."""
+        calls, _ = fake_renderers
+        monkeypatch.setattr(fetch, "fetch_with_httpx", REAL_FETCH_WITH_HTTPX)
+        monkeypatch.setattr(fetch, "RETRY_ATTEMPTS", 2)
+        requests = []
+
+        def rate_limited(request):
+            requests.append(request.url)
+            return httpx.Response(429, headers={"content-type": "text/plain", "retry-after": "0"},
+                                  text="Too Many Requests")
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(rate_limited)) as client:
+                page = {"url": "https://acme.example/busy", "slug": "acme-policy", "renderer": "auto"}
+                return await fetch.fetch_page_content(page, FetchEngine(), None, client, cache)
+
+        cache = RendererCache(tmp_path / "cache.json")
+        result = asyncio.run(run())
+
+        assert len(requests) == 2
+        assert calls == []
+        assert result["renderer"] == HTTPX
+        assert [failure["error_type"] for failure in result["failures"]] == [fetch.URLErrorTypes.RATE_LIMITED]
+        assert "acme-policy" not in cache.entries
@@ -0,0 +1,151 @@
+"""
+Unit tests for offline record/replay.
+Covers cassettes, URL rewriting, the replay server's simulated conditions and a replayed fetch run.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from cassette import Cassette, original_url, rewrite_url
+from replay_server import BOT_WALL_COOKIE, STATS_PATH, ReplayOptions, ReplayServer
+from snapshot_store import write_snapshot
+
+URL = "https://help.acme.example/policies/terms?lang=en"
+HTML = "<html><body><main>" + "".join(f"<p>Rule {n} of the community.</p>" for n in range(40)) + "</main></body></html>"
+
+
+def make_cassette(tmp_path, renderer="httpx"):
+    cassette = Cassette(tmp_path / "cassette")
+    cassette.record(URL, HTML, {"url": URL, "etag": '"v1"'}, renderer)
+    cassette.save()
+    return Cassette(tmp_path / "cassette").load()
+
+
+class TestCassette:
+    """Test the recording format."""
+
+    def test_urls_round_trip_through_the_prefix(self):
+        """Test that rewritten URLs map back to the recorded URL."""
+        rewritten = rewrite_url(URL, "http://127.0.0.1:8700/")
+        assert rewritten == "http://127.0.0.1:8700/https/help.acme.example/policies/terms?lang=en"
+        assert original_url(rewritten.removeprefix("http://127.0.0.1:8700")) == URL
+        assert original_url("/https/acme.example") == "https://acme.example/"
+        assert original_url("/favicon.ico") is None
+        assert rewrite_url(URL, "") == URL
+
+    def test_record_and_reload(self, tmp_path):
+        """Test that bodies are stored compressed and validators are kept."""
+        cassette = make_cassette(tmp_path)
+        entry = cassette.get(URL)
+        assert entry["etag"] == '"v1"' and "last_modified" not in entry
+        assert cassette.body(entry).decode() == HTML
+        assert len(cassette.compressed_body(entry)) < len(HTML)
+
+
+class TestReplayResponses:
+    """Test simulated network conditions without sockets."""
+
+    def path(self):
+        return rewrite_url(URL, "http://replay")[len("http://replay"):]
+
+    def test_conditional_requests_and_unknown_urls(self, tmp_path):
+        """Test 200, 304 on a matching ETag, and 404 for URLs that were never recorded."""
+        server = ReplayServer(make_cassette(tmp_path))
+        status, headers, body = server.respond("GET", self.path(), {})
+        assert (status, body.decode()) == (200, HTML)
+        assert server.respond("GET", self.path(), {"if-none-match": '"v1"'})[0] == 304
+        status, headers, body = server.respond("HEAD", self.path(), {})
+        assert body == b"" and headers["Content-Length"] == str(len(HTML))
+        assert server.respond("GET", "/https/other.example/", {})[0] == 404
+        assert server.stats["statuses"] == {"200": 2, "304": 1, "404": 1}
+
+    def test_injected_errors_are_reproducible(self, tmp_path):
+        """Test that the same seed fails the same requests, with Retry-After."""
+        def statuses(seed):
+            server = ReplayServer(make_cassette(tmp_path), ReplayOptions(error_rate=0.5, retry_after=2, seed=seed))
+            return [server.respond("GET", self.path(), {})[:2] for _ in range(20)]
+
+        first = statuses(seed=3)
+        assert first == statuses(seed=3)
+        assert {status for status, _ in first} == {200, 503}
+        assert all(headers["Retry-After"] == "2" for status, headers in first if status == 503)
+
+    def test_bot_wall_until_challenge_cookie(self, tmp_path):
+        """Test that pages recorded with Playwright challenge clients without the cookie."""
+        server = ReplayServer(make_cassette(tmp_path, renderer="playwright"), ReplayOptions(bot_wall_recorded=True))
+        _, _, body = server.respond("GET", self.path(), {})
+        assert "Just a moment..." in body.decode()
+        _, _, body = server.respond("GET", self.path(), {"cookie": BOT_WALL_COOKIE})
+        assert body.decode() == HTML
+        assert server.stats["bot_walls"] == 1
+
+
+class TestReplayedRun:
+    """Test fetch.py against a running replay server."""
+
+    def test_fetch_records_then_replays(self, monkeypatch, tmp_path):
+        """Test that a recorded page replays through URL_REWRITE_PREFIX with gzip and 304s."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(fetch, "FETCH_HOST_REQUESTS_PER_MINUTE", 0)
+        monkeypatch.setattr(fetch, "FETCH_METRICS_FILE", "")
+        pages = [{"slug": "acme-terms", "url": URL, "platform": "Acme"}]
+
+        # Record from a scripted "live" site
+        def live(request):
+            return httpx.Response(200, headers={"content-type": "text/html", "etag": '"v1"'}, text=HTML)
+
+        async def record():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(live)) as client:
+                return await fetch.fetch_and_record(pages, http_client=client)
+
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "recorded")
+        monkeypatch.setattr(fetch, "FETCH_RECORD_DIR", str(tmp_path / "cassette"))
+        asyncio.run(record())
+        cassette = Cassette(tmp_path / "cassette").load()
+        assert cassette.get(URL)["etag"] == '"v1"'
+
+        # Replay into empty snapshots: the first run downloads, the second revalidates
+        monkeypatch.setattr(fetch, "FETCH_RECORD_DIR", "")
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "replayed")
+        with ReplayServer(cassette, ReplayOptions(latency_ms=5)) as server:
+            monkeypatch.setattr(fetch, "URL_REWRITE_PREFIX", server.base_url)
+            first = asyncio.run(fetch.fetch_and_record(pages))
+            second = asyncio.run(fetch.fetch_and_record(pages))
+            stats = httpx.get(server.base_url + STATS_PATH).json()
+
+        assert first["status"] == "success" and first["metrics"]["bytes_downloaded"] < len(HTML)
+        assert second["conditional_get"] == {"hits": 1, "misses": 0}
+        assert stats["statuses"] == {"200": 1, "304": 1}
+        assert fetch.read_snapshot(tmp_path / "replayed" / "acme-terms") == HTML
+
+    def test_recording_keeps_revalidated_pages(self, monkeypatch, tmp_path):
+        """Test that a page answered with 304 is recorded from the stored snapshot."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(fetch, "FETCH_HOST_REQUESTS_PER_MINUTE", 0)
+        monkeypatch.setattr(fetch, "FETCH_METRICS_FILE", "")
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path / "snapshots")
+        monkeypatch.setattr(fetch, "FETCH_RECORD_DIR", str(tmp_path / "cassette"))
+        write_snapshot(tmp_path / "snapshots" / "acme-terms", HTML)
+        fetch.save_http_validators(tmp_path / "snapshots" / "acme-terms", URL, {"etag": '"v1"'})
+        pages = [{"slug": "acme-terms", "url": URL, "platform": "Acme"}]
+
+        def live(request):
+            assert request.headers["if-none-match"] == '"v1"'
+            return httpx.Response(304, headers={"etag": '"v1"'})
+
+        async def record():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(live)) as client:
+                return await fetch.fetch_and_record(pages, http_client=client)
+
+        entry = asyncio.run(record())
+        assert entry["conditional_get"] == {"hits": 1, "misses": 0}
+        cassette = Cassette(tmp_path / "cassette").load()
+        assert cassette.get(URL)["etag"] == '"v1"'
+        assert cassette.body(cassette.get(URL)).decode() == HTML
@@ -0,0 +1,190 @@
+"""
+Unit tests for sharded fetch runs.
+Covers deterministic cost-balanced splits, partial run logs and merging shard outputs.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+import sharding
+from sharding import (ShardError, assign_shards, committed_health_db, load_partial_run_logs, merge_run_entries,
+                      page_costs, parse_shard, select_shard)
+
+PAGES = [{"slug": f"acme-page-{n}", "url": f"https://acme.example/{n}", "platform": "Acme"} for n in range(7)]
+RESPONSE_TIMES = {0: 4000, 1: 300, 2: 2500, 3: 300, 4: 1200, 5: 900}  # page 6 has no history
+
+
+def health_db():
+    return {"urls": {
+        f"https://acme.example/{n}": {"health_history": [
+            {"status": "healthy", "response_time_ms": ms},
+            {"status": "failed", "response_time_ms": 30000},
+        ]}
+        for n, ms in RESPONSE_TIMES.items()
+    }}
+
+
+class TestShardAssignment:
+    """Test the split itself."""
+
+    def test_shard_spec_validated(self):
+        """Test that shard indices are 1-based and within N."""
+        assert parse_shard("2/3") == (2, 3)
+        for spec in ("0/3", "4/3", "1", "a/b"):
+            with pytest.raises(ShardError):
+                parse_shard(spec)
+
+    def test_costs_ignore_failed_checks(self):
+        """Test that failed checks don't count and unknown pages cost the median."""
+        costs = page_costs(PAGES, health_db())
+        assert costs["acme-page-0"] == 4000
+        assert costs["acme-page-6"] == 1050
+
+    def test_split_is_complete_balanced_and_deterministic(self):
+        """Test that every page lands on exactly one shard, with similar load per shard."""
+        costs = page_costs(PAGES, health_db())
+        shards = assign_shards(PAGES, costs, 3)
+        assert sorted(p["slug"] for shard in shards for p in shard) == sorted(p["slug"] for p in PAGES)
+        loads = [sum(costs[p["slug"]] for p in shard) for shard in shards]
+        assert max(loads) - min(loads) <= max(costs.values()) / 2
+        assert assign_shards(list(reversed(PAGES)), costs, 3) == [list(reversed(s)) for s in shards]
+
+
+class TestMergeRunEntries:
+    """Test combining shard run log entries."""
+
+    def test_counts_summed_and_status_combined(self):
+        """Test totals, error lists and readiness stats across shards."""
+        wait = {"pages": 1, "total_wait_ms": 100, "max_wait_ms": 100, "deadline_hits": 0, "avg_wait_ms": 100}
+        first = {"timestamp_utc": "2026-06-26T16:58:57Z", "status": "success", "pages_checked": 3,
+                 "changes_found": 1, "errors": [], "conditional_get": {"hits": 2, "misses": 1},
+                 "readiness_waits": {"Acme": wait}, "renderers": {"httpx": 3}}
+        second = {"timestamp_utc": "2026-06-26T16:58:55Z", "status": "partial_failure", "pages_checked": 4,
+                  "changes_found": 0, "errors": ["boom"], "conditional_get": {"hits": 0, "misses": 4},
+                  "readiness_waits": {"Acme": dict(wait, total_wait_ms=300, max_wait_ms=300)},
+                  "renderers": {"playwright": 4}}
+
+        merged = merge_run_entries([first, second])
+        assert merged["timestamp_utc"] == "2026-06-26T16:58:55Z"
+        assert merged["status"] == "partial_failure"
+        assert (merged["pages_checked"], merged["changes_found"], merged["errors"]) == (7, 1, ["boom"])
+        assert merged["conditional_get"] == {"hits": 2, "misses": 5}
+        assert merged["renderers"] == {"httpx": 3, "playwright": 4}
+        assert merged["readiness_waits"]["Acme"] == {"pages": 2, "total_wait_ms": 400, "max_wait_ms": 300,
+                                                     "deadline_hits": 0, "avg_wait_ms": 200}
+
+
+def commit_health(root, db):
+    """A git checkout at ``root`` with ``db`` committed as url_health.json."""
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "url_health.json").write_text(json.dumps(db))
+    git = ["git", "-C", str(root), "-c", "user.name=Watcher", "-c", "user.email=watcher@example.com"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "url_health.json"], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "Health"], check=True)
+
+
+def write_partial(shard_dir, shard, slugs, pages):
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    index, count = parse_shard(shard)
+    (shard_dir / sharding.partial_run_log_name(index, count)).write_text(json.dumps(
+        {"shard": shard, "pages": pages, "slugs": slugs, "run": {}, "failures": []}))
+
+
+class TestSplitAgreement:
+    """Test that every shard of a run computes the same split, and that merge catches it when not."""
+
+    def test_costs_come_from_the_committed_health_file(self, tmp_path):
+        """Test that a runner's rewritten url_health.json doesn't change its split."""
+        commit_health(tmp_path / "checkout", health_db())
+        # This runner's health step saw page 6 as very slow
+        rewritten = health_db()
+        rewritten["urls"]["https://acme.example/6"] = {"health_history": [{"status": "healthy",
+                                                                           "response_time_ms": 90000}]}
+        (tmp_path / "checkout" / "url_health.json").write_text(json.dumps(rewritten))
+
+        committed = committed_health_db(Path("url_health.json"), cwd=tmp_path / "checkout")
+        assert committed == health_db()
+        assert select_shard(PAGES, 1, 2, committed) == select_shard(PAGES, 1, 2, health_db())
+        assert select_shard(PAGES, 1, 2, rewritten) != select_shard(PAGES, 1, 2, health_db())
+
+        assert committed_health_db(Path("url_health.json"), cwd=tmp_path) is None
+
+    def test_merge_rejects_overlapping_and_missing_pages(self, tmp_path):
+        """Test that shards which split differently can't be merged."""
+        pages = [page["slug"] for page in PAGES]
+        write_partial(tmp_path / "good-1", "1/2", pages[:4], pages)
+        write_partial(tmp_path / "good-2", "2/2", pages[4:], pages)
+        assert len(load_partial_run_logs([tmp_path / "good-1", tmp_path / "good-2"])) == 2
+
+        write_partial(tmp_path / "overlap-2", "2/2", pages[3:], pages)
+        with pytest.raises(ShardError, match="acme-page-3 was fetched by shards 1/2 and 2/2"):
+            load_partial_run_logs([tmp_path / "good-1", tmp_path / "overlap-2"])
+
+        write_partial(tmp_path / "gap-2", "2/2", pages[5:], pages)
+        with pytest.raises(ShardError, match=r"missing: \['acme-page-4'\]"):
+            load_partial_run_logs([tmp_path / "good-1", tmp_path / "gap-2"])
+
+        # With a shard missing altogether, only the merged shards are checked
+        assert len(load_partial_run_logs([tmp_path / "good-1"])) == 1
+
+
+class TestShardedRun:
+    """Test fetch.py --shard followed by sharding.py merge."""
+
+    def run_shard(self, monkeypatch, root, spec):
+        async def fake_cycle(pages_to_track, *pools):
+            results = []
+            for page in pages_to_track:
+                slug_dir = fetch.SNAPSHOTS_DIR / page["slug"]
+                slug_dir.mkdir(parents=True, exist_ok=True)
+                (slug_dir / "clean.txt").write_text(f"{page['slug']} from shard {spec}\n")
+                failed = page["slug"] == "acme-page-1"
+                results.append({"failures": [{"url": page["url"], "platform": page["slug"]}] if failed else [],
+                                "errors": [], "changed": not failed, "conditional_get": None,
+                                "renderer": "httpx", "readiness": None})
+            return results
+
+        root.mkdir()
+        (root / "platform_urls.json").write_text(json.dumps(PAGES))
+        (root / "url_health.json").write_text(json.dumps(health_db()))
+        monkeypatch.chdir(root)
+        monkeypatch.setattr(fetch, "run_fetch_cycle", fake_cycle)
+        fetch.main(["--shard", spec])
+
+    def test_shards_merge_into_one_run(self, monkeypatch, tmp_path):
+        """Test that two shards cover every page once and merge into one run log entry."""
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", Path("snapshots/production"))
+        for index in (1, 2):
+            self.run_shard(monkeypatch, tmp_path / f"shard-{index}", f"{index}/2")
+            assert not (tmp_path / f"shard-{index}" / "run_log.json").exists()
+
+        partials = [json.loads(next((tmp_path / f"shard-{i}").glob("run_log.shard-*.json")).read_text())
+                    for i in (1, 2)]
+        assert sorted(partials[0]["slugs"] + partials[1]["slugs"]) == sorted(p["slug"] for p in PAGES)
+        assert partials[0]["pages"] == partials[1]["pages"] == [p["slug"] for p in PAGES]
+
+        main_dir = tmp_path / "main"
+        main_dir.mkdir()
+        monkeypatch.chdir(main_dir)
+        monkeypatch.setattr(sys, "argv", ["sharding.py", "merge", str(tmp_path / "shard-1"),
+                                          str(tmp_path / "shard-2")])
+        sharding.main()
+
+        run_log = json.loads((main_dir / "run_log.json").read_text())
+        assert len(run_log) == 1
+        assert run_log[0]["pages_checked"] == len(PAGES)
+        assert run_log[0]["changes_found"] == len(PAGES) - 1
+        assert run_log[0]["shards"] == 2
+        failures = (main_dir / "failures.log").read_text().splitlines()
+        assert [json.loads(line)["platform"] for line in failures] == ["acme-page-1"]
+        for page in PAGES:
+            assert (main_dir / "snapshots" / "production" / page["slug"] / "clean.txt").exists()
@@ -0,0 +1,106 @@
+"""
+Unit tests for compressed snapshot storage.
+Covers transparent reads, deterministic writes, migration and reads from git history.
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from snapshot_store import (SNAPSHOT_BASENAME, is_snapshot_file, migrate_snapshots, read_snapshot,
+                            read_snapshot_at, snapshot_file, write_snapshot)
+
+HTML = "<html><body><main><p>Règles de la communauté: be kind.</p></main></body></html>\n" * 50
+
+
+class TestSnapshotStore:
+    """Test the read/write API."""
+
+    def test_compressed_round_trip_is_deterministic(self, tmp_path):
+        """Test that gzip snapshots read back exactly and rewrite byte-identically."""
+        path = write_snapshot(tmp_path, HTML, "gzip")
+        first = path.read_bytes()
+        assert path.name == SNAPSHOT_BASENAME + ".gz"
+        assert len(first) < len(HTML.encode("utf-8")) / 5
+        assert read_snapshot(tmp_path) == HTML
+        assert write_snapshot(tmp_path, HTML, "gzip").read_bytes() == first
+
+    def test_writing_replaces_the_other_variant(self, tmp_path):
+        """Test that plain and compressed snapshots never coexist after a write."""
+        (tmp_path / SNAPSHOT_BASENAME).write_text("<p>old</p>", encoding="utf-8")
+        assert read_snapshot(tmp_path) == "<p>old</p>"
+
+        write_snapshot(tmp_path, HTML, "gzip")
+        assert sorted(p.name for p in tmp_path.iterdir()) == [SNAPSHOT_BASENAME + ".gz"]
+
+        write_snapshot(tmp_path, HTML, "none")
+        assert sorted(p.name for p in tmp_path.iterdir()) == [SNAPSHOT_BASENAME]
+        assert read_snapshot(tmp_path) == HTML
+
+    def test_migration_converts_plain_snapshots_once(self, tmp_path):
+        """Test that migration compresses every plain snapshot and is idempotent."""
+        for slug in ("acme-terms", "acme-privacy"):
+            (tmp_path / slug).mkdir()
+            (tmp_path / slug / SNAPSHOT_BASENAME).write_text(HTML, encoding="utf-8")
+
+        stats = migrate_snapshots(tmp_path, "gzip")
+        assert stats["files"] == 2
+        assert stats["bytes_after"] < stats["bytes_before"]
+        assert snapshot_file(tmp_path / "acme-terms").name.endswith(".gz")
+        assert migrate_snapshots(tmp_path, "gzip")["files"] == 0
+
+    def test_snapshot_paths_recognised(self):
+        """Test the path filter used by the notifier and weekly aggregator."""
+        assert is_snapshot_file("snapshots/production/acme-terms/snapshot.html")
+        assert is_snapshot_file("snapshots/production/acme-terms/snapshot.html.gz")
+        assert not is_snapshot_file("snapshots/production/acme-terms/clean.txt")
+
+
+class TestFetchUsesSnapshotStore:
+    """Test that change detection reads and writes compressed snapshots."""
+
+    def test_change_detected_against_plain_snapshot(self, monkeypatch, tmp_path):
+        """Test that a legacy plain snapshot is compared, then replaced by a compressed one."""
+        monkeypatch.setattr(fetch, "SNAPSHOTS_DIR", tmp_path)
+        monkeypatch.setattr(fetch, "SNAPSHOT_COMPRESSION", "gzip")
+        (tmp_path / "acme-terms").mkdir()
+        (tmp_path / "acme-terms" / SNAPSHOT_BASENAME).write_text(HTML, encoding="utf-8")
+
+        assert not fetch.process_fetched_page("acme-terms", "https://acme.example/terms", HTML)["changed"]
+        updated = HTML.replace("be kind", "be respectful")
+        assert fetch.process_fetched_page("acme-terms", "https://acme.example/terms", updated)["changed"]
+        assert snapshot_file(tmp_path / "acme-terms").name == SNAPSHOT_BASENAME + ".gz"
+        assert read_snapshot(tmp_path / "acme-terms") == updated
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestReadSnapshotAt:
+    """Test reading snapshots from git revisions."""
+
+    def test_reads_across_the_migration_commit(self, tmp_path):
+        """Test that the pre-migration plain file and post-migration .gz both resolve."""
+        def git(*args):
+            subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+                           cwd=tmp_path, check=True, capture_output=True)
+
+        slug_dir = tmp_path / "snapshots" / "production" / "acme-terms"
+        git("init", "-q")
+        slug_dir.mkdir(parents=True)
+        (slug_dir / SNAPSHOT_BASENAME).write_text("<p>v1</p>", encoding="utf-8")
+        git("add", "-A")
+        git("commit", "-qm", "v1")
+        write_snapshot(slug_dir, "<p>v2</p>", "gzip")
+        git("add", "-A")
+        git("commit", "-qm", "v2")
+
+        rel = "snapshots/production/acme-terms"
+        assert read_snapshot_at("HEAD^", rel, cwd=tmp_path) == "<p>v1</p>"
+        assert read_snapshot_at("HEAD", rel, cwd=tmp_path) == "<p>v2</p>"
+        assert read_snapshot_at("HEAD", "snapshots/production/missing", cwd=tmp_path) is None
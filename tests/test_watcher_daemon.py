@@ -0,0 +1,122 @@
+"""
+Unit tests for the long-running watcher daemon.
+Covers the internal schedule, control file commands, status reporting and warm pools.
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import fetch
+from watcher_daemon import (CONTROL_FILENAME, DEFAULT_FETCH_INTERVAL_MINUTES, FULL_FETCH_INTERVAL_MINUTES,
+                            STATUS_FILENAME, WatcherDaemon, fetch_schedule, send_command)
+
+
+def make_daemon(tmp_path, **options):
+    daemon = WatcherDaemon(fetch_interval=timedelta(minutes=60), health_interval=timedelta(minutes=360),
+                           state_dir=tmp_path, poll_seconds=0.01, **options)
+    calls = []
+    for name, job in daemon.jobs.items():
+        async def record(name=name):
+            calls.append(name)
+            return "ok"
+        job.run = record
+    return daemon, calls
+
+
+class TestSchedule:
+    """Test job timing."""
+
+    def test_due_jobs_run_in_order_and_reschedule(self, tmp_path):
+        """Test that health runs before fetch and both move to their next interval."""
+        daemon, calls = make_daemon(tmp_path)
+        asyncio.run(daemon.tick())
+        assert calls == ["health", "fetch"]
+
+        fetch_job = daemon.jobs["fetch"]
+        assert fetch_job.next_run - fetch_job.last_run == timedelta(minutes=60)
+        asyncio.run(daemon.tick())
+        assert calls == ["health", "fetch"]
+
+        status = json.loads((tmp_path / STATUS_FILENAME).read_text())
+        assert status["jobs"]["fetch"]["runs"] == 1
+        assert status["jobs"]["diff"]["next_run"] is None
+
+    def test_failed_cycle_keeps_daemon_running(self, tmp_path):
+        """Test that an exception is recorded and the job is rescheduled."""
+        daemon, calls = make_daemon(tmp_path)
+
+        async def broken():
+            raise RuntimeError("boom")
+        daemon.jobs["health"].run = broken
+        asyncio.run(daemon.tick())
+
+        assert calls == ["fetch"]
+        assert daemon.jobs["health"].failures == 1
+        assert daemon.jobs["health"].next_run > datetime.now(UTC)
+
+
+    def test_adaptive_polling_by_default(self):
+        """Test that hourly runs only poll due pages unless ADAPTIVE_POLLING turns it off."""
+        assert fetch_schedule(None, {}) == (True, DEFAULT_FETCH_INTERVAL_MINUTES)
+        assert fetch_schedule(None, {"ADAPTIVE_POLLING": "1"}) == (True, DEFAULT_FETCH_INTERVAL_MINUTES)
+        # Fetching every page falls back to the workflow's weekly cadence
+        assert fetch_schedule(None, {"ADAPTIVE_POLLING": "0"}) == (False, FULL_FETCH_INTERVAL_MINUTES)
+        assert fetch_schedule(30, {"ADAPTIVE_POLLING": "off"}) == (False, 30)
+
+
+class TestControlFile:
+    """Test on-demand runs."""
+
+    def test_commands_request_jobs_and_stop(self, tmp_path):
+        """Test that queued commands run on the next tick and the file is consumed."""
+        daemon, calls = make_daemon(tmp_path)
+        for job in daemon.jobs.values():
+            job.next_run = None
+        send_command(tmp_path, "diff")
+        send_command(tmp_path, "fetch-all")
+        send_command(tmp_path, "bogus")
+
+        asyncio.run(daemon.tick())
+        assert calls == ["fetch", "diff"]
+        assert daemon.fetch_all_requested
+        assert not (tmp_path / CONTROL_FILENAME).exists()
+
+        send_command(tmp_path, "stop")
+        daemon.read_control()
+        assert daemon.stopping.is_set()
+
+
+class TestWarmPools:
+    """Test that fetch cycles share the daemon's pools."""
+
+    def test_fetch_cycles_reuse_one_client(self, monkeypatch, tmp_path):
+        """Test two fetch cycles and a control-file stop against one running daemon."""
+        config = tmp_path / "platform_urls.json"
+        config.write_text(json.dumps([{"slug": "acme-terms", "url": "https://acme.example/terms"}]))
+        monkeypatch.setattr(fetch, "URL_CONFIG_FILE", config)
+        clients = []
+
+        async def fake_fetch_and_record(pages_to_track, fetch_all=False, http_client=None, browser_pool=None):
+            clients.append((http_client, browser_pool))
+            if len(clients) == 2:
+                send_command(tmp_path, "stop")
+            else:
+                send_command(tmp_path, "fetch")
+            return {"pages_checked": len(pages_to_track), "changes_found": 0, "status": "success"}
+
+        monkeypatch.setattr(fetch, "fetch_and_record", fake_fetch_and_record)
+        daemon = WatcherDaemon(fetch_interval=timedelta(minutes=60), health_interval=timedelta(minutes=360),
+                               state_dir=tmp_path, poll_seconds=0.01)
+        daemon.jobs["health"].next_run = None
+        asyncio.run(asyncio.wait_for(daemon.serve(), timeout=10))
+
+        assert len(clients) == 2
+        assert clients[0][0] is clients[1][0] and clients[0][0] is not None
+        assert clients[0][1] is clients[1][1] and clients[0][1] is not None
+        assert daemon.jobs["fetch"].last_result == "1 checked, 0 changed, success"